@@ -5,6 +5,7 @@ from fastapi import FastAPI
 from gradio.routes import mount_gradio_app
 
 from src.config.dependency_check import verify_critical_dependencies
+from src.services import shutdown_services
 from src.ui import chat_page, ingest_page, evaluate_page, settings_page
 
 logger = logging.getLogger(__name__)
@@ -21,6 +22,7 @@ def create_app() -> FastAPI:
         raise
 
     app = FastAPI()
+    app.router.on_shutdown.append(shutdown_services)
     mount_gradio_app(app, chat_page(), path="/")
     mount_gradio_app(app, ingest_page(), path="/ingest")
     mount_gradio_app(app, evaluate_page(), path="/evaluate")
@@ -33,6 +33,16 @@ class SettingsModel(BaseModel):
     rrf_k: int | None = Field(default=None)
     device_preference: str | None = Field(default=None)
     precision: str | None = Field(default=None)
+    onnx_cache_path: str | None = Field(default=None)
+    onnx_intra_op_threads: int | None = Field(default=None)
+    embedding_quantization: str | None = Field(default=None)
+    query_embedding_cache_size: int | None = Field(default=None)
+    embedding_cache_path: str | None = Field(default=None)
+    embedding_cache_max_mb: int | None = Field(default=None)
+    query_batch_max_size: int | None = Field(default=None)
+    query_batch_max_wait_ms: float | None = Field(default=None)
+    embedding_workers: int | None = Field(default=None)
+    embedding_worker_threads: int | None = Field(default=None)
     retrieval_mode: str | None = Field(default=None)
     w_dense: float | None = Field(default=None)
     w_lexical: float | None = Field(default=None)
@@ -40,6 +50,16 @@ class SettingsModel(BaseModel):
     performance_policy: PerformancePolicyModel | None = Field(default=None)
     pinecone_dense_index: str | None = Field(default=None)
     pinecone_sparse_index: str | None = Field(default=None)
+    pinecone_async_queries: bool | None = Field(default=None)
+    pinecone_max_connections: int | None = Field(default=None)
+    dense_backend: str | None = Field(default=None)
+    local_vector_path: str | None = Field(default=None)
+    local_vector_index: str | None = Field(default=None)
+    ivf_nlist: int | None = Field(default=None)
+    ivf_nprobe: int | None = Field(default=None)
+    lexical_index_path: str | None = Field(default=None)
+    lexical_shards: int | None = Field(default=None)
+    exact_match_max_hits: int | None = Field(default=None)
     enable_rerank: bool | None = Field(default=None)
 
     model_config = ConfigDict(extra="allow")
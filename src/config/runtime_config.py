@@ -120,7 +120,21 @@ class ConfigManager:
 
     def _load_env(self) -> SettingsModel:
         overrides: dict[str, Any] = {}
-        for key in ["top_k", "rrf_k"]:
+        for key in [
+            "top_k",
+            "rrf_k",
+            "lexical_shards",
+            "exact_match_max_hits",
+            "ivf_nlist",
+            "ivf_nprobe",
+            "query_embedding_cache_size",
+            "embedding_cache_max_mb",
+            "query_batch_max_size",
+            "onnx_intra_op_threads",
+            "embedding_workers",
+            "embedding_worker_threads",
+            "pinecone_max_connections",
+        ]:
             env_key = key.upper()
             value = os.getenv(env_key)
             if value is not None:
@@ -131,6 +145,12 @@ class ConfigManager:
                         overrides[key] = int(value)
                     except ValueError:
                         overrides[key] = value
+        batch_wait = os.getenv("QUERY_BATCH_MAX_WAIT_MS")
+        if batch_wait is not None:
+            try:
+                overrides["query_batch_max_wait_ms"] = float(batch_wait)
+            except ValueError:
+                overrides["query_batch_max_wait_ms"] = batch_wait
         device_pref = os.getenv("DEVICE_PREFERENCE")
         if device_pref is not None:
             overrides["device_preference"] = device_pref.lower()
@@ -157,6 +177,27 @@ class ConfigManager:
         sparse_index = os.getenv("PINECONE_SPARSE_INDEX")
         if sparse_index is not None:
             overrides["pinecone_sparse_index"] = sparse_index
+        async_queries = os.getenv("PINECONE_ASYNC_QUERIES")
+        if async_queries is not None:
+            overrides["pinecone_async_queries"] = async_queries.lower() in {
+                "1",
+                "true",
+                "yes",
+            }
+        for key in [
+            "dense_backend",
+            "local_vector_path",
+            "local_vector_index",
+            "embedding_quantization",
+            "embedding_cache_path",
+            "onnx_cache_path",
+        ]:
+            value = os.getenv(key.upper())
+            if value is not None:
+                overrides[key] = value if key.endswith("_path") else value.lower()
+        lexical_index_path = os.getenv("LEXICAL_INDEX_PATH")
+        if lexical_index_path is not None:
+            overrides["lexical_index_path"] = lexical_index_path
         policy: dict[str, Any] = {}
         num_fields = {
             "target_p95_ms": "PERF_TARGET_P95_MS",
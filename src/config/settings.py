@@ -28,8 +28,11 @@ DEFAULT_CONFIG_PATH = (
 )
 
 # Supported options for enumerated configuration fields
-DEVICE_OPTIONS = {"auto", "cpu", "gpu_openvino", "gpu_xpu"}
+DEVICE_OPTIONS = {"auto", "cpu", "gpu_openvino", "gpu_xpu", "onnx_cpu"}
 PRECISION_OPTIONS = {"fp32", "fp16", "int8"}
+DENSE_BACKEND_OPTIONS = {"pinecone", "local"}
+LOCAL_VECTOR_INDEX_OPTIONS = {"flat", "ivf"}
+QUANTIZATION_OPTIONS = {"none", "int8", "binary"}
 EVAL_METRICS = {"faithfulness", "relevancy", "precision"}
 
 
@@ -63,6 +66,15 @@ def validate_options(
     if precision not in PRECISION_OPTIONS:
         if require_fields or precision is not None:
             errors["precision"] = "invalid_option"
+    backend = settings.dense_backend
+    if backend is not None and backend not in DENSE_BACKEND_OPTIONS:
+        errors["dense_backend"] = "invalid_option"
+    local_index = settings.local_vector_index
+    if local_index is not None and local_index not in LOCAL_VECTOR_INDEX_OPTIONS:
+        errors["local_vector_index"] = "invalid_option"
+    quantization = settings.embedding_quantization
+    if quantization is not None and quantization not in QUANTIZATION_OPTIONS:
+        errors["embedding_quantization"] = "invalid_option"
     return errors
 
 
@@ -0,0 +1,210 @@
+"""Inverted-file (IVF) approximate search over a normalised vector matrix.
+
+Vectors are clustered around ``nlist`` centroids with spherical k-means; a
+query only scores the members of its ``nprobe`` closest clusters, so the
+scanned fraction of the corpus is roughly ``nprobe / nlist``. The index
+stores slot numbers, not vectors: the caller keeps the matrix and passes
+the rows to score.
+
+Cluster membership is an ``assignment`` array (``-1`` for empty slots).
+Inverted lists are a CSR view of it that is rebuilt lazily; slots added
+since the last rebuild wait in small per-list sets, and entries whose
+assignment changed are filtered out at probe time. This keeps inserts and
+deletes O(1) between rebuilds.
+"""
+
+from __future__ import annotations
+
+import copy
+import math
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+
+DEFAULT_NPROBE = 32
+DEFAULT_TRAIN_THRESHOLD = 20000
+DEFAULT_ITERATIONS = 10
+# k-means samples at most this many points per centroid
+SAMPLES_PER_CENTROID = 64
+# rebuild the inverted lists once pending inserts exceed this fraction
+REBUILD_FRACTION = 0.1
+_ASSIGN_CHUNK = 65536
+
+
+def default_nlist(count: int) -> int:
+    """Number of clusters for ``count`` vectors (about ``4 * sqrt(count)``)."""
+    return int(min(65536, max(16, 4 * math.sqrt(count))))
+
+
+class IVFIndex:
+    """Coarse-quantizer index yielding candidate slots for a query.
+
+    ``nlist=None`` picks :func:`default_nlist` from the corpus size at
+    training time. ``nprobe`` is the default number of clusters searched and
+    can be overridden per query.
+    """
+
+    def __init__(
+        self,
+        nlist: Optional[int] = None,
+        nprobe: int = DEFAULT_NPROBE,
+        train_threshold: int = DEFAULT_TRAIN_THRESHOLD,
+        iterations: int = DEFAULT_ITERATIONS,
+        seed: int = 0,
+    ) -> None:
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_threshold = train_threshold
+        self.iterations = iterations
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None
+        self.assignment = np.full(0, -1, dtype=np.int32)
+        self._built = np.full(0, -1, dtype=np.int32)
+        self._order = np.zeros(0, dtype=np.int64)
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._pending: Dict[int, Set[int]] = {}
+        self._pending_count = 0
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    # ------------------------------------------------------------------
+    # training
+    def train(self, matrix: np.ndarray, slots: np.ndarray) -> None:
+        """Cluster the unit rows ``matrix[slots]`` and index them.
+
+        Only a sample of at most ``SAMPLES_PER_CENTROID`` rows per cluster is
+        used for k-means; all rows are then assigned chunk by chunk, so the
+        corpus is never copied as a whole.
+        """
+        slots = np.asarray(slots, dtype=np.int64)
+        nlist = min(self.nlist or default_nlist(len(slots)), len(slots))
+        rng = np.random.default_rng(self.seed)
+        sample_size = min(len(slots), nlist * SAMPLES_PER_CENTROID)
+        picked = np.sort(rng.choice(len(slots), sample_size, replace=False))
+        sample = np.asarray(matrix[slots[picked]], dtype=np.float32)
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(self.iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            empty = np.bincount(labels, minlength=nlist) == 0
+            # re-seed empty clusters with random sample points
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = (sums / np.maximum(norms, 1e-12)).astype(np.float32)
+        self.centroids = centroids
+        self.assignment = np.full(0, -1, dtype=np.int32)
+        self._built = np.full(0, -1, dtype=np.int32)
+        self._pending.clear()
+        self._pending_count = 0
+        self._grow(int(slots.max()) + 1 if len(slots) else 0)
+        for start in range(0, len(slots), _ASSIGN_CHUNK):
+            chunk = slots[start : start + _ASSIGN_CHUNK]  # noqa: E203
+            self.assignment[chunk] = self.assign(matrix[chunk])
+        self.rebuild()
+
+    def assign(self, vectors: np.ndarray) -> np.ndarray:
+        """Nearest centroid of every row of ``vectors``."""
+        assert self.centroids is not None
+        labels = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), _ASSIGN_CHUNK):
+            end = start + _ASSIGN_CHUNK
+            labels[start:end] = np.argmax(vectors[start:end] @ self.centroids.T, axis=1)
+        return labels
+
+    # ------------------------------------------------------------------
+    # incremental maintenance
+    def _grow(self, size: int) -> None:
+        if size <= len(self.assignment):
+            return
+        capacity = max(size, 2 * len(self.assignment))
+        for name in ("assignment", "_built"):
+            old = getattr(self, name)
+            grown = np.full(capacity, -1, dtype=np.int32)
+            grown[: len(old)] = old
+            setattr(self, name, grown)
+
+    def add(self, slots: np.ndarray, vectors: np.ndarray) -> None:
+        """Assign ``vectors`` (stored at ``slots``) to their clusters."""
+        if not self.trained or not len(slots):
+            return
+        slots = np.asarray(slots, dtype=np.int64)
+        labels = self.assign(vectors)
+        self._grow(int(slots.max()) + 1)
+        self.assignment[slots] = labels
+        for slot, label in zip(slots.tolist(), labels.tolist(), strict=True):
+            if self._built[slot] != label:
+                pending = self._pending.setdefault(label, set())
+                if slot not in pending:
+                    pending.add(slot)
+                    self._pending_count += 1
+        if self._pending_count > REBUILD_FRACTION * max(len(self._order), 1):
+            self.rebuild()
+
+    def remove(self, slots: np.ndarray) -> None:
+        slots = np.asarray(slots, dtype=np.int64)
+        slots = slots[slots < len(self.assignment)]
+        self.assignment[slots] = -1
+
+    def rebuild(self) -> None:
+        """Recompute the inverted lists from ``assignment``."""
+        if self.centroids is None:
+            return
+        live = np.flatnonzero(self.assignment >= 0)
+        labels = self.assignment[live]
+        self._order = live[np.argsort(labels, kind="stable")]
+        self._offsets = np.zeros(len(self.centroids) + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(labels, minlength=len(self.centroids)), out=self._offsets[1:]
+        )
+        self._built = self.assignment.copy()
+        self._pending.clear()
+        self._pending_count = 0
+
+    def snapshot(self) -> "IVFIndex":
+        """A copy to search while this index keeps changing.
+
+        Centroids and inverted lists are replaced rather than modified, so
+        they are shared; assignments and pending additions are copied.
+        """
+        view = copy.copy(self)
+        view.assignment = self.assignment.copy()
+        view._pending = {label: set(slots) for label, slots in self._pending.items()}
+        return view
+
+    # ------------------------------------------------------------------
+    # search
+    def candidates(self, query: np.ndarray, nprobe: Optional[int] = None) -> np.ndarray:
+        """Slots in the ``nprobe`` clusters closest to the unit ``query``."""
+        assert self.centroids is not None
+        nprobe = min(nprobe or self.nprobe, len(self.centroids))
+        similarity = self.centroids @ query
+        if nprobe < len(similarity):
+            probes = np.argpartition(-similarity, nprobe - 1)[:nprobe]
+        else:
+            probes = np.arange(len(similarity))
+        parts: List[np.ndarray] = []
+        for label in probes.tolist():
+            start, end = self._offsets[label], self._offsets[label + 1]
+            members = self._order[start:end]
+            pending = self._pending.get(label)
+            if pending:
+                extra = np.fromiter(pending, dtype=np.int64, count=len(pending))
+                members = np.concatenate([members, extra])
+            # drop slots deleted or moved to another cluster since the rebuild
+            parts.append(members[self.assignment[members] == label])
+        return np.concatenate(parts) if parts else self._order[:0]
+
+    # ------------------------------------------------------------------
+    # persistence
+    def state(self) -> Dict[str, np.ndarray]:
+        assert self.centroids is not None
+        return {"centroids": self.centroids, "assignment": self.assignment}
+
+    def restore(self, centroids: np.ndarray, assignment: np.ndarray) -> None:
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.assignment = np.asarray(assignment, dtype=np.int32).copy()
+        self._built = np.full(len(self.assignment), -1, dtype=np.int32)
+        self.rebuild()
@@ -0,0 +1,850 @@
+"""In-process vector index with the ``PineconeClient`` surface.
+
+``LocalVectorStore`` keeps every index as one contiguous float32 matrix of
+unit-normalised rows, so cosine similarity is a single matrix product and
+top-k selection an ``argpartition``. It lets dense retrieval run without
+network access and gives a reproducible baseline for benchmarks.
+
+Persisted indices are append-only. New rows go to the end of a
+memory-mapped matrix file and their ids and metadata to a JSON lines file;
+replacing an id appends a row that supersedes the old one, and deletes
+append slot numbers to a tombstone file, so a mutation writes only what it
+changed. Once dead rows exceed ``compaction_threshold`` of an index, its
+live rows are rewritten into a new generation directory and ``index.json``
+is switched to it atomically.
+
+With ``quantization="int8"`` or ``"binary"`` queries scan compact codes
+held in memory instead (see :mod:`~src.integrations.quantization`); the
+best ``rescore_candidates`` rows of that scan are then rescored exactly
+against float16 copies of the vectors. Those rows stay in the memory-mapped
+file (a temporary file for in-memory stores), so only the rows a query
+touches are paged in.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .ivf_index import DEFAULT_NPROBE, DEFAULT_TRAIN_THRESHOLD, IVFIndex
+from .quantization import QUANTIZATION_MODES, QuantizedCodes
+
+EMBEDDING_DIMENSION = 384
+DEFAULT_METRIC = "cosine"
+INDEX_TYPES = ("flat", "ivf")
+DEFAULT_RESCORE_CANDIDATES = 256
+# compact an index once this fraction of its rows is dead
+DEFAULT_COMPACTION_THRESHOLD = 0.25
+_INITIAL_CAPACITY = 1024
+
+# index.json names the generation directory holding the other files
+_HEADER_FILE = "index.json"
+_IDS_FILE = "ids.jsonl"
+_TOMBSTONES_FILE = "tombstones.i64"
+_CODES_FILE = "codes.bin"
+_SCALES_FILE = "scales.f32"
+_CENTROIDS_FILE = "centroids.npy"
+_ASSIGNMENT_FILE = "assignment.i32"
+
+
+@dataclass
+class QueryResponse:
+    """Query result shaped like Pinecone's: ``{"id", "score", "metadata"}``."""
+
+    matches: List[Dict[str, Any]] = field(default_factory=list[Dict[str, Any]])
+
+
+class _RowFile:
+    """Growable matrix backed by a file and read through a memmap.
+
+    Capacity is added by extending the file at its end and remapping it, so
+    rows are never copied through the heap. Without ``path`` the rows live
+    in an anonymous temporary file.
+    """
+
+    def __init__(self, path: Optional[Path], dimension: int, dtype: Any) -> None:
+        self.path = path
+        self.dimension = dimension
+        self.dtype = np.dtype(dtype)
+        if path is None:
+            self._file = tempfile.TemporaryFile()
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(path, "r+b" if path.exists() else "w+b")
+        self.matrix = self._map()
+
+    @property
+    def row_bytes(self) -> int:
+        return self.dimension * self.dtype.itemsize
+
+    @property
+    def capacity(self) -> int:
+        return os.fstat(self._file.fileno()).st_size // self.row_bytes
+
+    def _map(self) -> np.ndarray:
+        capacity = self.capacity
+        if capacity == 0:
+            return np.zeros((0, self.dimension), dtype=self.dtype)
+        return np.memmap(
+            self._file, dtype=self.dtype, mode="r+", shape=(capacity, self.dimension)
+        )
+
+    def reserve(self, rows: int) -> np.ndarray:
+        """Grow the file to hold at least ``rows`` rows; returns the matrix."""
+        capacity = self.capacity
+        if rows > capacity:
+            capacity = max(rows, 2 * capacity, _INITIAL_CAPACITY)
+            self._file.truncate(capacity * self.row_bytes)
+            self.matrix = self._map()
+        return self.matrix
+
+    def flush(self) -> None:
+        if isinstance(self.matrix, np.memmap):
+            self.matrix.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self.matrix = np.zeros((0, self.dimension), dtype=self.dtype)
+        self._file.close()
+
+
+class _LocalIndex:
+    """Append-only matrix of normalised vectors with periodic compaction.
+
+    Upserts always append rows. Replaced and deleted rows become dead
+    slots, masked out of searches, until :meth:`compacted` packs the live
+    rows densely. With a ``directory`` the rows are a memory-mapped file in
+    generation ``generation`` and :meth:`persist` appends whatever changed
+    since its last call.
+
+    With an :class:`IVFIndex` queries score only the probed clusters once
+    the index holds ``train_threshold`` vectors; before that, and without
+    one, every row is scored. When quantized, ``codes`` holds the compact
+    copy that is scanned first and ``vectors`` holds float16 rows.
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        ivf: Optional[IVFIndex] = None,
+        quantization: str = "none",
+        rescore_candidates: int = DEFAULT_RESCORE_CANDIDATES,
+        directory: Optional[Path] = None,
+        generation: int = 0,
+    ) -> None:
+        self.dimension = dimension
+        self.ivf = ivf
+        self.quantization = quantization
+        self.rescore_candidates = rescore_candidates
+        self.directory = directory
+        self.generation = generation
+        self.codes = (
+            QuantizedCodes(quantization, dimension) if quantization != "none" else None
+        )
+        self.rows: Optional[_RowFile] = None
+        if self.codes is None and directory is None:
+            self.vectors = np.zeros((0, dimension), dtype=np.float32)
+        else:
+            dtype, suffix = (
+                (np.float32, "f32") if self.codes is None else (np.float16, "f16")
+            )
+            path = self._files / f"vectors.{suffix}" if directory else None
+            self.rows = _RowFile(path, dimension, dtype)
+            self.vectors = self.rows.matrix
+        self.ids: List[Optional[str]] = []
+        self.metadata: List[Optional[Dict[str, Any]]] = []
+        self.slot_by_id: Dict[str, int] = {}
+        self.dead_slots: List[int] = []
+        # what persist() has written so far
+        self._saved_rows = 0
+        self._unsaved_tombstones: List[int] = []
+        self._ivf_saved = False
+        self._header_saved = False
+
+    def __len__(self) -> int:
+        return len(self.slot_by_id)
+
+    @property
+    def _files(self) -> Path:
+        assert self.directory is not None
+        return self.directory / f"g{self.generation}"
+
+    def _writable(self, rows: int) -> None:
+        """Ensure ``vectors`` is a writable array with room for ``rows``."""
+        capacity = len(self.vectors)
+        if self.rows is not None:
+            self.vectors = self.rows.reserve(rows)
+        elif rows > capacity:
+            grown = np.zeros(
+                (max(rows, 2 * capacity, _INITIAL_CAPACITY), self.dimension),
+                dtype=self.vectors.dtype,
+            )
+            grown[:capacity] = self.vectors
+            self.vectors = grown
+        if self.codes is not None:
+            self.codes.reserve(len(self.vectors))
+
+    def _kill(self, slots: List[int]) -> None:
+        """Mark ``slots`` dead; their rows stay until the next compaction."""
+        for slot in slots:
+            self.ids[slot] = None
+            self.metadata[slot] = None
+        self.dead_slots.extend(slots)
+        if self.ivf is not None:
+            self.ivf.remove(np.asarray(slots, dtype=np.int64))
+
+    def upsert(
+        self, vectors: Sequence[Tuple[str, Sequence[float], Dict[str, Any]]]
+    ) -> None:
+        if not vectors:
+            return
+        matrix = np.asarray([values for _, values, _ in vectors], dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[1] != self.dimension:
+            raise ValueError(
+                "Vectors have dimension %s, expected %s"
+                % (matrix.shape[-1], self.dimension)
+            )
+        start = len(self.ids)
+        replaced: List[int] = []
+        for slot, (doc_id, _, metadata) in enumerate(vectors, start):
+            previous = self.slot_by_id.get(doc_id)
+            if previous is not None:
+                replaced.append(previous)
+            self.ids.append(doc_id)
+            self.metadata.append(dict(metadata or {}))
+            self.slot_by_id[doc_id] = slot
+        end = len(self.ids)
+        self._writable(end)
+        unit = _normalise(matrix)
+        self.vectors[start:end] = unit
+        if self.codes is not None:
+            self.codes.encode(np.arange(start, end), unit)
+        if self.ivf is not None and self.ivf.trained:
+            self.ivf.add(np.arange(start, end), unit)
+        # after add, so ids repeated within the batch keep only their last row
+        if replaced:
+            self._kill(replaced)
+        if self.ivf is not None and not self.ivf.trained:
+            if len(self) >= self.ivf.train_threshold:
+                self.train()
+
+    def train(self) -> None:
+        """(Re)cluster all live vectors; a no-op without an IVF index."""
+        if self.ivf is not None and self.slot_by_id:
+            self.ivf.train(self.vectors, np.sort(list(self.slot_by_id.values())))
+            self._ivf_saved = False
+
+    def delete(self, ids: Sequence[str]) -> None:
+        slots = [
+            self.slot_by_id.pop(doc_id) for doc_id in ids if doc_id in self.slot_by_id
+        ]
+        if slots:
+            self._kill(slots)
+            self._unsaved_tombstones.extend(slots)
+
+    def needs_compaction(self, threshold: float) -> bool:
+        dead = len(self.dead_slots)
+        return dead > 0 and dead > threshold * len(self.ids)
+
+    def view(self) -> "_IndexView":
+        """What a search reads, cheap enough to take under the store lock."""
+        rows = len(self.ids)
+        return _IndexView(
+            vectors=self.vectors[:rows],
+            ids=list(self.ids),
+            metadata=list(self.metadata),
+            dead_slots=list(self.dead_slots),
+            live=len(self.slot_by_id),
+            codes=self.codes,
+            ivf=self.ivf.snapshot() if self.ivf is not None else None,
+            rescore_candidates=self.rescore_candidates,
+        )
+
+    def close(self) -> None:
+        """Release the file behind the rows, if any."""
+        if self.rows is not None:
+            self.rows.close()
+            self.vectors = self.rows.matrix
+
+    # ------------------------------------------------------------------
+    # compaction
+    def compacted(self, quantization: Optional[str] = None) -> "_LocalIndex":
+        """The live rows packed densely into the next generation.
+
+        ``quantization`` converts them to another mode on the way. The new
+        index takes over the IVF index and, once saved, replaces this
+        index's files; this index is closed.
+        """
+        quantization = quantization or self.quantization
+        live = np.sort(np.fromiter(self.slot_by_id.values(), dtype=np.int64))
+        if self.directory is not None:
+            # leftovers of a compaction that crashed before switching over
+            shutil.rmtree(self.directory / f"g{self.generation + 1}", ignore_errors=True)
+        fresh = _LocalIndex(
+            self.dimension,
+            self.ivf,
+            quantization,
+            self.rescore_candidates,
+            self.directory,
+            self.generation + 1,
+        )
+        count = len(live)
+        fresh._writable(count)
+        for start in range(0, count, _INITIAL_CAPACITY):
+            chunk = live[start : start + _INITIAL_CAPACITY]  # noqa: E203
+            rows = np.asarray(self.vectors[chunk], dtype=np.float32)
+            fresh.vectors[start : start + len(chunk)] = rows  # noqa: E203
+            if fresh.codes is not None and quantization != self.quantization:
+                fresh.codes.encode(np.arange(start, start + len(chunk)), rows)
+        if fresh.codes is not None and self.codes is not None:
+            if quantization == self.quantization:
+                fresh.codes.restore(self.codes.codes[live], self.codes.scales[live])
+        fresh.ids = [self.ids[slot] for slot in live.tolist()]
+        fresh.metadata = [self.metadata[slot] for slot in live.tolist()]
+        fresh.slot_by_id = {
+            doc_id: slot for slot, doc_id in enumerate(fresh.ids) if doc_id is not None
+        }
+        if self.ivf is not None and self.ivf.centroids is not None:
+            self.ivf.restore(self.ivf.centroids, self.ivf.assignment[live])
+        previous = self._files if self.directory is not None else None
+        self.close()
+        fresh.persist()
+        if previous is not None:
+            shutil.rmtree(previous, ignore_errors=True)
+        return fresh
+
+    # ------------------------------------------------------------------
+    # persistence
+    def persist(self) -> None:
+        """Append everything changed since the last call to the index files.
+
+        Rows, codes and IVF assignments are written before the id lines that
+        make them visible and ``index.json`` last, so an interrupted call
+        leaves at most a torn tail that :meth:`load` discards. A no-op
+        without a directory.
+        """
+        if self.directory is None:
+            return
+        files = self._files
+        files.mkdir(parents=True, exist_ok=True)
+        start, end = self._saved_rows, len(self.ids)
+        if self.rows is not None:
+            self.rows.flush()
+        if self.codes is not None and end > start:
+            state = self.codes.state(end)
+            _append(files / _CODES_FILE, state["codes"][start:end])
+            _append(files / _SCALES_FILE, state["scales"][start:end])
+        if self.ivf is not None and self.ivf.trained:
+            if not self._ivf_saved:
+                centroids = self.ivf.state()["centroids"]
+                assignment = self._assignment(0, end)
+                _atomic_write(files / _CENTROIDS_FILE, lambda f: np.save(f, centroids))
+                _atomic_write(
+                    files / _ASSIGNMENT_FILE, lambda f: f.write(assignment.tobytes())
+                )
+                self._ivf_saved = True
+            elif end > start:
+                _append(files / _ASSIGNMENT_FILE, self._assignment(start, end))
+        if end > start:
+            lines = "".join(
+                json.dumps([self.ids[slot], self.metadata[slot]]) + "\n"
+                for slot in range(start, end)
+            )
+            _append(files / _IDS_FILE, lines.encode("utf-8"))
+            self._saved_rows = end
+        if self._unsaved_tombstones:
+            tombstones = np.asarray(self._unsaved_tombstones, dtype=np.int64)
+            _append(files / _TOMBSTONES_FILE, tombstones)
+            self._unsaved_tombstones = []
+        if not self._header_saved:
+            header = json.dumps(
+                {
+                    "dimension": self.dimension,
+                    "quantization": self.quantization,
+                    "generation": self.generation,
+                }
+            ).encode("utf-8")
+            _atomic_write(self.directory / _HEADER_FILE, lambda f: f.write(header))
+            self._header_saved = True
+
+    def _assignment(self, start: int, end: int) -> np.ndarray:
+        """IVF clusters of slots ``start:end``, ``-1`` past the assigned range."""
+        assert self.ivf is not None
+        labels = np.full(end - start, -1, dtype=np.int32)
+        known = self.ivf.assignment[start:end]
+        labels[: len(known)] = known
+        return labels
+
+    @staticmethod
+    def exists(directory: Path) -> bool:
+        return (directory / _HEADER_FILE).exists()
+
+    @classmethod
+    def load(
+        cls,
+        directory: Path,
+        ivf: Optional[IVFIndex] = None,
+        quantization: str = "none",
+        rescore_candidates: int = DEFAULT_RESCORE_CANDIDATES,
+    ) -> "_LocalIndex":
+        """Open the index saved in ``directory``.
+
+        Rows stay memory-mapped. Later rows for an id supersede earlier ones
+        and tombstoned rows are dropped. An index saved with another
+        ``quantization`` is converted into a new generation.
+        """
+        header = json.loads((directory / _HEADER_FILE).read_text(encoding="utf-8"))
+        saved = str(header.get("quantization", "none"))
+        index = cls(
+            int(header["dimension"]),
+            ivf,
+            saved,
+            rescore_candidates,
+            directory,
+            int(header["generation"]),
+        )
+        index._header_saved = True
+        index._restore()
+        if saved != quantization:
+            return index.compacted(quantization)
+        return index
+
+    def _restore(self) -> None:
+        files = self._files
+        ids_path = files / _IDS_FILE
+        entries: List[Tuple[Optional[str], Optional[Dict[str, Any]]]] = []
+        ids_bytes = 0
+        if ids_path.exists():
+            with ids_path.open("rb") as handle:
+                for line in handle:
+                    if not line.endswith(b"\n"):
+                        break  # torn tail of an interrupted append
+                    doc_id, metadata = json.loads(line)
+                    entries.append((doc_id, metadata))
+                    ids_bytes += len(line)
+        count = len(entries)
+        assert self.rows is not None
+        if self.rows.capacity < count:
+            raise ValueError(f"Vector and id counts differ in {files}")
+        superseded: List[int] = []
+        for slot, (doc_id, metadata) in enumerate(entries):
+            self.ids.append(doc_id)
+            self.metadata.append(metadata)
+            previous = self.slot_by_id.get(doc_id) if doc_id is not None else slot
+            if previous is not None:
+                superseded.append(previous)
+            if doc_id is not None:
+                self.slot_by_id[doc_id] = slot
+        tombstones = _read_records(files / _TOMBSTONES_FILE, np.int64, 1).reshape(-1)
+        deleted: List[int] = []
+        tombstoned: List[int] = tombstones.tolist()
+        for slot in tombstoned:
+            doc_id = self.ids[slot] if slot < count else None
+            if doc_id is not None and self.slot_by_id.get(doc_id) == slot:
+                del self.slot_by_id[doc_id]
+                deleted.append(slot)
+        self.dead_slots = superseded + deleted
+        for slot in self.dead_slots:
+            self.ids[slot] = None
+            self.metadata[slot] = None
+        self._saved_rows = count
+        _truncate(ids_path, ids_bytes)
+        _truncate(files / _TOMBSTONES_FILE, tombstones.nbytes)
+        if self.codes is not None:
+            self._restore_codes(count)
+        if self.ivf is not None:
+            assignment = _read_records(files / _ASSIGNMENT_FILE, np.int32, 1)
+            if (files / _CENTROIDS_FILE).exists() and len(assignment) >= count:
+                assignment = assignment[:count].reshape(-1).copy()
+                assignment[self.dead_slots] = -1
+                self.ivf.restore(np.load(files / _CENTROIDS_FILE), assignment)
+                _truncate(files / _ASSIGNMENT_FILE, assignment.nbytes)
+                self._ivf_saved = True
+            elif len(self) >= self.ivf.train_threshold:
+                self.train()
+
+    def _restore_codes(self, count: int) -> None:
+        """Read the codes of ``count`` rows back, re-encoding them if short."""
+        assert self.codes is not None
+        files = self._files
+        width = self.codes.codes.shape[1]
+        codes = _read_records(files / _CODES_FILE, self.codes.codes.dtype, width)
+        scales = _read_records(files / _SCALES_FILE, np.float32, 1).reshape(-1)
+        if len(codes) >= count and len(scales) >= count:
+            self.codes.restore(codes[:count], scales[:count])
+            _truncate(files / _CODES_FILE, codes[:count].nbytes)
+            _truncate(files / _SCALES_FILE, scales[:count].nbytes)
+            return
+        self.codes.reserve(count)
+        for start in range(0, count, _INITIAL_CAPACITY):
+            end = min(start + _INITIAL_CAPACITY, count)
+            self.codes.encode(np.arange(start, end), self.vectors[start:end])
+        for name, array in self.codes.state(count).items():
+            path = files / (_CODES_FILE if name == "codes" else _SCALES_FILE)
+            _atomic_write(path, lambda f, array=array: f.write(array.tobytes()))
+
+
+@dataclass(frozen=True)
+class _IndexView:
+    """A :class:`_LocalIndex` as of one moment, searched outside the lock.
+
+    Rows, codes and inverted lists are only appended or replaced, never
+    rewritten, so they are shared; the lists deletes change in place and
+    the IVF assignments are copied.
+    """
+
+    vectors: np.ndarray
+    ids: List[Optional[str]]
+    metadata: List[Optional[Dict[str, Any]]]
+    dead_slots: List[int]
+    live: int
+    codes: Optional[QuantizedCodes]
+    ivf: Optional[IVFIndex]
+    rescore_candidates: int
+
+    def search(
+        self, queries: np.ndarray, top_k: int, nprobe: Optional[int] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """Cosine top-k for every row of ``queries``.
+
+        Exact unless the IVF index is trained, in which case only the
+        ``nprobe`` clusters nearest each query are scored, or the index is
+        quantized, in which case only the shortlist from the code scan is.
+        """
+        rows = len(self.ids)
+        if not self.live or top_k <= 0:
+            return [[] for _ in range(len(queries))]
+        queries = _normalise(queries)
+        if self.ivf is not None and self.ivf.trained:
+            results: List[List[Dict[str, Any]]] = []
+            for query in queries:
+                slots = self.ivf.candidates(query, nprobe)
+                if self.codes is not None:
+                    results.append(self._rescored(query, slots, top_k))
+                else:
+                    scores = self.vectors[slots] @ query
+                    results.append(self._ranked(scores, slots, top_k))
+            return results
+        if self.codes is not None:
+            return [self._rescored(query, None, top_k) for query in queries]
+        scores = queries @ self.vectors[:rows].T
+        if self.dead_slots:
+            scores[:, self.dead_slots] = -np.inf
+        k = min(top_k, self.live)
+        return [self._ranked(row[:rows], None, k) for row in scores]
+
+    def _rescored(
+        self, query: np.ndarray, slots: Optional[np.ndarray], top_k: int
+    ) -> List[Dict[str, Any]]:
+        """Shortlist ``slots`` (or all rows) by code, rank it on float16 rows."""
+        assert self.codes is not None
+        approx = self.codes.scores(query, slots, len(self.ids))
+        if slots is None:
+            slots = np.arange(len(approx))
+            if self.dead_slots:
+                approx[self.dead_slots] = -np.inf
+        shortlist = min(max(self.rescore_candidates, top_k), len(approx))
+        if shortlist <= 0:
+            return []
+        if shortlist < len(approx):
+            best = np.argpartition(-approx, shortlist - 1)[:shortlist]
+        else:
+            best = np.arange(len(approx))
+        best = best[np.isfinite(approx[best])]
+        picked = slots[best]
+        exact = np.asarray(self.vectors[picked], dtype=np.float32) @ query
+        return self._ranked(exact, picked, top_k)
+
+    def _ranked(
+        self, scores: np.ndarray, slots: Optional[np.ndarray], top_k: int
+    ) -> List[Dict[str, Any]]:
+        """Matches for the ``top_k`` best ``scores`` (of ``slots``, or all rows)."""
+        k = min(top_k, len(scores))
+        if k <= 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(k)
+        best = best[np.argsort(-scores[best], kind="stable")]
+        chosen: List[int] = (best if slots is None else slots[best]).tolist()
+        values: List[float] = scores[best].tolist()
+        return [
+            {
+                "id": self.ids[slot],
+                "score": score,
+                "metadata": self.metadata[slot] or {},
+            }
+            for slot, score in zip(chosen, values, strict=True)
+        ]
+
+
+def _normalise(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.atleast_2d(np.asarray(matrix, dtype=np.float32))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, np.finfo(np.float32).tiny)
+
+
+def _atomic_write(path: Path, write: Callable[[BinaryIO], Any]) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            write(handle)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _append(path: Path, data: np.ndarray | bytes) -> None:
+    """Append ``data`` to ``path`` and make it durable."""
+    with path.open("ab") as handle:
+        handle.write(data if isinstance(data, bytes) else data.tobytes())
+        handle.flush()
+        os.fsync(handle.fileno())
+
+
+def _read_records(path: Path, dtype: Any, width: int) -> np.ndarray:
+    """The complete ``width``-wide records of ``dtype`` in ``path``."""
+    if not path.exists():
+        return np.zeros((0, width), dtype=dtype)
+    data = np.fromfile(path, dtype=dtype)
+    rows = len(data) // width
+    return data[: rows * width].reshape(rows, width)
+
+
+def _truncate(path: Path, size: int) -> None:
+    """Cut ``path`` back to ``size`` bytes, dropping a torn or stale tail."""
+    if path.exists() and path.stat().st_size > size:
+        os.truncate(path, size)
+
+
+class LocalVectorStore:
+    """Offline drop-in for :class:`~src.integrations.pinecone_client.PineconeClient`.
+
+    Indices are created on first use with the dimension passed to
+    :meth:`validate_index` or :meth:`create_index`. With ``path`` every
+    index lives in ``<path>/<index_name>/`` and each mutation is appended
+    to its files; without it the store is purely in memory. An index is
+    compacted after any mutation that leaves more than
+    ``compaction_threshold`` of its rows dead.
+
+    ``index_type="ivf"`` enables approximate search through an
+    :class:`~src.integrations.ivf_index.IVFIndex` built with ``nlist``
+    clusters once an index reaches ``train_threshold`` vectors; ``nprobe``
+    trades recall for latency and can be overridden per query.
+
+    ``quantization`` (``"none"``, ``"int8"`` or ``"binary"``) selects the
+    code scanned before the ``rescore_candidates`` best rows are rescored.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        *,
+        index_type: str = "flat",
+        nlist: Optional[int] = None,
+        nprobe: int = DEFAULT_NPROBE,
+        train_threshold: int = DEFAULT_TRAIN_THRESHOLD,
+        quantization: str = "none",
+        rescore_candidates: int = DEFAULT_RESCORE_CANDIDATES,
+        compaction_threshold: float = DEFAULT_COMPACTION_THRESHOLD,
+    ) -> None:
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"index_type must be one of {INDEX_TYPES}")
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"quantization must be one of {QUANTIZATION_MODES}")
+        self._logger = logging.getLogger(__name__)
+        self.path = Path(path) if path else None
+        self.index_type = index_type
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_threshold = train_threshold
+        self.quantization = quantization
+        self.rescore_candidates = rescore_candidates
+        self.compaction_threshold = compaction_threshold
+        self._indexes: Dict[str, _LocalIndex] = {}
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # index management
+    def _new_ivf(self) -> Optional[IVFIndex]:
+        if self.index_type != "ivf":
+            return None
+        return IVFIndex(self.nlist, self.nprobe, self.train_threshold)
+
+    def _new_index(self, index_name: str, dimension: int) -> _LocalIndex:
+        directory = self._directory(index_name)
+        if directory is not None:
+            # files of an index whose first save never completed
+            shutil.rmtree(directory, ignore_errors=True)
+        return _LocalIndex(
+            dimension,
+            self._new_ivf(),
+            self.quantization,
+            self.rescore_candidates,
+            directory,
+        )
+
+    def _directory(self, index_name: str) -> Optional[Path]:
+        return self.path / index_name if self.path is not None else None
+
+    def _get(
+        self, index_name: str, dimension: int | None = None
+    ) -> Optional[_LocalIndex]:
+        with self._lock:
+            index = self._indexes.get(index_name)
+            directory = self._directory(index_name)
+            if index is None and directory is not None and _LocalIndex.exists(directory):
+                index = _LocalIndex.load(
+                    directory,
+                    self._new_ivf(),
+                    self.quantization,
+                    self.rescore_candidates,
+                )
+                self._indexes[index_name] = index
+            if index is None and dimension is not None:
+                index = self._indexes[index_name] = self._new_index(index_name, dimension)
+            return index
+
+    def _persist(self, index_name: str, index: _LocalIndex) -> None:
+        if index.needs_compaction(self.compaction_threshold):
+            self._indexes[index_name] = index.compacted()
+        else:
+            index.persist()
+
+    def create_index(
+        self,
+        index_name: str,
+        dimension: int = EMBEDDING_DIMENSION,
+        metric: str = DEFAULT_METRIC,
+        **kwargs: Any,
+    ) -> None:
+        """Create an index if it does not already exist."""
+        if metric != DEFAULT_METRIC:
+            raise ValueError(f"LocalVectorStore only supports {DEFAULT_METRIC!r}")
+        with self._lock:
+            if self._get(index_name) is None:
+                index = self._indexes[index_name] = self._new_index(index_name, dimension)
+                self._persist(index_name, index)
+
+    def delete_index(self, index_name: str) -> None:
+        """Delete an index and its files if it exists."""
+        with self._lock:
+            index = self._indexes.pop(index_name, None)
+            if index is not None:
+                index.close()
+            directory = self._directory(index_name)
+            if directory is not None and directory.exists():
+                shutil.rmtree(directory)
+
+    def validate_index(self, index_name: str, dimension: int) -> bool:
+        try:
+            index = self._get(index_name, dimension)
+        except Exception as exc:
+            self._logger.error("Failed to load local index %s: %s", index_name, exc)
+            return False
+        assert index is not None
+        if index.dimension != dimension:
+            self._logger.error(
+                "Local index %s has dimension %s; expected %s",
+                index_name,
+                index.dimension,
+                dimension,
+            )
+            return False
+        return True
+
+    def describe_index_stats(self, index_name: str) -> Dict[str, Any]:
+        index = self._get(index_name)
+        if index is None:
+            return {"dimension": None, "total_vector_count": 0}
+        return {
+            "dimension": index.dimension,
+            "total_vector_count": len(index),
+            "ann_trained": bool(index.ivf is not None and index.ivf.trained),
+            "quantization": index.quantization,
+        }
+
+    def train_index(self, index_name: str) -> None:
+        """Re-cluster an IVF index, e.g. after the corpus has drifted."""
+        with self._lock:
+            index = self._get(index_name)
+            if index is not None:
+                index.train()
+                self._persist(index_name, index)
+
+    # ------------------------------------------------------------------
+    # data operations
+    def upsert_embeddings(
+        self,
+        index_name: str,
+        vectors: List[Tuple[str, List[float], Dict[str, Any]]],
+        namespace: Optional[str] = None,
+        **kwargs: Any,
+    ) -> None:
+        """Insert or replace vectors; rate-limit arguments are accepted and ignored."""
+        with self._lock:
+            dimension = len(vectors[0][1]) if vectors else EMBEDDING_DIMENSION
+            index = self._get(index_name, dimension)
+            assert index is not None
+            index.upsert(vectors)
+            self._persist(index_name, index)
+
+    def delete_embeddings(
+        self, index_name: str, ids: List[str], namespace: Optional[str] = None
+    ) -> None:
+        """Delete vectors by id; ``namespace`` is accepted and ignored."""
+        with self._lock:
+            index = self._get(index_name)
+            if index is None:
+                return
+            index.delete(ids)
+            self._persist(index_name, index)
+
+    def query(
+        self,
+        index_name: str,
+        embedding: Sequence[float] | np.ndarray,
+        top_k: int = 5,
+        nprobe: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> QueryResponse:
+        """Cosine top-k for one vector.
+
+        ``timeout`` is accepted for parity with :class:`PineconeClient` and
+        ignored: nothing is retried in process.
+        """
+        return self.query_batch(index_name, [embedding], top_k=top_k, nprobe=nprobe)[0]
+
+    def query_batch(
+        self,
+        index_name: str,
+        embeddings: Sequence[Sequence[float] | np.ndarray],
+        top_k: int = 5,
+        nprobe: Optional[int] = None,
+    ) -> List[QueryResponse]:
+        """Cosine top-k for several query vectors.
+
+        Flat indices score all queries in one matrix product; IVF indices
+        probe ``nprobe`` clusters per query (the store default when ``None``).
+        """
+        with self._lock:
+            index = self._get(index_name)
+            if index is None:
+                return [QueryResponse() for _ in embeddings]
+            dimension, view = index.dimension, index.view()
+        # scored outside the lock, so searches and writes do not queue
+        queries = np.asarray(embeddings, dtype=np.float32).reshape(
+            len(embeddings), dimension
+        )
+        results = view.search(queries, top_k, nprobe)
+        return [QueryResponse(matches) for matches in results]
@@ -0,0 +1,270 @@
+"""Asyncio-native Pinecone client over a pooled HTTP session.
+
+:class:`PineconeClient` wraps the blocking SDK, so every concurrent dense
+query holds an OS thread while it waits on the network. This client speaks
+Pinecone's REST API through one ``httpx.AsyncClient`` whose connection pool
+keeps connections alive and caps how many are open, so many in-flight
+queries multiplex over a few connections on a single event loop.
+
+Index hosts and dimensions come from the control plane (``GET
+/indexes/{name}``) and are cached like :meth:`PineconeClient.validate_index`.
+Retries, deadlines and the per-operation circuit breakers follow the same
+policies as the synchronous client.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+import numpy as np
+
+from .local_vector_store import QueryResponse
+from .pinecone_client import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_MAX_IN_FLIGHT,
+    EMBEDDING_DIMENSION,
+    RETRY_POLICIES,
+    VALIDATION_TTL_SECONDS,
+    as_list,
+    is_rate_limited,
+    operation_breakers,
+    status_code,
+)
+from src.utils.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy
+
+CONTROLLER_URL = "https://api.pinecone.io"
+API_VERSION = "2024-07"
+DEFAULT_MAX_CONNECTIONS = 16
+DEFAULT_MAX_KEEPALIVE = 8
+DEFAULT_REQUEST_TIMEOUT = 10.0
+
+
+class AsyncPineconeClient:
+    """Async ``query``/``upsert_embeddings``/``validate_index`` for Pinecone.
+
+    The HTTP session is created on first use and bound to that event loop;
+    close it with :meth:`aclose`. At most ``max_connections`` connections
+    are open at once, ``max_keepalive`` of them kept idle for reuse.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        controller_url: str = CONTROLLER_URL,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive: int = DEFAULT_MAX_KEEPALIVE,
+        request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
+        validation_ttl: float = VALIDATION_TTL_SECONDS,
+        retry_policies: Optional[Dict[str, RetryPolicy]] = None,
+        breakers: Optional[Dict[str, CircuitBreaker]] = None,
+    ) -> None:
+        self._logger = logging.getLogger(__name__)
+        self.api_key = api_key or os.getenv("PINECONE_API_KEY")
+        self.controller_url = controller_url.rstrip("/")
+        self.limits = httpx.Limits(
+            max_connections=max(1, max_connections),
+            max_keepalive_connections=max(0, min(max_keepalive, max_connections)),
+        )
+        self.request_timeout = request_timeout
+        self.validation_ttl = validation_ttl
+        self.retry_policies = {**RETRY_POLICIES, **(retry_policies or {})}
+        self.breakers = operation_breakers(self.retry_policies, breakers)
+        self._session: httpx.AsyncClient | None = None
+        # index name -> (host, dimension, described at)
+        self._described: Dict[str, Tuple[str, int, float]] = {}
+
+    @property
+    def session(self) -> httpx.AsyncClient:
+        if self._session is None:
+            self._session = httpx.AsyncClient(
+                headers={
+                    "Api-Key": self.api_key or "",
+                    "X-Pinecone-API-Version": API_VERSION,
+                },
+                limits=self.limits,
+                timeout=self.request_timeout,
+            )
+        return self._session
+
+    @property
+    def circuit_open(self) -> bool:
+        """Whether queries are currently being short-circuited."""
+        return self.breakers["query"].state == "open"
+
+    async def aclose(self) -> None:
+        """Close the pooled connections."""
+        if self._session is not None:
+            await self._session.aclose()
+            self._session = None
+
+    async def _with_retries(
+        self,
+        send: Callable[[], Awaitable[httpx.Response]],
+        operation: str,
+        timeout: Optional[float] = None,
+        on_retry: Callable[[Exception], None] | None = None,
+    ) -> Any:
+        """Await ``send`` under ``operation``'s retry policy; returns the JSON body.
+
+        Client errors other than 429 are raised without retrying and do not
+        count against the circuit breaker. A call cancelled while it is the
+        half-open probe releases the probe like a rate-limited one.
+        """
+        policy = self.retry_policies[operation]
+        breaker = self.breakers[operation]
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for attempt in range(policy.max_attempts):
+            admission = breaker.admit()
+            if admission is None:
+                raise CircuitOpenError(f"Pinecone circuit open; {operation} skipped")
+            try:
+                response = await send()
+                response.raise_for_status()
+            except asyncio.CancelledError:
+                if admission == "probe":
+                    breaker.record_rate_limited()
+                raise
+            except Exception as exc:
+                status = status_code(exc)
+                if status is not None and 400 <= status < 500 and status != 429:
+                    breaker.record_success()
+                    raise
+                if is_rate_limited(exc):
+                    breaker.record_rate_limited()
+                else:
+                    breaker.record_failure()
+                delay = policy.backoff(attempt)
+                if attempt == policy.max_attempts - 1 or (
+                    deadline is not None and time.monotonic() + delay >= deadline
+                ):
+                    self._logger.error(
+                        "%s failed after %s attempts: %s", operation, attempt + 1, exc
+                    )
+                    raise
+                self._logger.warning(
+                    "%s failed (%s/%s): %s",
+                    operation,
+                    attempt + 1,
+                    policy.max_attempts,
+                    exc,
+                )
+                if on_retry is not None:
+                    on_retry(exc)
+                await asyncio.sleep(delay)
+            else:
+                breaker.record_success()
+                return response.json() if response.content else {}
+
+    async def _describe(self, index_name: str) -> Tuple[str, int]:
+        """Data-plane base URL and dimension of ``index_name`` (cached)."""
+        cached = self._described.get(index_name)
+        if cached is not None and time.monotonic() - cached[2] < self.validation_ttl:
+            return cached[0], cached[1]
+        url = f"{self.controller_url}/indexes/{index_name}"
+        body = await self._with_retries(lambda: self.session.get(url), "admin")
+        host = str(body["host"])
+        if "://" not in host:
+            host = f"https://{host}"
+        described = (host.rstrip("/"), int(body["dimension"]), time.monotonic())
+        self._described[index_name] = described
+        return described[0], described[1]
+
+    async def _host(self, index_name: str) -> str:
+        """Base URL of ``index_name``, checking it holds our embeddings."""
+        host, dimension = await self._describe(index_name)
+        if dimension != EMBEDDING_DIMENSION:
+            raise ValueError(
+                f"Pinecone index {index_name} has dimension {dimension}; "
+                f"expected {EMBEDDING_DIMENSION}"
+            )
+        return host
+
+    def invalidate_index(self, index_name: Optional[str] = None) -> None:
+        """Forget the cached host and dimension of ``index_name`` (or all)."""
+        if index_name is None:
+            self._described.clear()
+        else:
+            self._described.pop(index_name, None)
+
+    async def validate_index(self, index_name: str, dimension: int) -> bool:
+        try:
+            _, actual_dim = await self._describe(index_name)
+        except Exception as exc:
+            self._logger.error("Failed to validate Pinecone index: %s", exc)
+            return False
+        if actual_dim != dimension:
+            self._logger.error(
+                "Pinecone index %s has dimension %s; expected %s",
+                index_name,
+                actual_dim,
+                dimension,
+            )
+            return False
+        return True
+
+    async def query(
+        self,
+        index_name: str,
+        embedding: Sequence[float] | np.ndarray,
+        top_k: int = 5,
+        timeout: Optional[float] = None,
+    ) -> QueryResponse:
+        """Query ``index_name``, giving up on retries after ``timeout`` seconds."""
+        if self.circuit_open:
+            raise CircuitOpenError("Pinecone circuit open; query skipped")
+        host = await self._host(index_name)
+        payload = {"vector": as_list(embedding), "topK": top_k, "includeMetadata": True}
+        body = await self._with_retries(
+            lambda: self.session.post(f"{host}/query", json=payload),
+            "query",
+            timeout=timeout,
+        )
+        return QueryResponse(matches=list(body.get("matches", [])))
+
+    async def upsert_embeddings(
+        self,
+        index_name: str,
+        vectors: List[Tuple[str, Sequence[float], Dict[str, Any]]],
+        namespace: Optional[str] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    ) -> Dict[str, Any]:
+        """Upsert ``vectors`` in batches, ``max_in_flight`` at a time.
+
+        Returns the total vector count and retries.
+        """
+        host = await self._host(index_name)
+        gate = asyncio.Semaphore(max(1, max_in_flight))
+        retries = 0
+
+        def count_retry(exc: Exception) -> None:
+            nonlocal retries
+            retries += 1
+
+        async def send(start: int) -> None:
+            payload: Dict[str, Any] = {
+                "vectors": [
+                    {"id": doc_id, "values": as_list(values), "metadata": metadata}
+                    for doc_id, values, metadata in vectors[
+                        start : start + batch_size  # noqa: E203
+                    ]
+                ]
+            }
+            if namespace is not None:
+                payload["namespace"] = namespace
+            async with gate:
+                await self._with_retries(
+                    lambda: self.session.post(f"{host}/vectors/upsert", json=payload),
+                    "upsert",
+                    on_retry=count_retry,
+                )
+
+        await asyncio.gather(
+            *(send(start) for start in range(0, len(vectors), batch_size))
+        )
+        return {"vectors": len(vectors), "retries": retries}
@@ -3,15 +3,22 @@
 The real Pinecone client is intentionally thin and network bound.  This
 module provides a light repository style abstraction that encapsulates
 common operations (connect, create, upsert, query and delete) while adding
-retry handling and batched upserts that respect rate limits.  The
+retry handling and concurrent batched upserts that respect rate limits.  The
 implementation deliberately avoids exposing the underlying Pinecone client
 directly so that it can be easily mocked in tests.
 """
 
 import logging
 import os
+import threading
 import time
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.utils.rate_limit import TokenBucket
+from src.utils.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy
 
 try:
     import pinecone  # type: ignore
@@ -24,19 +31,63 @@ EMBEDDING_DIMENSION = 384
 DEFAULT_METRIC = "cosine"
 DEFAULT_BATCH_SIZE = 100
 DEFAULT_REQUESTS_PER_MINUTE = 60
-MAX_RETRIES = 3
-BACKOFF_FACTOR = 1.0
+DEFAULT_MAX_IN_FLIGHT = 4
+# queries fail fast so hybrid search can fall back to lexical; writes retry hard
+RETRY_POLICIES = {
+    "query": RetryPolicy(max_attempts=2, base_delay=0.05, max_delay=0.2),
+    "upsert": RetryPolicy(max_attempts=5, base_delay=1.0, max_delay=30.0),
+    "admin": RetryPolicy(max_attempts=3, base_delay=1.0, max_delay=8.0),
+}
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_SECONDS = 30.0
+# how long a successful (or dimension-mismatch) describe_index result is reused
+VALIDATION_TTL_SECONDS = 300.0
+
+
+def operation_breakers(
+    policies: Dict[str, RetryPolicy], overrides: Optional[Dict[str, CircuitBreaker]]
+) -> Dict[str, CircuitBreaker]:
+    """One circuit breaker per operation, ``overrides`` taking precedence."""
+    overrides = overrides or {}
+    return {
+        operation: overrides.get(operation)
+        or CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_SECONDS)
+        for operation in policies
+    }
 
 
 class PineconeClient:
-    """Wrapper around the Pinecone client with basic operations."""
+    """Wrapper around the Pinecone client with basic operations.
+
+    Index validation results are cached per index for ``validation_ttl``
+    seconds and index handles are reused, so a query makes a single
+    data-plane request. Creating or deleting an index invalidates both.
+
+    Calls retry with jittered backoff under the per-operation policies in
+    ``RETRY_POLICIES`` (overridable through ``retry_policies``). Each
+    operation has its own :class:`CircuitBreaker` (overridable through
+    ``breakers``), so failing upserts cannot cut off queries; while an
+    operation's circuit is open its calls raise :class:`CircuitOpenError`
+    without touching the network.
+    """
 
     def __init__(
-        self, api_key: Optional[str] = None, environment: Optional[str] = None
+        self,
+        api_key: Optional[str] = None,
+        environment: Optional[str] = None,
+        validation_ttl: float = VALIDATION_TTL_SECONDS,
+        retry_policies: Optional[Dict[str, RetryPolicy]] = None,
+        breakers: Optional[Dict[str, CircuitBreaker]] = None,
     ) -> None:
         self._logger = logging.getLogger(__name__)
         self.api_key = api_key or os.getenv("PINECONE_API_KEY")
         self.environment = environment or os.getenv("PINECONE_ENVIRONMENT")
+        self.validation_ttl = validation_ttl
+        self._validated: Dict[Tuple[str, int], Tuple[bool, float]] = {}
+        self._indexes: Dict[str, Any] = {}
+        self._cache_lock = threading.Lock()
+        self.retry_policies = {**RETRY_POLICIES, **(retry_policies or {})}
+        self.breakers = operation_breakers(self.retry_policies, breakers)
         if pinecone is None:  # pragma: no cover
             message = f"pinecone library missing: {_import_error}"
             raise ImportError(message)
@@ -44,28 +95,65 @@ class PineconeClient:
 
     # ------------------------------------------------------------------
     # internal helpers
-    def _with_retries(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
-        """Execute ``func`` with basic exponential backoff retry logic."""
+    def _with_retries(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        operation: str = "admin",
+        timeout: Optional[float] = None,
+        on_retry: Callable[[Exception], None] | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Execute ``func`` under the retry policy for ``operation``.
+
+        A retry whose backoff would end after ``timeout`` seconds (measured
+        from the first attempt) is not attempted; the last error is raised
+        instead. Failures other than rate limiting count towards the circuit
+        breaker of ``operation``, and an open circuit raises
+        :class:`CircuitOpenError`.
+        ``on_retry`` is called with the exception before each retry.
+        """
 
-        delay = BACKOFF_FACTOR
-        for attempt in range(MAX_RETRIES):
+        policy = self.retry_policies[operation]
+        breaker = self.breakers[operation]
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for attempt in range(policy.max_attempts):
+            if not breaker.allow():
+                raise CircuitOpenError(f"Pinecone circuit open; {operation} skipped")
             try:
-                return func(*args, **kwargs)
+                result = func(*args, **kwargs)
             except Exception as exc:  # pragma: no cover
-                if attempt == MAX_RETRIES - 1:
+                if is_rate_limited(exc):
+                    breaker.record_rate_limited()
+                else:
+                    breaker.record_failure()
+                delay = policy.backoff(attempt)
+                if attempt == policy.max_attempts - 1 or (
+                    deadline is not None and time.monotonic() + delay >= deadline
+                ):
                     self._logger.error(
-                        "Operation failed after %s attempts",
-                        MAX_RETRIES,
+                        "%s failed after %s attempts: %s", operation, attempt + 1, exc
                     )
                     raise
                 self._logger.warning(
-                    "Operation failed (%s/%s): %s",
+                    "%s failed (%s/%s): %s",
+                    operation,
                     attempt + 1,
-                    MAX_RETRIES,
+                    policy.max_attempts,
                     exc,
                 )
+                if on_retry is not None:
+                    on_retry(exc)
                 time.sleep(delay)
-                delay *= 2
+            else:
+                breaker.record_success()
+                return result
+
+    @property
+    def circuit_open(self) -> bool:
+        """Whether queries are currently being short-circuited."""
+
+        return self.breakers["query"].state == "open"
 
     # ------------------------------------------------------------------
     # connection & index management
@@ -85,6 +173,7 @@ class PineconeClient:
 
         if index_name in pinecone.list_indexes():
             return
+        self.invalidate_index(index_name)
         self._with_retries(
             pinecone.create_index,
             name=index_name,
@@ -98,66 +187,170 @@ class PineconeClient:
 
         if index_name not in pinecone.list_indexes():
             return
+        self.invalidate_index(index_name)
         self._with_retries(pinecone.delete_index, index_name)
 
+    def invalidate_index(self, index_name: Optional[str] = None) -> None:
+        """Forget cached validation and handles for ``index_name`` (or all)."""
+
+        with self._cache_lock:
+            if index_name is None:
+                self._validated.clear()
+                self._indexes.clear()
+                return
+            self._indexes.pop(index_name, None)
+            for key in [key for key in self._validated if key[0] == index_name]:
+                del self._validated[key]
+
     def get_index(self, index_name: str) -> Any:
-        return pinecone.Index(index_name)
+        """Return the index handle, reusing the one built on first use."""
+
+        with self._cache_lock:
+            index = self._indexes.get(index_name)
+            if index is None:
+                index = self._indexes[index_name] = pinecone.Index(index_name)
+            return index
 
-    def validate_index(self, index_name: str, dimension: int) -> bool:
+    def validate_index(
+        self, index_name: str, dimension: int, refresh: bool = False
+    ) -> bool:
+        """Check the index dimension, reusing a result younger than the TTL.
+
+        Lookup failures are not cached, so the next call retries them;
+        ``refresh`` forces a new ``describe_index`` call.
+        """
+
+        key = (index_name, dimension)
+        now = time.monotonic()
+        with self._cache_lock:
+            cached = self._validated.get(key)
+        if cached is not None and not refresh and now - cached[1] < self.validation_ttl:
+            return cached[0]
         try:
             description = pinecone.describe_index(index_name)
-            actual_dim = description.dimension
-            if actual_dim != dimension:
-                self._logger.error(
-                    "Pinecone index %s has dimension %s; expected %s",
-                    index_name,
-                    actual_dim,
-                    dimension,
-                )
-                return False
-            return True
         except Exception as exc:  # pragma: no cover
             self._logger.error("Failed to validate Pinecone index: %s", exc)
             return False
+        actual_dim = description.dimension
+        valid = actual_dim == dimension
+        if not valid:
+            self._logger.error(
+                "Pinecone index %s has dimension %s; expected %s",
+                index_name,
+                actual_dim,
+                dimension,
+            )
+        with self._cache_lock:
+            self._validated[key] = (valid, now)
+        return valid
 
     def upsert_embeddings(
         self,
         index_name: str,
-        vectors: List[Tuple[str, List[float], Dict[str, Any]]],
+        vectors: List[Tuple[str, Sequence[float], Dict[str, Any]]],
         namespace: Optional[str] = None,
         batch_size: int = DEFAULT_BATCH_SIZE,
         requests_per_minute: int = DEFAULT_REQUESTS_PER_MINUTE,
-    ) -> None:
-        """Upsert embeddings in batches, respecting rate limits."""
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    ) -> Dict[str, Any]:
+        """Upsert embeddings in batches, respecting rate limits.
+
+        Up to ``max_in_flight`` batches are sent concurrently. Every request,
+        retries included, takes a token from a bucket refilled at
+        ``requests_per_minute`` (0 disables the limit); rate-limited (429)
+        responses halve the rate, which then recovers with each success.
+        Values may be lists or numpy arrays; arrays are converted to lists
+        one batch at a time for the request payload.
+
+        Returns a report with per-batch size, seconds, vectors per second and
+        retry counts, plus totals.
+        """
 
         self.validate_index(index_name, EMBEDDING_DIMENSION)
         index = self.get_index(index_name)
-        sleep_time = 0.0
-        if requests_per_minute > 0:
-            sleep_time = 60.0 / float(requests_per_minute)
-
-        for start in range(0, len(vectors), batch_size):
-            batch = vectors[start : start + batch_size]  # noqa: E203
-            self._with_retries(
-                index.upsert,
-                vectors=batch,
-                namespace=namespace,
-            )
-            # Sleep between requests except after the last batch
-            if sleep_time and start + batch_size < len(vectors):
-                time.sleep(sleep_time)
+        bucket = (
+            TokenBucket(requests_per_minute / 60.0) if requests_per_minute > 0 else None
+        )
+
+        def send(start: int) -> Dict[str, Any]:
+            batch = [
+                (doc_id, as_list(values), metadata)
+                for doc_id, values, metadata in vectors[
+                    start : start + batch_size  # noqa: E203
+                ]
+            ]
+            stats: Dict[str, Any] = {"size": len(batch), "retries": 0, "throttled": 0}
+
+            def attempt() -> Any:
+                if bucket is not None:
+                    bucket.acquire()
+                return index.upsert(vectors=batch, namespace=namespace)
+
+            def retry(exc: Exception) -> None:
+                stats["retries"] += 1
+                if is_rate_limited(exc):
+                    stats["throttled"] += 1
+                    if bucket is not None:
+                        bucket.throttle()
+
+            began = time.perf_counter()
+            self._with_retries(attempt, operation="upsert", on_retry=retry)
+            if bucket is not None:
+                bucket.recover()
+            stats["seconds"] = time.perf_counter() - began
+            stats["vectors_per_second"] = len(batch) / max(stats["seconds"], 1e-9)
+            return stats
+
+        began = time.perf_counter()
+        starts = range(0, len(vectors), batch_size)
+        workers = max(1, min(max_in_flight, len(starts)))
+        with ThreadPoolExecutor(workers, thread_name_prefix="pinecone-upsert") as pool:
+            batches = list(pool.map(send, starts))
+        elapsed = time.perf_counter() - began
+        report = {
+            "batches": batches,
+            "vectors": len(vectors),
+            "seconds": elapsed,
+            "vectors_per_second": len(vectors) / max(elapsed, 1e-9),
+            "retries": sum(batch["retries"] for batch in batches),
+            "throttled": sum(batch["throttled"] for batch in batches),
+        }
+        self._logger.info(
+            "Upserted %s vectors into %s in %s batches (%.0f vectors/s, %s retries)",
+            len(vectors),
+            index_name,
+            len(batches),
+            report["vectors_per_second"],
+            report["retries"],
+        )
+        return report
+
+    def delete_embeddings(
+        self, index_name: str, ids: List[str], namespace: Optional[str] = None
+    ) -> None:
+        """Delete vectors by id."""
+
+        index = self.get_index(index_name)
+        self._with_retries(index.delete, operation="upsert", ids=ids, namespace=namespace)
 
     def query(
         self,
         index_name: str,
-        embedding: List[float],
+        embedding: Sequence[float] | np.ndarray,
         top_k: int = 5,
+        timeout: Optional[float] = None,
     ) -> Any:
+        """Query ``index_name``, giving up on retries after ``timeout`` seconds."""
+
+        if self.circuit_open:
+            raise CircuitOpenError("Pinecone circuit open; query skipped")
         self.validate_index(index_name, EMBEDDING_DIMENSION)
         index = self.get_index(index_name)
         return self._with_retries(
             index.query,
-            vector=embedding,
+            operation="query",
+            timeout=timeout,
+            vector=as_list(embedding),
             top_k=top_k,
             include_metadata=True,
         )
@@ -167,13 +360,38 @@ class PineconeClient:
         index_name: str,
         sparse_vector: Dict[str, List[float]],
         top_k: int = 5,
+        timeout: Optional[float] = None,
     ) -> Any:
         """Query a sparse Pinecone index using token frequencies."""
 
         index = self.get_index(index_name)
         return self._with_retries(
             index.query,
+            operation="query",
+            timeout=timeout,
             sparse_vector=sparse_vector,
             top_k=top_k,
             include_metadata=True,
         )
+
+
+def is_rate_limited(exc: Exception) -> bool:
+    """Whether ``exc`` is an HTTP 429 (too many requests) response."""
+    return status_code(exc) == 429 or "Too Many Requests" in str(exc)
+
+
+def status_code(exc: Exception) -> Optional[int]:
+    """HTTP status carried by ``exc`` (Pinecone or httpx errors), if any."""
+    response = getattr(exc, "response", None)
+    return (
+        getattr(exc, "status", None)
+        or getattr(exc, "status_code", None)
+        or getattr(response, "status_code", None)
+    )
+
+
+def as_list(values: Sequence[float] | np.ndarray) -> List[float]:
+    """Plain list of ``values`` for the JSON request body."""
+    if isinstance(values, np.ndarray):
+        return values.tolist()
+    return list(values)
@@ -0,0 +1,440 @@
+"""In-memory Pinecone stand-in with latency and fault injection.
+
+:class:`PineconeEmulator` implements the index operations this project uses
+(create, list, describe and delete indexes; upsert, dense and sparse query,
+and delete vectors) twice over the same state:
+
+* as the module-level SDK surface ``PineconeClient`` calls (``init``,
+  ``list_indexes``, ``describe_index``, ``Index(name).query`` and so on), so
+  a test or benchmark can set ``pinecone_client.pinecone = emulator``;
+* as a small REST server (:meth:`PineconeEmulator.serve`) speaking the
+  subset of the HTTP API used by ``AsyncPineconeClient``.
+
+Every data-plane and control-plane call passes through a
+:class:`FaultProfile`: requests over ``requests_per_second`` are refused
+with 429, the rest wait a log-normally distributed latency and then fail
+with 503 at ``error_rate``. Retry, timeout and pipelining behaviour can
+therefore be measured offline.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import random
+import threading
+import time
+import types
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Optional, Tuple, cast
+
+import numpy as np
+
+from .local_vector_store import QueryResponse
+
+# (id, dense values, sparse values, metadata) of one upserted vector
+_Record = Tuple[
+    str, Optional[List[float]], Optional[Dict[str, List[Any]]], Optional[Dict[str, Any]]
+]
+
+
+@dataclass
+class FaultProfile:
+    """Latency, error and rate-limit behaviour of the emulated service.
+
+    Latency is log-normal with median ``latency_ms`` and shape
+    ``latency_sigma`` (0 gives a fixed latency; about 0.5 puts p99 near
+    3.2x the median).
+    """
+
+    latency_ms: float = 0.0
+    latency_sigma: float = 0.0
+    error_rate: float = 0.0
+    requests_per_second: float = 0.0
+    seed: Optional[int] = None
+
+
+class EmulatorError(Exception):
+    """HTTP-style failure raised by the emulated SDK surface."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(f"({status}) {message}")
+        self.status = status
+
+
+class _Namespace:
+    """Vectors of one namespace, stacked into a matrix on demand."""
+
+    def __init__(self) -> None:
+        self.records: Dict[str, Tuple[np.ndarray, Dict[Any, float], Dict[str, Any]]] = {}
+        self._matrix: Optional[Tuple[List[str], np.ndarray]] = None
+
+    def upsert(self, records: Iterable[_Record]) -> int:
+        count = 0
+        for doc_id, values, sparse, metadata in records:
+            dense = np.asarray(values if values is not None else [], dtype=np.float32)
+            pairs = (
+                dict(zip(sparse["indices"], sparse["values"], strict=True))
+                if sparse
+                else {}
+            )
+            self.records[doc_id] = (dense, pairs, metadata or {})
+            count += 1
+        self._matrix = None
+        return count
+
+    def delete(self, ids: Iterable[str]) -> None:
+        for doc_id in ids:
+            self.records.pop(doc_id, None)
+        self._matrix = None
+
+    def query_dense(self, vector: Any, top_k: int) -> List[Tuple[str, float]]:
+        if self._matrix is None:
+            ids = [doc_id for doc_id, record in self.records.items() if record[0].size]
+            rows = [self.records[doc_id][0] for doc_id in ids]
+            matrix = np.stack(rows) if rows else np.empty((0, 0), np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True) if rows else 1.0
+            self._matrix = (ids, matrix / np.maximum(norms, 1e-12))
+        ids, matrix = self._matrix
+        if not ids:
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        scores = matrix @ (query / max(float(np.linalg.norm(query)), 1e-12))
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return [(ids[i], float(scores[i])) for i in order]
+
+    def query_sparse(
+        self, sparse: Dict[str, List[Any]], top_k: int
+    ) -> List[Tuple[str, float]]:
+        query = dict(zip(sparse["indices"], sparse["values"], strict=True))
+        scored = [
+            (
+                doc_id,
+                sum(
+                    (value * pairs.get(index, 0.0) for index, value in query.items()), 0.0
+                ),
+            )
+            for doc_id, (_, pairs, _) in self.records.items()
+            if pairs
+        ]
+        scored.sort(key=lambda item: -item[1])
+        return scored[:top_k]
+
+
+class _Index:
+    """Emulated index; ``PineconeEmulator.Index(name)`` returns a handle to it."""
+
+    def __init__(self, name: str, dimension: int, metric: str) -> None:
+        self.name = name
+        self.dimension = dimension
+        self.metric = metric
+        self.namespaces: Dict[str, _Namespace] = {}
+
+    def namespace(self, name: Optional[str]) -> _Namespace:
+        return self.namespaces.setdefault(name or "", _Namespace())
+
+
+class _IndexHandle:
+    """SDK-shaped data-plane handle (``upsert``, ``query``, ``delete``)."""
+
+    def __init__(self, emulator: "PineconeEmulator", name: str) -> None:
+        self._emulator = emulator
+        self.name = name
+
+    def upsert(
+        self, vectors: List[Any], namespace: Optional[str] = None
+    ) -> Dict[str, int]:
+        return self._emulator.upsert_vectors(self.name, vectors, namespace)
+
+    def query(
+        self,
+        vector: Optional[List[float]] = None,
+        sparse_vector: Optional[Dict[str, List[Any]]] = None,
+        top_k: int = 10,
+        include_metadata: bool = False,
+        namespace: Optional[str] = None,
+    ) -> QueryResponse:
+        return self._emulator.query_vectors(
+            self.name, vector, sparse_vector, top_k, include_metadata, namespace
+        )
+
+    def delete(self, ids: List[str], namespace: Optional[str] = None) -> Dict[str, Any]:
+        return self._emulator.delete_vectors(self.name, ids, namespace)
+
+
+class PineconeEmulator:
+    """Thread-safe in-memory Pinecone with injectable faults.
+
+    ``stats`` counts calls per operation plus ``"errors"`` (503) and
+    ``"rate_limited"`` (429) responses.
+    """
+
+    def __init__(self, faults: Optional[FaultProfile] = None) -> None:
+        self._logger = logging.getLogger(__name__)
+        self.faults = faults or FaultProfile()
+        self.indexes: Dict[str, _Index] = {}
+        self.stats: Dict[str, int] = {}
+        self._random = random.Random(self.faults.seed)
+        self._lock = threading.Lock()
+        self._tokens = math.inf  # clamped to a full bucket on first use
+        self._refilled = time.monotonic()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self.url: Optional[str] = None
+
+    # ------------------------------------------------------------------
+    # fault injection
+    def _admit(self, operation: str) -> None:
+        """Count the call, then rate-limit, delay or fail it per ``faults``."""
+        faults = self.faults
+        with self._lock:
+            self.stats[operation] = self.stats.get(operation, 0) + 1
+            limited = False
+            if faults.requests_per_second > 0:
+                now = time.monotonic()
+                capacity = max(1.0, faults.requests_per_second)
+                self._tokens = min(
+                    capacity,
+                    self._tokens + (now - self._refilled) * faults.requests_per_second,
+                )
+                self._refilled = now
+                limited = self._tokens < 1.0
+                if not limited:
+                    self._tokens -= 1.0
+            delay = 0.0
+            if faults.latency_ms > 0:
+                delay = faults.latency_ms / 1000.0
+                if faults.latency_sigma > 0:
+                    delay *= math.exp(self._random.gauss(0.0, faults.latency_sigma))
+            failed = self._random.random() < faults.error_rate
+            if limited:
+                self.stats["rate_limited"] = self.stats.get("rate_limited", 0) + 1
+            elif failed:
+                self.stats["errors"] = self.stats.get("errors", 0) + 1
+        if limited:
+            raise EmulatorError(429, "Too Many Requests")
+        if delay > 0:
+            time.sleep(delay)
+        if failed:
+            raise EmulatorError(503, "Service Unavailable")
+
+    def _index(self, name: str) -> _Index:
+        index = self.indexes.get(name)
+        if index is None:
+            raise EmulatorError(404, f"Index {name} not found")
+        return index
+
+    # ------------------------------------------------------------------
+    # SDK surface (module-level functions of the ``pinecone`` package)
+    def init(
+        self, api_key: Optional[str] = None, environment: Optional[str] = None
+    ) -> None:
+        return None
+
+    def list_indexes(self) -> List[str]:
+        self._admit("list_indexes")
+        with self._lock:
+            return list(self.indexes)
+
+    def create_index(
+        self, name: str, dimension: int, metric: str = "cosine", **_: Any
+    ) -> None:
+        self._admit("create_index")
+        with self._lock:
+            if name in self.indexes:
+                raise EmulatorError(409, f"Index {name} already exists")
+            self.indexes[name] = _Index(name, dimension, metric)
+
+    def delete_index(self, name: str) -> None:
+        self._admit("delete_index")
+        with self._lock:
+            self._index(name)
+            del self.indexes[name]
+
+    def describe_index(self, name: str) -> types.SimpleNamespace:
+        self._admit("describe_index")
+        with self._lock:
+            index = self._index(name)
+            host = f"{self.url}/index/{name}" if self.url else None
+            return types.SimpleNamespace(
+                name=name, dimension=index.dimension, metric=index.metric, host=host
+            )
+
+    def Index(self, name: str) -> _IndexHandle:  # noqa: N802 - mirrors the SDK
+        return _IndexHandle(self, name)
+
+    # ------------------------------------------------------------------
+    # data plane, reached through ``Index(name)`` handles
+    def upsert_vectors(
+        self, name: str, vectors: List[Any], namespace: Optional[str]
+    ) -> Dict[str, int]:
+        self._admit("upsert")
+        records: List[_Record] = []
+        for vector in vectors:
+            if isinstance(vector, dict):
+                fields = cast(Dict[str, Any], vector)
+                records.append(
+                    (
+                        fields["id"],
+                        fields.get("values"),
+                        fields.get("sparse_values") or fields.get("sparseValues"),
+                        fields.get("metadata"),
+                    )
+                )
+            else:
+                doc_id, values, *rest = vector
+                records.append((doc_id, values, None, rest[0] if rest else None))
+        with self._lock:
+            index = self._index(name)
+            for _, values, _, _ in records:
+                if values is not None and len(values) not in (0, index.dimension):
+                    raise EmulatorError(
+                        400,
+                        f"Vector dimension {len(values)} != {index.dimension}",
+                    )
+            return {"upserted_count": index.namespace(namespace).upsert(records)}
+
+    def query_vectors(
+        self,
+        name: str,
+        vector: Optional[List[float]],
+        sparse_vector: Optional[Dict[str, List[Any]]],
+        top_k: int,
+        include_metadata: bool,
+        namespace: Optional[str],
+    ) -> QueryResponse:
+        self._admit("query_sparse" if vector is None else "query")
+        with self._lock:
+            space = self._index(name).namespace(namespace)
+            if vector is not None:
+                hits = space.query_dense(vector, top_k)
+            elif sparse_vector is not None:
+                hits = space.query_sparse(sparse_vector, top_k)
+            else:
+                raise EmulatorError(400, "Query needs a vector or sparse_vector")
+            matches: List[Dict[str, Any]] = []
+            for doc_id, score in hits:
+                match: Dict[str, Any] = {"id": doc_id, "score": score}
+                if include_metadata:
+                    match["metadata"] = space.records[doc_id][2]
+                matches.append(match)
+        return QueryResponse(matches=matches)
+
+    def delete_vectors(
+        self, name: str, ids: List[str], namespace: Optional[str]
+    ) -> Dict[str, Any]:
+        self._admit("delete")
+        with self._lock:
+            self._index(name).namespace(namespace).delete(ids)
+        return {}
+
+    # ------------------------------------------------------------------
+    # HTTP server
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start the REST server in a daemon thread and return its base URL.
+
+        Index hosts returned by ``describe_index`` are ``{url}/index/{name}``
+        on the same server.
+        """
+        if self._server is None:
+            server = ThreadingHTTPServer((host, port), _Handler)
+            server.daemon_threads = True
+            server.emulator = self  # type: ignore[attr-defined]
+            self._server = server
+            self.url = f"http://{host}:{server.server_address[1]}"
+            threading.Thread(
+                target=server.serve_forever, name="pinecone-emulator", daemon=True
+            ).start()
+        assert self.url is not None
+        return self.url
+
+    def shutdown(self) -> None:
+        """Stop the REST server."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """REST subset used by ``AsyncPineconeClient`` (plus index management)."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    @property
+    def emulator(self) -> PineconeEmulator:
+        return self.server.emulator  # type: ignore[attr-defined]
+
+    def _reply(self, status: int, body: Any) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length)) if length else {}
+
+    def _dispatch(self, method: str) -> None:
+        emulator = self.emulator
+        parts = [part for part in self.path.split("?")[0].split("/") if part]
+        try:
+            body = self._body()
+            if parts == ["indexes"] and method == "GET":
+                result: Any = {"indexes": [{"name": n} for n in emulator.list_indexes()]}
+            elif parts == ["indexes"] and method == "POST":
+                emulator.create_index(
+                    body["name"], int(body["dimension"]), body.get("metric", "cosine")
+                )
+                result = {"name": body["name"]}
+            elif len(parts) == 2 and parts[0] == "indexes" and method == "GET":
+                result = dict(vars(emulator.describe_index(parts[1])))
+            elif len(parts) == 2 and parts[0] == "indexes" and method == "DELETE":
+                emulator.delete_index(parts[1])
+                result = {}
+            elif len(parts) > 2 and parts[0] == "index":
+                result = self._data_plane(method, parts[1], parts[2:], body)
+            else:
+                raise EmulatorError(404, f"No route for {method} {self.path}")
+        except EmulatorError as exc:
+            self._reply(exc.status, {"error": {"message": str(exc)}})
+        except (KeyError, ValueError, TypeError) as exc:
+            self._reply(400, {"error": {"message": str(exc)}})
+        else:
+            self._reply(200, result)
+
+    def _data_plane(
+        self, method: str, name: str, parts: List[str], body: Dict[str, Any]
+    ) -> Any:
+        handle = self.emulator.Index(name)
+        namespace = body.get("namespace")
+        if method == "POST" and parts == ["vectors", "upsert"]:
+            upserted = handle.upsert(body["vectors"], namespace)["upserted_count"]
+            return {"upsertedCount": upserted}
+        if method == "POST" and parts == ["query"]:
+            response = handle.query(
+                vector=body.get("vector"),
+                sparse_vector=body.get("sparseVector"),
+                top_k=int(body.get("topK", 10)),
+                include_metadata=bool(body.get("includeMetadata")),
+                namespace=namespace,
+            )
+            return {"matches": response.matches, "namespace": namespace or ""}
+        if method == "POST" and parts == ["vectors", "delete"]:
+            return handle.delete(body.get("ids", []), namespace)
+        raise EmulatorError(404, f"No route for {method} {self.path}")
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def do_DELETE(self) -> None:
+        self._dispatch("DELETE")
@@ -0,0 +1,104 @@
+"""Compact codes for scanning unit-normalised embeddings.
+
+``int8`` keeps one signed byte per dimension plus a per-vector scale
+(``x ≈ code * scale``), a 4x reduction over float32. ``binary`` keeps only
+the sign of every dimension, packed eight to a byte (32x), and ranks by
+Hamming distance. Both are used to shortlist candidates that are then
+rescored against the full-precision vectors.
+
+With numpy on CPU the int8 scan upcasts every block to float32, so it
+trades query time for memory: at 20k x 384 it is about 2.5x slower than
+exact float32 search. Only the binary scan is faster than exact search.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+import numpy as np
+
+QUANTIZATION_MODES = ("none", "int8", "binary")
+# rows scored per block so int8 -> float32 upcasts stay small
+_SCAN_CHUNK = 16384
+
+_BITWISE_COUNT = getattr(np, "bitwise_count", None)  # numpy >= 2.0
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    if _BITWISE_COUNT is not None:
+        return _BITWISE_COUNT(values)
+    return _POPCOUNT[values]
+
+
+class QuantizedCodes:
+    """Growable matrix of ``int8`` or ``binary`` codes addressed by slot."""
+
+    def __init__(self, mode: str, dimension: int) -> None:
+        if mode not in QUANTIZATION_MODES[1:]:
+            raise ValueError(f"quantization must be one of {QUANTIZATION_MODES[1:]}")
+        self.mode = mode
+        self.dimension = dimension
+        width = dimension if mode == "int8" else (dimension + 7) // 8
+        dtype = np.int8 if mode == "int8" else np.uint8
+        self.codes = np.zeros((0, width), dtype=dtype)
+        self.scales = np.zeros(0, dtype=np.float32)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.codes.nbytes + (self.scales.nbytes if self.mode == "int8" else 0))
+
+    def reserve(self, rows: int) -> None:
+        capacity = len(self.codes)
+        if rows <= capacity and self.codes.flags.writeable:
+            return
+        grown = np.zeros((max(rows, capacity), self.codes.shape[1]), self.codes.dtype)
+        grown[:capacity] = self.codes
+        scales = np.zeros(len(grown), dtype=np.float32)
+        scales[: len(self.scales)] = self.scales
+        self.codes, self.scales = grown, scales
+
+    def encode(self, slots: np.ndarray, vectors: np.ndarray) -> None:
+        """Store codes of the unit rows ``vectors`` at ``slots``."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.mode == "binary":
+            self.codes[slots] = np.packbits(vectors > 0, axis=1)
+            return
+        peak = np.abs(vectors).max(axis=1)
+        scale = np.where(peak > 0, peak / 127.0, 1.0).astype(np.float32)
+        self.codes[slots] = np.rint(vectors / scale[:, None]).astype(np.int8)
+        self.scales[slots] = scale
+
+    def scores(
+        self, query: np.ndarray, slots: Optional[np.ndarray], rows: int
+    ) -> np.ndarray:
+        """Approximate similarity of ``query`` to ``slots`` (or the first ``rows``).
+
+        ``int8`` estimates the dot product; ``binary`` returns the negated
+        Hamming distance between sign patterns, which orders the same way as
+        the angle it approximates.
+        """
+        count = rows if slots is None else len(slots)
+        out = np.empty(count, dtype=np.float32)
+        bits = np.packbits(query > 0)  # only read by the binary scan
+        for start in range(0, count, _SCAN_CHUNK):
+            end = min(start + _SCAN_CHUNK, count)
+            if slots is None:
+                codes, scales = self.codes[start:end], self.scales[start:end]
+            else:
+                block = slots[start:end]
+                codes, scales = self.codes[block], self.scales[block]
+            if self.mode == "binary":
+                distance = _popcount(np.bitwise_xor(codes, bits)).sum(
+                    axis=1, dtype=np.int32
+                )
+                out[start:end] = -distance
+            else:
+                out[start:end] = (codes.astype(np.float32) @ query) * scales
+        return out
+
+    def state(self, rows: int) -> Dict[str, np.ndarray]:
+        return {"codes": self.codes[:rows], "scales": self.scales[:rows]}
+
+    def restore(self, codes: np.ndarray, scales: np.ndarray) -> None:
+        self.codes, self.scales = codes, scales
@@ -144,6 +144,8 @@ class MetricsDashboard:
         self.window_size = window_size
         self._latencies: Dict[str, deque[float]] = {}
         self._p95: Dict[str, float] = {}
+        self._cache_counts: Dict[str, Dict[str, int]] = {}
+        self._histograms: Dict[str, deque[float]] = {}
 
     def log(self, data: Dict[str, Any]) -> None:
         self._records.append(data)
@@ -161,6 +163,43 @@ class MetricsDashboard:
     def p95_metrics(self) -> Dict[str, float]:
         return dict(self._p95)
 
+    def record_cache(self, name: str, hit: bool, count: int = 1) -> None:
+        """Count ``count`` hits or misses of the cache called ``name``."""
+        counts = self._cache_counts.setdefault(name, {"hits": 0, "misses": 0})
+        counts["hits" if hit else "misses"] += count
+
+    def cache_metrics(self) -> Dict[str, Dict[str, float]]:
+        metrics: Dict[str, Dict[str, float]] = {}
+        for name, counts in self._cache_counts.items():
+            lookups = counts["hits"] + counts["misses"]
+            metrics[name] = {
+                "hits": counts["hits"],
+                "misses": counts["misses"],
+                "hit_rate": counts["hits"] / lookups if lookups else 0.0,
+            }
+        return metrics
+
+    def record_histogram(self, name: str, value: float) -> None:
+        """Add ``value`` to the recent-values window of histogram ``name``."""
+        window = self._histograms.setdefault(name, deque(maxlen=self.window_size))
+        window.append(value)
+
+    def histogram_metrics(self) -> Dict[str, Dict[str, float]]:
+        metrics: Dict[str, Dict[str, float]] = {}
+        for name, window in self._histograms.items():
+            values = np.asarray(window, dtype=float)
+            if not len(values):
+                continue
+            p50, p95 = np.percentile(values, [50, 95])
+            metrics[name] = {
+                "count": len(values),
+                "mean": float(values.mean()),
+                "p50": float(p50),
+                "p95": float(p95),
+                "max": float(values.max()),
+            }
+        return metrics
+
     def latest(self) -> Dict[str, Any]:
         return self._records[-1] if self._records else {}
 
@@ -168,3 +207,5 @@ class MetricsDashboard:
         self._records.clear()
         self._latencies.clear()
         self._p95.clear()
+        self._cache_counts.clear()
+        self._histograms.clear()
@@ -25,15 +25,13 @@ class QueryService:
         self.auto_tuner = auto_tuner
         self.config = config or config_manager
 
-    def query(
+    def _params(
         self,
-        query: str,
-        mode: Optional[str] = None,
-        top_k: int | None = None,
-        w_dense: float | None = None,
-        w_lexical: float | None = None,
-    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
-        retrieval_mode = mode or self.default_mode
+        retrieval_mode: str,
+        top_k: int | None,
+        w_dense: float | None,
+        w_lexical: float | None,
+    ) -> Dict[str, Any]:
         params = {
             "top_k": int(top_k) if top_k is not None else int(self.config.get("top_k", 5)),
             "k": int(self.config.get("rrf_k", 60)),
@@ -43,24 +41,52 @@ class QueryService:
         }
         if self.auto_tuner:
             params = self.auto_tuner.tune(retrieval_mode, params)
-        top_k_val = int(params["top_k"])
-        k_val = int(params["k"])
-        enable_rerank_val = bool(params["enable_rerank"])
-        w_dense_val = float(params["w_dense"])
-        w_lexical_val = float(params["w_lexical"])
+        return {
+            "top_k": int(params["top_k"]),
+            "k": int(params["k"]),
+            "enable_rerank": bool(params["enable_rerank"]),
+            "w_dense": float(params["w_dense"]),
+            "w_lexical": float(params["w_lexical"]),
+        }
+
+    def query(
+        self,
+        query: str,
+        mode: Optional[str] = None,
+        top_k: int | None = None,
+        w_dense: float | None = None,
+        w_lexical: float | None = None,
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        retrieval_mode = mode or self.default_mode
+        params = self._params(retrieval_mode, top_k, w_dense, w_lexical)
         with PerformanceTracker(
             retrieval_mode=retrieval_mode, dashboard=self.dashboard
         ) as perf:
-            results, meta = self.retriever.query(
-                query,
-                mode=retrieval_mode,
-                top_k=top_k_val,
-                k=k_val,
-                w_dense=w_dense_val,
-                w_lexical=w_lexical_val,
-                enable_rerank=enable_rerank_val,
-            )
+            results, meta = self.retriever.query(query, mode=retrieval_mode, **params)
         metrics = perf.metrics()
         meta.update(metrics)
         self.dashboard.log(metrics)
         return results, meta
+
+    def query_batch(
+        self,
+        queries: List[str],
+        mode: Optional[str] = None,
+        top_k: int | None = None,
+        w_dense: float | None = None,
+        w_lexical: float | None = None,
+    ) -> List[Tuple[List[Dict[str, Any]], Dict[str, Any]]]:
+        """Answer ``queries`` together; each result equals that of :meth:`query`.
+
+        The batch is timed as a whole and logged once with its size; it is
+        not fed into the per-query p95 latency window.
+        """
+        retrieval_mode = mode or self.default_mode
+        params = self._params(retrieval_mode, top_k, w_dense, w_lexical)
+        with PerformanceTracker(retrieval_mode=retrieval_mode) as perf:
+            replies = self.retriever.query_batch(queries, mode=retrieval_mode, **params)
+        metrics = {**perf.metrics(), "batch_size": len(queries)}
+        for _, meta in replies:
+            meta.update(metrics)
+        self.dashboard.log(metrics)
+        return replies
@@ -2,12 +2,21 @@ import time
 from concurrent.futures import ThreadPoolExecutor, TimeoutError
 from typing import Any, Dict, List, Tuple
 
+import numpy as np
 import torch
 from transformers import AutoModelForSequenceClassification, AutoTokenizer
 
+from ..utils.batching import length_sorted_batches
+
+DEFAULT_BATCH_SIZE = 16
+
 
 class CrossEncoderReranker:
-    """Cross-encoder reranker using BAAI/bge-reranker-v2-m3."""
+    """Cross-encoder reranker using BAAI/bge-reranker-v2-m3.
+
+    Pairs are scored ``batch_size`` at a time in batches of similar token
+    length, so each batch is padded only to its own longest pair.
+    """
 
     def __init__(
         self,
@@ -17,8 +26,10 @@ class CrossEncoderReranker:
         *,
         device: str = "cpu",
         precision: str | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
     ) -> None:
         self.model_name = model_name
+        self.batch_size = batch_size
         self.cache_ttl = cache_ttl
         self.cache: Dict[
             Tuple[str, str, Tuple[str, ...]],
@@ -74,29 +85,30 @@ class CrossEncoderReranker:
 
     def _score_pairs(self, query: str, texts: List[str]) -> List[float]:
         """Return relevance scores for query-document pairs."""
+        if not texts:
+            return []
+        encoded = self.tokenizer([query] * len(texts), texts, truncation=True)
+        lengths = [len(ids) for ids in encoded["input_ids"]]
+        scores = np.empty(len(texts), dtype=np.float32)
+        for batch in length_sorted_batches(lengths, self.batch_size):
+            features = {
+                key: [values[i] for i in batch] for key, values in encoded.items()
+            }
+            scores[batch] = self._forward(features)
+        return scores.tolist()
+
+    def _forward(self, features: Dict[str, List[List[int]]]) -> np.ndarray:
+        """Pad one batch of tokenized pairs to its longest member and score it."""
         if self._use_openvino:
-            inputs = self.tokenizer(
-                [query] * len(texts),
-                texts,
-                padding=True,
-                truncation=True,
-                return_tensors="np",
-            )
-            result = self.model(inputs)
-            logits = next(iter(result.values())).squeeze(-1)
-            return logits.tolist()
-        inputs = self.tokenizer(
-            [query] * len(texts),
-            texts,
-            padding=True,
-            truncation=True,
-            return_tensors="pt",
-        )
+            inputs = self.tokenizer.pad(features, return_tensors="np")
+            result = self.model(dict(inputs))
+            return np.asarray(next(iter(result.values()))).reshape(-1)
+        inputs = self.tokenizer.pad(features, return_tensors="pt")
         if self.device == "gpu_xpu":  # pragma: no cover - requires XPU
             inputs = {k: v.to("xpu") for k, v in inputs.items()}
         with torch.no_grad():
-            logits = self.model(**inputs).logits.squeeze(-1)
-        return logits.cpu().tolist()
+            logits = self.model(**inputs).logits.reshape(-1)
+        return logits.float().cpu().numpy()
 
     def rerank(
         self,
@@ -1,93 +1,227 @@
 import asyncio
 import logging
-from typing import Any, Dict, List, Tuple
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
 from uuid import uuid4
 
+import numpy as np
 from sentence_transformers import SentenceTransformer
 
+from src.integrations.local_vector_store import LocalVectorStore
+from src.integrations.pinecone_async import AsyncPineconeClient
 from src.integrations.pinecone_client import PineconeClient
+from src.monitoring.performance import MetricsDashboard
+from src.retrieval.embedding_batcher import DEFAULT_MAX_WAIT_MS, EmbeddingBatcher
+from src.retrieval.embedding_cache import (
+    DEFAULT_QUERY_CACHE_SIZE,
+    DocumentEmbeddingCache,
+    QueryEmbeddingCache,
+)
+from src.retrieval.embedding_pool import EmbeddingPool
+from src.retrieval.onnx_encoder import DEFAULT_ONNX_CACHE_DIR, OnnxSentenceEncoder
+from src.utils.async_runner import run_sync
+from src.utils.batching import length_sorted_batches, token_lengths
 
 EMBEDDING_DIMENSION = 384
+MODEL_NAME = "all-MiniLM-L6-v2"
+MODEL_REVISION = "main"
 
 
 class DenseRetriever:
-    """Dense retrieval using Sentence-Transformers with Pinecone backend."""
+    """Dense retrieval using Sentence-Transformers with Pinecone backend.
+
+    ``pinecone_client`` may also be a :class:`LocalVectorStore`, which serves
+    the same calls from an in-process index. Query embeddings are memoised in
+    a :class:`QueryEmbeddingCache` of ``query_cache_size`` entries whose hits
+    and misses are counted on ``dashboard`` when one is given. With a
+    ``document_cache`` only chunks not embedded before by the same
+    ``model_revision`` are encoded. A ``query_batch_size`` above 1 routes
+    concurrent query encodes through an :class:`EmbeddingBatcher` that waits
+    up to ``query_batch_wait_ms`` to fill a batch.
+
+    ``device="onnx_cpu"`` serves ``encode`` from an ONNX Runtime export of the
+    model cached in ``onnx_cache_dir`` (int8 dynamically quantized when
+    ``precision`` is ``"int8"``), using ``onnx_threads`` intra-op threads
+    (0 lets ONNX Runtime decide).
+
+    Documents are embedded by ``embedding_pool``'s worker processes when one
+    is given, instead of by the in-process model.
+
+    Blocking calls (``pinecone_client``, the document cache) run in worker
+    threads so concurrent callers of the ``*_sync`` wrappers, which share
+    one background loop, do not wait on each other. With an
+    ``async_client`` queries are awaited on it instead; indexing and
+    validation still go through ``pinecone_client``.
+
+    :meth:`query_batch` embeds a list of queries in one ``encode`` call and
+    searches them together, returning what :meth:`query` would per query.
+    """
 
     def __init__(
         self,
-        pinecone_client: PineconeClient,
+        pinecone_client: PineconeClient | LocalVectorStore,
         index_name: str,
         device: str = "cpu",
         precision: str = "fp32",
+        query_cache_size: int = DEFAULT_QUERY_CACHE_SIZE,
+        dashboard: MetricsDashboard | None = None,
+        document_cache: DocumentEmbeddingCache | None = None,
+        model_revision: str = MODEL_REVISION,
+        query_batch_size: int = 1,
+        query_batch_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+        onnx_cache_dir: str | Path = DEFAULT_ONNX_CACHE_DIR,
+        onnx_threads: int = 0,
+        embedding_pool: EmbeddingPool | None = None,
+        async_client: AsyncPineconeClient | None = None,
     ) -> None:
         self._logger = logging.getLogger(__name__)
         self.pinecone_client = pinecone_client
         self.index_name = index_name
         self.device = device
         self.precision = precision
-        self._model: SentenceTransformer | None = None
+        self._model: SentenceTransformer | OnnxSentenceEncoder | None = None
         self._ov_model: Any | None = None
-        self._load_lock = asyncio.Lock()
+        self._load_lock = threading.Lock()
+        self._query_cache = QueryEmbeddingCache(query_cache_size)
+        self.dashboard = dashboard
+        self.document_cache = document_cache
+        self.model_revision = model_revision
+        self.onnx_cache_dir = onnx_cache_dir
+        self.onnx_threads = onnx_threads
+        self.embedding_pool = embedding_pool
+        self.async_client = async_client
+        self._batcher = (
+            EmbeddingBatcher(
+                self._encode_queries, query_batch_size, query_batch_wait_ms, dashboard
+            )
+            if query_batch_size > 1
+            else None
+        )
 
     async def _ensure_model(self) -> None:
         if self._model is None:
-            async with self._load_lock:
-                if self._model is None:
-                    st_device = "xpu" if self.device == "gpu_xpu" else "cpu"
-                    try:
-                        model = await asyncio.to_thread(
-                            SentenceTransformer,
-                            "all-MiniLM-L6-v2",
-                            device=st_device,
-                        )
-                    except Exception as exc:  # pragma: no cover
-                        raise RuntimeError(
-                            f"Failed to load SentenceTransformer: {exc}"
-                        ) from exc
-                    dimension = model.get_sentence_embedding_dimension()
-                    if dimension != EMBEDDING_DIMENSION:
-                        raise ValueError(
-                            "Loaded model has dimension %s, expected %s"
-                            % (dimension, EMBEDDING_DIMENSION)
-                        )
-                    self._model = model
-                    if self.device == "gpu_openvino":
-                        try:
-                            from openvino.runtime import Core  # type: ignore
-
-                            core = Core()
-                            self._ov_model = core.compile_model(
-                                self._model,
-                                "GPU",
-                                {"INFERENCE_PRECISION_HINT": self.precision},
-                            )
-                        except Exception as exc:  # pragma: no cover
-                            raise RuntimeError(f"OpenVINO load failed: {exc}") from exc
+            await asyncio.to_thread(self._load_model)
+
+    def _load_model(self) -> None:
+        """Load the model once, however many threads or loops ask for it.
+
+        A ``threading.Lock`` rather than an ``asyncio.Lock`` makes the load
+        single-flight across event loops as well as within one.
+        """
+        with self._load_lock:
+            if self._model is not None:
+                return
+            if self.device == "onnx_cpu":
+                # the PyTorch model is only built to export a missing artifact
+                self._model = OnnxSentenceEncoder.load(
+                    self._sentence_transformer,
+                    MODEL_NAME,
+                    self.model_revision,
+                    self.onnx_cache_dir,
+                    quantize=self.precision == "int8",
+                    intra_op_threads=self.onnx_threads,
+                )
+                return
+            model = self._sentence_transformer()
+            if self.device == "gpu_openvino":
+                try:
+                    from openvino.runtime import Core  # type: ignore
+
+                    core = Core()
+                    self._ov_model = core.compile_model(
+                        model,
+                        "GPU",
+                        {"INFERENCE_PRECISION_HINT": self.precision},
+                    )
+                except Exception as exc:  # pragma: no cover
+                    raise RuntimeError(f"OpenVINO load failed: {exc}") from exc
+            self._model = model
+
+    def _sentence_transformer(self) -> SentenceTransformer:
+        st_device = "xpu" if self.device == "gpu_xpu" else "cpu"
+        try:
+            model = SentenceTransformer(MODEL_NAME, device=st_device)
+        except Exception as exc:  # pragma: no cover
+            raise RuntimeError(f"Failed to load SentenceTransformer: {exc}") from exc
+        dimension = model.get_sentence_embedding_dimension()
+        if dimension != EMBEDDING_DIMENSION:
+            raise ValueError(
+                "Loaded model has dimension %s, expected %s"
+                % (dimension, EMBEDDING_DIMENSION)
+            )
+        return model
 
     async def _embed_documents(
         self, documents: List[str], batch_size: int = 32
-    ) -> List[List[float]]:
+    ) -> np.ndarray:
+        """Embed ``documents`` as a float32 matrix, one row per document.
+
+        Rows found in the document cache are reused; the model only sees the
+        distinct texts that are missing, and its output is cached.
+        """
+        cache = self.document_cache
+        if cache is None:
+            return await self._encode_documents(documents, batch_size)
+        encoder = self._document_encoder()
+        keys = [cache.key(encoder, self.model_revision, text) for text in documents]
+        cached = await asyncio.to_thread(cache.get_many, keys)
+        missing = {
+            key: text
+            for key, text in zip(keys, documents, strict=True)
+            if key not in cached
+        }
+        if self.dashboard is not None:
+            misses = sum(key in missing for key in keys)
+            self.dashboard.record_cache("document_embedding", True, len(keys) - misses)
+            self.dashboard.record_cache("document_embedding", False, misses)
+        if missing:
+            encoded = await self._encode_documents(list(missing.values()), batch_size)
+            await asyncio.to_thread(cache.put_many, list(missing), encoded)
+            cached.update(zip(missing, encoded, strict=True))
+        embeddings = np.empty((len(documents), EMBEDDING_DIMENSION), dtype=np.float32)
+        for row, key in enumerate(keys):
+            embeddings[row] = cached[key]
+        return embeddings
+
+    def _document_encoder(self) -> str:
+        """Backend that embeds documents; cached rows are only valid for it."""
+        if self.embedding_pool is not None:
+            # pool workers run the PyTorch model on CPU in full precision
+            return f"{MODEL_NAME}:cpu:fp32"
+        return f"{MODEL_NAME}:{self.device}:{self.precision}"
+
+    async def _encode_documents(
+        self, documents: List[str], batch_size: int = 32
+    ) -> np.ndarray:
+        if self.embedding_pool is not None:
+            return await asyncio.to_thread(
+                self.embedding_pool.encode, documents, batch_size
+            )
         await self._ensure_model()
+        return await asyncio.to_thread(self._encode_bucketed, documents, batch_size)
+
+    def _encode_bucketed(self, documents: List[str], batch_size: int) -> np.ndarray:
+        """Encode ``documents`` in batches of similar token length.
+
+        Each batch is padded only to its own longest member, so one long
+        chunk no longer inflates the cost of many short ones; rows are
+        written back in input order.
+        """
         assert self._model is not None
-        if self.device == "gpu_openvino" and self._ov_model is not None:
-            encode = getattr(self._ov_model, "encode", None)
-            if callable(encode):
-                embeddings = await asyncio.to_thread(encode, documents)
+        ov_encode = getattr(self._ov_model, "encode", None)
+        use_openvino = self.device == "gpu_openvino" and callable(ov_encode)
+        embeddings = np.empty((len(documents), EMBEDDING_DIMENSION), dtype=np.float32)
+        lengths = token_lengths(getattr(self._model, "tokenizer", None), documents)
+        for batch in length_sorted_batches(lengths, batch_size):
+            texts = [documents[i] for i in batch]
+            if use_openvino:
+                embeddings[batch] = ov_encode(texts)
             else:
-                embeddings = await asyncio.to_thread(
-                    self._model.encode,
-                    documents,
-                    batch_size=batch_size,
-                    show_progress_bar=False,
+                embeddings[batch] = self._model.encode(
+                    texts, batch_size=len(texts), show_progress_bar=False
                 )
-        else:
-            embeddings = await asyncio.to_thread(
-                self._model.encode,
-                documents,
-                batch_size=batch_size,
-                show_progress_bar=False,
-            )
-        return embeddings.tolist()
+        return embeddings
 
     async def index_corpus(
         self,
@@ -97,7 +231,7 @@ class DenseRetriever:
     ) -> Tuple[List[str], Dict[str, Any]]:
         """Embed documents in batches and upsert into Pinecone."""
         try:
-            valid, _ = self.validate_index()
+            valid, _ = await asyncio.to_thread(self.validate_index)
             if not valid:
                 raise ValueError("Invalid Pinecone index configuration")
             embeddings = await self._embed_documents(
@@ -114,37 +248,122 @@ class DenseRetriever:
                     strict=False,
                 )
             ]
-            self.pinecone_client.upsert_embeddings(self.index_name, vectors)
+            upsert: Callable[..., Any] = self.pinecone_client.upsert_embeddings
+            await asyncio.to_thread(upsert, self.index_name, vectors)
             return ids, {"status": "success", "count": len(ids)}
         except Exception as exc:  # pragma: no cover
             self._logger.error("Failed to index corpus: %s", exc)
             return [], {"status": "error", "error": str(exc)}
 
-    async def embed_query(self, query: str) -> Tuple[List[float], Dict[str, Any]]:
-        """Embed a query string."""
+    def _model_key(self) -> str:
+        """Identity of the loaded model; cached embeddings are only valid for it."""
+        return f"{MODEL_NAME}:{self.device}:{self.precision}:{id(self._model)}"
+
+    async def embed_query(self, query: str) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """Embed a query string as a read-only float32 vector.
+
+        Repeated queries (after whitespace normalisation) are served from the
+        query cache without running the model.
+        """
         try:
             await self._ensure_model()
             assert self._model is not None
-            if self.device == "gpu_openvino" and self._ov_model is not None:
-                encode = getattr(self._ov_model, "encode", None)
-                if callable(encode):
-                    embedding = await asyncio.to_thread(encode, query)
+            self._query_cache.bind_model(self._model_key())
+            embedding = self._query_cache.get(query)
+            cache_hit = embedding is not None
+            if self.dashboard is not None:
+                self.dashboard.record_cache("query_embedding", cache_hit)
+            if embedding is None:
+                if self._batcher is not None:
+                    encoded = await asyncio.wrap_future(self._batcher.submit(query))
+                elif self.device == "gpu_openvino" and self._ov_model is not None:
+                    encode = getattr(self._ov_model, "encode", None)
+                    if callable(encode):
+                        encoded = await asyncio.to_thread(encode, query)
+                    else:
+                        encoded = await asyncio.to_thread(self._model.encode, query)
                 else:
-                    embedding = await asyncio.to_thread(self._model.encode, query)
-            else:
-                embedding = await asyncio.to_thread(self._model.encode, query)
-            return embedding.tolist(), {"embedding_dimension": EMBEDDING_DIMENSION}
+                    encoded = await asyncio.to_thread(self._model.encode, query)
+                embedding = self._query_cache.put(query, encoded)
+            return embedding, {
+                "embedding_dimension": EMBEDDING_DIMENSION,
+                "cache_hit": cache_hit,
+            }
         except Exception as exc:  # pragma: no cover
             self._logger.error("Failed to embed query: %s", exc)
+            return np.empty(0, dtype=np.float32), {"status": "error", "error": str(exc)}
+
+    async def embed_queries(
+        self, queries: List[str]
+    ) -> Tuple[List[np.ndarray], Dict[str, Any]]:
+        """Embed ``queries``, encoding all cache misses in one forward pass."""
+        try:
+            await self._ensure_model()
+            assert self._model is not None
+            self._query_cache.bind_model(self._model_key())
+            cached = [self._query_cache.get(query) for query in queries]
+            misses = list(
+                dict.fromkeys(
+                    q for q, e in zip(queries, cached, strict=True) if e is None
+                )
+            )
+            if self.dashboard is not None:
+                hits = sum(embedding is not None for embedding in cached)
+                self.dashboard.record_cache("query_embedding", True, hits)
+                self.dashboard.record_cache("query_embedding", False, len(queries) - hits)
+            fresh: Dict[str, np.ndarray] = {}
+            if misses:
+                encoded = await asyncio.to_thread(self._encode_queries, misses)
+                fresh = {
+                    query: self._query_cache.put(query, vector)
+                    for query, vector in zip(misses, encoded, strict=True)
+                }
+            embeddings = [
+                fresh[query] if embedding is None else embedding
+                for query, embedding in zip(queries, cached, strict=True)
+            ]
+            return embeddings, {
+                "embedding_dimension": EMBEDDING_DIMENSION,
+                "encoded": len(misses),
+            }
+        except Exception as exc:  # pragma: no cover
+            self._logger.error("Failed to embed queries: %s", exc)
             return [], {"status": "error", "error": str(exc)}
 
+    def _encode_queries(self, queries: List[str]) -> np.ndarray:
+        """Encode a batch of queries in one forward pass (batcher thread)."""
+        assert self._model is not None
+        encode = getattr(self._ov_model, "encode", None)
+        if self.device == "gpu_openvino" and callable(encode):
+            return encode(queries)
+        return self._model.encode(
+            queries, batch_size=len(queries), show_progress_bar=False
+        )
+
     async def query(
-        self, query: str, top_k: int = 5
+        self, query: str, top_k: int = 5, timeout: float | None = None
     ) -> Tuple[List[Tuple[str, float]], Dict[str, Any]]:
-        """Query the Pinecone index with a text string."""
+        """Query the Pinecone index with a text string.
+
+        Returns no results at once, without embedding the query, while the
+        client's circuit breaker is open. ``timeout`` caps the client's
+        retries in seconds.
+        """
+        client = self.async_client or self.pinecone_client
+        if getattr(client, "circuit_open", False):
+            return [], {"status": "error", "error": "dense backend circuit open"}
         try:
             embedding, _ = await self.embed_query(query)
-            response = self.pinecone_client.query(self.index_name, embedding, top_k=top_k)
+            options: Dict[str, Any] = {} if timeout is None else {"timeout": timeout}
+            if self.async_client is not None:
+                response = await self.async_client.query(
+                    self.index_name, embedding, top_k=top_k, **options
+                )
+            else:
+                query_fn: Callable[..., Any] = self.pinecone_client.query
+                response = await asyncio.to_thread(
+                    query_fn, self.index_name, embedding, top_k=top_k, **options
+                )
             matches = getattr(response, "matches", [])
             results = [(m["id"], m["score"]) for m in matches]
             return results, {"retrieved": len(results)}
@@ -152,6 +371,71 @@ class DenseRetriever:
             self._logger.error("Dense query failed: %s", exc)
             return [], {"status": "error", "error": str(exc)}
 
+    async def query_batch(
+        self, queries: List[str], top_k: int = 5, timeout: float | None = None
+    ) -> List[Tuple[List[Tuple[str, float]], Dict[str, Any]]]:
+        """Run :meth:`query` for each of ``queries`` in one batch.
+
+        The queries are embedded together, then searched with one
+        ``query_batch`` call on a :class:`LocalVectorStore` or with concurrent
+        ``query`` calls on Pinecone.
+        """
+        client = self.async_client or self.pinecone_client
+        if getattr(client, "circuit_open", False):
+            return [
+                ([], {"status": "error", "error": "dense backend circuit open"})
+                for _ in queries
+            ]
+        embeddings, meta = await self.embed_queries(queries)
+        if len(embeddings) != len(queries):
+            return [([], dict(meta)) for _ in queries]
+        options = {} if timeout is None else {"timeout": timeout}
+        try:
+            if self.async_client is not None:
+                responses = await asyncio.gather(
+                    *(
+                        self.async_client.query(
+                            self.index_name, embedding, top_k=top_k, **options
+                        )
+                        for embedding in embeddings
+                    ),
+                    return_exceptions=True,
+                )
+            elif isinstance(self.pinecone_client, LocalVectorStore):
+                responses = await asyncio.to_thread(
+                    self.pinecone_client.query_batch,
+                    self.index_name,
+                    embeddings,
+                    top_k=top_k,
+                )
+            else:
+                responses = await asyncio.gather(
+                    *(
+                        asyncio.to_thread(
+                            self.pinecone_client.query,
+                            self.index_name,
+                            embedding,
+                            top_k=top_k,
+                            **options,
+                        )
+                        for embedding in embeddings
+                    ),
+                    return_exceptions=True,
+                )
+        except Exception as exc:  # pragma: no cover
+            self._logger.error("Dense batch query failed: %s", exc)
+            return [([], {"status": "error", "error": str(exc)}) for _ in queries]
+        replies: List[Tuple[List[Tuple[str, float]], Dict[str, Any]]] = []
+        for response in responses:
+            if isinstance(response, Exception):
+                self._logger.error("Dense query failed: %s", response)
+                replies.append(([], {"status": "error", "error": str(response)}))
+                continue
+            matches = getattr(response, "matches", [])
+            results = [(m["id"], m["score"]) for m in matches]
+            replies.append((results, {"retrieved": len(results)}))
+        return replies
+
     def validate_index(self) -> Tuple[bool, Dict[str, Any]]:
         """Validate Pinecone index dimension."""
         try:
@@ -170,7 +454,7 @@ class DenseRetriever:
             await self._ensure_model()
             delete = getattr(self.pinecone_client, "delete_embeddings", None)
             if delete:
-                delete(self.index_name, [doc_id])
+                await asyncio.to_thread(delete, self.index_name, [doc_id])
             return {"status": "success"}
         except Exception as exc:  # pragma: no cover
             self._logger.error("Failed to delete %s: %s", doc_id, exc)
@@ -189,13 +473,13 @@ class DenseRetriever:
             return {"status": "error", "error": str(exc)}
 
     # Synchronous wrappers for backward compatibility
-    def embed_query_sync(self, query: str) -> Tuple[List[float], Dict[str, Any]]:
-        return asyncio.run(self.embed_query(query))
+    def embed_query_sync(self, query: str) -> Tuple[np.ndarray, Dict[str, Any]]:
+        return run_sync(self.embed_query(query))
 
     def _embed_documents_sync(
         self, documents: List[str], batch_size: int = 32
-    ) -> List[List[float]]:
-        return asyncio.run(self._embed_documents(documents, batch_size))
+    ) -> np.ndarray:
+        return run_sync(self._embed_documents(documents, batch_size))
 
     def index_corpus_sync(
         self,
@@ -203,17 +487,22 @@ class DenseRetriever:
         metadatas: List[Dict[str, Any]],
         batch_size: int = 32,
     ) -> Tuple[List[str], Dict[str, Any]]:
-        return asyncio.run(self.index_corpus(documents, metadatas, batch_size=batch_size))
+        return run_sync(self.index_corpus(documents, metadatas, batch_size=batch_size))
 
     def query_sync(
-        self, query: str, top_k: int = 5
+        self, query: str, top_k: int = 5, timeout: float | None = None
     ) -> Tuple[List[Tuple[str, float]], Dict[str, Any]]:
-        return asyncio.run(self.query(query, top_k=top_k))
+        return run_sync(self.query(query, top_k=top_k, timeout=timeout))
+
+    def query_batch_sync(
+        self, queries: List[str], top_k: int = 5, timeout: float | None = None
+    ) -> List[Tuple[List[Tuple[str, float]], Dict[str, Any]]]:
+        return run_sync(self.query_batch(queries, top_k=top_k, timeout=timeout))
 
     def delete_document_sync(self, doc_id: str) -> Dict[str, Any]:
-        return asyncio.run(self.delete_document(doc_id))
+        return run_sync(self.delete_document(doc_id))
 
     def update_document_sync(
         self, doc_id: str, content: str, metadata: Dict[str, Any]
     ) -> Dict[str, Any]:
-        return asyncio.run(self.update_document(doc_id, content, metadata))
+        return run_sync(self.update_document(doc_id, content, metadata))
@@ -0,0 +1,105 @@
+"""Micro-batching of concurrent query encodes.
+
+Encoding one sentence at a time leaves most of the CPU's matrix throughput
+unused. :class:`EmbeddingBatcher` queues texts from any thread or event
+loop; a worker thread takes the first waiting text, collects more for up to
+``max_wait_ms`` or until ``max_batch_size`` are queued, encodes them in one
+call and resolves each caller's future with its row.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.monitoring.performance import MetricsDashboard
+
+DEFAULT_MAX_BATCH_SIZE = 32
+DEFAULT_MAX_WAIT_MS = 2.0
+
+
+class EmbeddingBatcher:
+    """Coalesce concurrent ``submit`` calls into batched ``encode`` calls.
+
+    ``encode`` maps a list of texts to a ``(len(texts), dimension)`` array.
+    Batch sizes and per-request queue waits are recorded on ``dashboard`` as
+    the ``query_batch_size`` and ``query_queue_wait_ms`` histograms.
+    """
+
+    def __init__(
+        self,
+        encode: Callable[[List[str]], np.ndarray],
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+        dashboard: MetricsDashboard | None = None,
+    ) -> None:
+        self._logger = logging.getLogger(__name__)
+        self.encode = encode
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max(0.0, max_wait_ms)
+        self.dashboard = dashboard
+        self._queue: "queue.SimpleQueue[Tuple[str, float, Future[np.ndarray]]]" = (
+            queue.SimpleQueue()
+        )
+        self._worker: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, text: str) -> "Future[np.ndarray]":
+        """Queue ``text``; the future resolves to its float32 embedding."""
+        future: Future[np.ndarray] = Future()
+        self._queue.put((text, time.perf_counter(), future))
+        if self._worker is None:
+            with self._start_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(
+                        target=self._run, name="embedding-batcher", daemon=True
+                    )
+                    self._worker.start()
+        return future
+
+    def _collect(self) -> List[Tuple[str, float, "Future[np.ndarray]"]]:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            if self.dashboard is not None:
+                self.dashboard.record_histogram("query_batch_size", len(batch))
+                for _, queued, _ in batch:
+                    self.dashboard.record_histogram(
+                        "query_queue_wait_ms", (started - queued) * 1000
+                    )
+            self._encode([text for text, _, _ in batch], [f for _, _, f in batch])
+
+    def _encode(self, texts: List[str], futures: Sequence["Future[np.ndarray]"]) -> None:
+        try:
+            embeddings = np.asarray(self.encode(texts), dtype=np.float32)
+            if embeddings.shape[0] != len(texts):
+                raise ValueError(
+                    f"encode returned {embeddings.shape[0]} rows for {len(texts)} texts"
+                )
+        except Exception as exc:
+            self._logger.error("Batched query encode failed: %s", exc)
+            for future in futures:
+                future.set_exception(exc)
+            return
+        for future, row in zip(futures, embeddings, strict=True):
+            future.set_result(row)
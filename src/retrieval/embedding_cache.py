@@ -0,0 +1,235 @@
+"""Caches for embeddings keyed by text.
+
+``QueryEmbeddingCache`` is a bounded LRU in front of query encoding: chat
+traffic repeats phrasings (follow-ups, retries, evaluation replays), and a
+hit skips the model forward pass. Entries belong to one model; binding a
+different model identity empties the cache.
+
+``DocumentEmbeddingCache`` persists document embeddings in SQLite, keyed by
+a hash of the encoder (model name, device and precision), model revision
+and chunk text, so re-ingesting a mostly unchanged tree only encodes the
+chunks that changed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_QUERY_CACHE_SIZE = 1024
+DEFAULT_DOCUMENT_CACHE_MB = 512
+# evict down to this fraction of the limit so eviction runs in batches
+_EVICT_TO = 0.9
+_SQL_VARIABLES = 500
+
+
+def normalize_query(text: str) -> str:
+    """Cache key for ``text``: NFC-normalised with whitespace collapsed.
+
+    Case is preserved because it can change the embedding of cased models.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class QueryEmbeddingCache:
+    """Thread-safe LRU of normalised query text to float32 embedding.
+
+    Cached arrays are read-only and returned without copying. A
+    ``max_size`` of 0 disables caching while still counting misses.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_QUERY_CACHE_SIZE) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._model_key: Optional[str] = None
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def bind_model(self, model_key: str) -> None:
+        """Associate the cache with ``model_key``, clearing it on change."""
+        with self._lock:
+            if model_key != self._model_key:
+                self._entries.clear()
+                self._model_key = model_key
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        key = normalize_query(text)
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+
+    def put(self, text: str, embedding: np.ndarray) -> np.ndarray:
+        """Store ``embedding`` for ``text`` and return the cached array."""
+        value = np.array(embedding, dtype=np.float32)
+        value.flags.writeable = False
+        if self.max_size <= 0:
+            return value
+        key = normalize_query(text)
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class DocumentEmbeddingCache:
+    """Content-addressed float32 embeddings in a SQLite file.
+
+    Rows are ``(key, vector, last_used)`` where ``key`` is the SHA-256 of
+    encoder identity, revision and text (see :meth:`key`). When the stored vectors
+    exceed ``max_bytes`` the least recently used rows are deleted.
+    """
+
+    def __init__(
+        self, path: str | Path, max_bytes: int = DEFAULT_DOCUMENT_CACHE_MB * 1024**2
+    ) -> None:
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key BLOB PRIMARY KEY, vector BLOB NOT NULL, last_used INTEGER NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS embeddings_last_used "
+                "ON embeddings (last_used)"
+            )
+        clock, size = self._conn.execute(
+            "SELECT COALESCE(MAX(last_used), 0), COALESCE(SUM(LENGTH(vector)), 0) "
+            "FROM embeddings"
+        ).fetchone()
+        self._clock = int(clock)
+        self._bytes = int(size)
+
+    @staticmethod
+    def key(model: str, revision: str, text: str) -> bytes:
+        return hashlib.sha256("\0".join((model, revision, text)).encode("utf-8")).digest()
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of stored vectors."""
+        return self._bytes
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(
+                self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            )
+
+    def get_many(self, keys: Sequence[bytes]) -> Dict[bytes, np.ndarray]:
+        """Vectors stored for ``keys``; absent keys are left out."""
+        found: Dict[bytes, np.ndarray] = {}
+        unique = list(dict.fromkeys(keys))
+        with self._lock:
+            self._clock += 1
+            for batch in _batches(unique):
+                marks = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({marks})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[bytes(key)] = np.frombuffer(blob, dtype=np.float32)
+            if found:
+                with self._conn:
+                    self._conn.executemany(
+                        "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                        [(self._clock, key) for key in found],
+                    )
+        return found
+
+    def put_many(self, keys: Sequence[bytes], vectors: np.ndarray) -> None:
+        """Store one row of ``vectors`` per key, then evict if over budget."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        # a repeated key keeps its last vector
+        entries = dict(zip(keys, vectors, strict=True))
+        with self._lock:
+            self._clock += 1
+            rows = [(key, row.tobytes(), self._clock) for key, row in entries.items()]
+            with self._conn:
+                for batch in _batches(list(entries)):
+                    marks = ",".join("?" * len(batch))
+                    (replaced,) = self._conn.execute(
+                        "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings "
+                        f"WHERE key IN ({marks})",
+                        batch,
+                    ).fetchone()
+                    self._bytes -= int(replaced)
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector, last_used) "
+                    "VALUES (?, ?, ?)",
+                    rows,
+                )
+                self._bytes += sum(len(blob) for _, blob, _ in rows)
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        target = int(self.max_bytes * _EVICT_TO)
+        with self._conn:
+            while self._bytes > target:
+                rows = self._conn.execute(
+                    "SELECT key, LENGTH(vector) FROM embeddings "
+                    "ORDER BY last_used LIMIT ?",
+                    (_SQL_VARIABLES,),
+                ).fetchall()
+                if not rows:
+                    self._bytes = 0
+                    break
+                drop: List[bytes] = []
+                for key, size in rows:
+                    if self._bytes <= target:
+                        break
+                    drop.append(key)
+                    self._bytes -= int(size)
+                self._conn.executemany(
+                    "DELETE FROM embeddings WHERE key = ?", [(key,) for key in drop]
+                )
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM embeddings")
+            self._bytes = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _batches(items: List[bytes]) -> Iterable[List[bytes]]:
+    for start in range(0, len(items), _SQL_VARIABLES):
+        yield items[start : start + _SQL_VARIABLES]  # noqa: E203
@@ -0,0 +1,145 @@
+"""Multi-process document embedding for bulk ingestion.
+
+One ``SentenceTransformer`` in one process tops out at a single set of
+intra-op threads. :class:`EmbeddingPool` starts ``workers`` spawned
+processes, each loading its own model copy pinned to ``threads`` threads
+(see :mod:`src.retrieval.embedding_worker` for how the limits are set
+before numpy or torch load), deals the chunk stream out to them in contiguous shards and reassembles the
+embeddings in input order. Workers start on first use and are reused by
+every later ingest until :meth:`EmbeddingPool.close`.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from itertools import repeat
+from typing import Any, Callable, List
+
+import numpy as np
+
+from src.retrieval import embedding_worker
+from src.utils.batching import length_sorted_batches, token_lengths
+
+# texts per task; several shards per worker keep them busy when lengths vary
+DEFAULT_SHARD_SIZE = 256
+
+_worker_model: Any | None = None
+
+
+def load_sentence_transformer(name: str, revision: str) -> Any:
+    """Load ``name`` at ``revision`` on CPU (the default worker model factory)."""
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(name, revision=revision, device="cpu")
+
+
+def init_worker(factory: Callable[[], Any], threads: int) -> None:
+    """Pin the worker's torch thread pools, then load its model copy.
+
+    Runs in the worker after :func:`~src.retrieval.embedding_worker.initialize`
+    has exported the thread limits.
+    """
+    global _worker_model
+    try:
+        import torch
+
+        torch.set_num_threads(threads)
+        torch.set_num_interop_threads(1)
+    except Exception:  # pragma: no cover - torch missing or pools already started
+        pass
+    _worker_model = factory()
+
+
+def _encode_shard(texts: List[str], batch_size: int) -> np.ndarray:
+    """Process-pool entry point: embed ``texts`` in length-bucketed batches."""
+    assert _worker_model is not None
+    lengths = token_lengths(getattr(_worker_model, "tokenizer", None), texts)
+    rows: List[np.ndarray] = [np.empty(0, np.float32)] * len(texts)
+    for batch in length_sorted_batches(lengths, batch_size):
+        encoded = _worker_model.encode(
+            [texts[i] for i in batch], batch_size=len(batch), show_progress_bar=False
+        )
+        for i, row in zip(batch, np.asarray(encoded, dtype=np.float32), strict=True):
+            rows[i] = row
+    return np.stack(rows) if rows else np.empty((0, 0), np.float32)
+
+
+class EmbeddingPool:
+    """Persistent pool of model-holding worker processes.
+
+    ``factory`` is a picklable zero-argument callable returning an object
+    with ``encode`` (and ideally ``tokenizer``); it runs once per worker.
+    ``threads`` defaults to an even split of the machine's cores.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        workers: int,
+        threads: int = 0,
+        shard_size: int = DEFAULT_SHARD_SIZE,
+    ) -> None:
+        self._logger = logging.getLogger(__name__)
+        self.factory = factory
+        self.workers = max(1, workers)
+        self.threads = (
+            threads if threads > 0 else max(1, (os.cpu_count() or 1) // self.workers)
+        )
+        self.shard_size = max(1, shard_size)
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_model(
+        cls, name: str, revision: str, workers: int, threads: int = 0
+    ) -> "EmbeddingPool":
+        """Pool whose workers each load ``name`` at ``revision``."""
+        return cls(partial(load_sentence_transformer, name, revision), workers, threads)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    # the factory travels pickled so that unpickling it, which
+                    # imports numpy, waits until the worker set its limits
+                    initializer=embedding_worker.initialize,
+                    initargs=(self.threads, pickle.dumps(self.factory)),
+                )
+                self._logger.info(
+                    "Started %d embedding workers with %d threads each",
+                    self.workers,
+                    self.threads,
+                )
+            return self._executor
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """Embed ``texts`` across the workers as a float32 matrix in input order."""
+        if not texts:
+            return np.empty((0, 0), np.float32)
+        # at least one shard per worker, but no bigger than shard_size
+        size = min(self.shard_size, -(-len(texts) // self.workers))
+        starts = range(0, len(texts), size)
+        shards = [texts[start : start + size] for start in starts]  # noqa: E203
+        try:
+            results = self._pool().map(_encode_shard, shards, repeat(batch_size))
+            return np.concatenate(list(results))
+        except BrokenProcessPool:
+            # a worker died (or its model failed to load); restart on next use
+            self.close()
+            raise
+
+    def close(self) -> None:
+        """Shut the worker processes down; the next ``encode`` restarts them."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+            self._executor = None
@@ -0,0 +1,25 @@
+"""Start-up of :class:`~src.retrieval.embedding_pool.EmbeddingPool` workers.
+
+The OpenMP, MKL and OpenBLAS runtimes read their thread counts once, when
+numpy or torch first loads them, so a pool initializer living next to the
+pool code would run too late. A spawned worker only imports this module,
+which needs nothing but the standard library, before :func:`initialize`
+exports the limits in the worker's own environment; the model factory is
+unpickled, and numpy, torch and the pool module imported, after that.
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+
+THREAD_VARIABLES = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+def initialize(threads: int, factory: bytes) -> None:
+    """Limit the worker to ``threads`` threads, then load the pickled ``factory``."""
+    for variable in THREAD_VARIABLES:
+        os.environ[variable] = str(threads)
+    from src.retrieval.embedding_pool import init_worker
+
+    init_worker(pickle.loads(factory), threads)
@@ -1,8 +1,9 @@
 """Hybrid retrieval combining dense and lexical methods with RRF fusion."""
 
+import functools
 import logging
 from concurrent.futures import ThreadPoolExecutor
-from typing import Any, Callable, Dict, List, Tuple, cast
+from typing import Any, Callable, Dict, List, Optional, Tuple, cast
 
 from ..ranking.reranker import CrossEncoderReranker
 from ..ranking.rrf_fusion import DEFAULT_RRF_K, rrf_fusion
@@ -10,9 +11,20 @@ from .dense import DenseRetriever
 from .lexical import LexicalBM25
 from .query_analysis import analyze_query
 
+# Concurrent queries served before hybrid legs queue for a thread
+DEFAULT_MAX_CONCURRENT_QUERIES = 16
+
+# (doc_id, score) hits of one retriever leg and its metadata
+_LegResult = Tuple[List[Tuple[str, float]], Dict[str, Any]]
+
 
 class HybridRetriever:
-    """Orchestrates dense and lexical retrievers with per-query modes."""
+    """Orchestrates dense and lexical retrievers with per-query modes.
+
+    The two legs of a hybrid query run on a thread pool shared by all
+    requests and sized for ``max_concurrent_queries`` queries in flight;
+    :meth:`close` shuts it down.
+    """
 
     def __init__(
         self,
@@ -20,12 +32,24 @@ class HybridRetriever:
         lexical_retriever: LexicalBM25,
         default_mode: str = "hybrid",
         reranker: CrossEncoderReranker | None = None,
+        exact_match_max_hits: int = 0,
+        max_concurrent_queries: int = DEFAULT_MAX_CONCURRENT_QUERIES,
     ) -> None:
         self._logger = logging.getLogger(__name__)
         self.dense = dense_retriever
         self.lexical = lexical_retriever
         self.default_mode = default_mode
         self.reranker = reranker
+        self.exact_match_max_hits = exact_match_max_hits
+        # reused across queries so the hybrid legs don't pay for thread startup;
+        # every query submits two legs
+        self._executor = ThreadPoolExecutor(
+            max_workers=2 * max(1, max_concurrent_queries), thread_name_prefix="hybrid"
+        )
+
+    def close(self) -> None:
+        """Stop the leg thread pool, waiting for running queries."""
+        self._executor.shutdown()
 
     def query(
         self,
@@ -39,11 +63,13 @@ class HybridRetriever:
         session_id: str = "default",
         timeout: float = 1.0,
     ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Retrieve ``top_k`` documents for ``query`` in ``mode``.
+
+        ``timeout`` (seconds) bounds both the dense backend's retries and
+        the reranker.
+        """
         selected_mode = mode or self.default_mode
-        dense_query_fn = cast(
-            Callable[..., Tuple[List[Tuple[str, float]], Dict[str, Any]]],
-            getattr(self.dense, "query_sync", self.dense.query),
-        )
+        dense_query_fn = self._dense_query_fn(timeout)
         if selected_mode == "dense":
             results, meta = dense_query_fn(query, top_k=top_k)
             wrapped = [
@@ -61,20 +87,169 @@ class HybridRetriever:
             meta.update({"retrieval_mode": "lexical"})
             return wrapped, meta
 
+        exact = self._exact_match(query, top_k)
+        if exact is not None:
+            return exact
+
+        pre_rerank_k = 20 if enable_rerank else top_k
+        dense_future = self._executor.submit(dense_query_fn, query, pre_rerank_k)
+        lexical_future = self._executor.submit(self.lexical.query, query, pre_rerank_k)
+        try:
+            dense_results, _ = dense_future.result()
+        except Exception as exc:  # pragma: no cover - logged for observability
+            self._logger.error("Dense retrieval failed: %s", exc)
+            dense_results = []
+        try:
+            lexical_results, _ = lexical_future.result()
+        except Exception as exc:  # pragma: no cover - logged for observability
+            self._logger.error("Lexical retrieval failed: %s", exc)
+            lexical_results = []
+        return self._fuse(
+            query,
+            dense_results,
+            lexical_results,
+            top_k=top_k,
+            k=k,
+            w_dense=w_dense,
+            w_lexical=w_lexical,
+            enable_rerank=enable_rerank,
+            session_id=session_id,
+            timeout=timeout,
+        )
+
+    def query_batch(
+        self,
+        queries: List[str],
+        mode: str | None = None,
+        top_k: int = 5,
+        k: int = DEFAULT_RRF_K,
+        w_dense: float = 1.0,
+        w_lexical: float = 1.0,
+        enable_rerank: bool = False,
+        session_id: str = "default",
+        timeout: float = 1.0,
+    ) -> List[Tuple[List[Dict[str, Any]], Dict[str, Any]]]:
+        """Run :meth:`query` for each of ``queries`` with batched legs.
+
+        The dense leg embeds and searches all queries together and the
+        lexical leg scores them in one pass; fusion and reranking then run
+        per query, so each result equals that of :meth:`query`.
+        """
+        selected_mode = mode or self.default_mode
+        if selected_mode == "dense":
+            replies = self._dense_batch(queries, top_k, timeout)
+            return [
+                (
+                    [
+                        {"id": doc_id, "score": score, "source": "dense"}
+                        for doc_id, score in results
+                    ],
+                    {**meta, "retrieval_mode": "dense"},
+                )
+                for results, meta in replies
+            ]
+        if selected_mode == "lexical":
+            replies = self._lexical_batch(queries, top_k)
+            return [
+                (
+                    [
+                        {"id": doc_id, "score": score, "source": "lexical"}
+                        for doc_id, score in results
+                    ],
+                    {**meta, "retrieval_mode": "lexical"},
+                )
+                for results, meta in replies
+            ]
+
+        answers: List[Tuple[List[Dict[str, Any]], Dict[str, Any]] | None] = [
+            self._exact_match(query, top_k) for query in queries
+        ]
+        pending = [
+            query
+            for query, answer in zip(queries, answers, strict=True)
+            if answer is None
+        ]
+        if not pending:
+            return cast(List[Tuple[List[Dict[str, Any]], Dict[str, Any]]], answers)
+        pre_rerank_k = 20 if enable_rerank else top_k
+        dense_future = self._executor.submit(
+            self._dense_batch, pending, pre_rerank_k, timeout
+        )
+        lexical_future = self._executor.submit(self._lexical_batch, pending, pre_rerank_k)
+        dense_replies: List[_LegResult]
+        lexical_replies: List[_LegResult]
+        try:
+            dense_replies = dense_future.result()
+        except Exception as exc:  # pragma: no cover - logged for observability
+            self._logger.error("Dense retrieval failed: %s", exc)
+            dense_replies = [([], {}) for _ in pending]
+        try:
+            lexical_replies = lexical_future.result()
+        except Exception as exc:  # pragma: no cover - logged for observability
+            self._logger.error("Lexical retrieval failed: %s", exc)
+            lexical_replies = [([], {}) for _ in pending]
+        fused = iter(
+            self._fuse(
+                query,
+                dense_results,
+                lexical_results,
+                top_k=top_k,
+                k=k,
+                w_dense=w_dense,
+                w_lexical=w_lexical,
+                enable_rerank=enable_rerank,
+                session_id=session_id,
+                timeout=timeout,
+            )
+            for query, (dense_results, _), (lexical_results, _) in zip(
+                pending, dense_replies, lexical_replies, strict=True
+            )
+        )
+        return [next(fused) if answer is None else answer for answer in answers]
+
+    def _dense_batch(
+        self, queries: List[str], top_k: int, timeout: float
+    ) -> List[_LegResult]:
+        query_batch: Callable[..., List[_LegResult]] | None = getattr(
+            self.dense, "query_batch_sync", None
+        )
+        if callable(query_batch):
+            return query_batch(queries, top_k=top_k, timeout=timeout)
+        query_fn = self._dense_query_fn(timeout)
+        return [query_fn(query, top_k=top_k) for query in queries]
+
+    def _dense_query_fn(self, timeout: float) -> Callable[..., _LegResult]:
+        """Blocking dense query; ``query_sync`` backends are bounded by ``timeout``."""
+        query_sync: Callable[..., _LegResult] | None = getattr(
+            self.dense, "query_sync", None
+        )
+        if callable(query_sync):
+            return functools.partial(query_sync, timeout=timeout)
+        return cast(Callable[..., _LegResult], self.dense.query)
+
+    def _lexical_batch(self, queries: List[str], top_k: int) -> List[_LegResult]:
+        query_batch: Callable[..., List[_LegResult]] | None = getattr(
+            self.lexical, "query_batch", None
+        )
+        if callable(query_batch):
+            return query_batch(queries, top_k=top_k)
+        return [self.lexical.query(query, top_k=top_k) for query in queries]
+
+    def _fuse(
+        self,
+        query: str,
+        dense_results: List[Tuple[str, float]],
+        lexical_results: List[Tuple[str, float]],
+        top_k: int,
+        k: int,
+        w_dense: float,
+        w_lexical: float,
+        enable_rerank: bool,
+        session_id: str,
+        timeout: float,
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """RRF-fuse one query's dense and lexical lists, then rerank or cut."""
         pre_rerank_k = 20 if enable_rerank else top_k
-        with ThreadPoolExecutor(max_workers=2) as executor:
-            dense_future = executor.submit(dense_query_fn, query, pre_rerank_k)
-            lexical_future = executor.submit(self.lexical.query, query, pre_rerank_k)
-            try:
-                dense_results, _ = dense_future.result()
-            except Exception as exc:  # pragma: no cover - logged for observability
-                self._logger.error("Dense retrieval failed: %s", exc)
-                dense_results = []
-            try:
-                lexical_results, _ = lexical_future.result()
-            except Exception as exc:  # pragma: no cover - logged for observability
-                self._logger.error("Lexical retrieval failed: %s", exc)
-                lexical_results = []
         dense_meta = {
             doc_id: {"rank": rank, "score": score}
             for rank, (doc_id, score) in enumerate(dense_results, start=1)
@@ -103,18 +278,7 @@ class HybridRetriever:
         meta.update(analysis_meta)
         meta.update({"retrieval_mode": "hybrid"})
 
-        text_lookup = {}
-        if hasattr(self.lexical, "doc_ids") and hasattr(
-            self.lexical, "documents"
-        ):  # noqa: E501
-            text_lookup = {
-                doc_id: text
-                for doc_id, text in zip(  # noqa: E501
-                    self.lexical.doc_ids, self.lexical.documents, strict=False
-                )
-            }
-        for doc in merged:
-            doc["text"] = text_lookup.get(doc["id"], "")
+        self._attach_text(merged)
 
         reranked_meta = {"reranked": False, "latency_ms": 0}
         if enable_rerank and self.reranker:
@@ -131,3 +295,66 @@ class HybridRetriever:
 
         meta.update(reranked_meta)
         return merged, meta
+
+    def _exact_match(
+        self, query: str, top_k: int
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]] | None:
+        """Answer identifier lookups from the lexical exact-match index.
+
+        When the query contains identifiers such as ``AB-123`` and at most
+        ``exact_match_max_hits`` documents contain them, those documents are
+        returned directly and the dense leg, fusion and reranking are skipped.
+        """
+        match_identifiers: (
+            Callable[..., Tuple[List[str], List[Tuple[str, float]]]] | None
+        ) = getattr(self.lexical, "match_identifiers", None)
+        if self.exact_match_max_hits <= 0 or not callable(match_identifiers):
+            return None
+        identifiers, hits = match_identifiers(query, limit=self.exact_match_max_hits + 1)
+        if not hits or len(hits) > self.exact_match_max_hits:
+            return None
+        results = [
+            {"id": doc_id, "score": score, "source": "exact"}
+            for doc_id, score in hits[:top_k]
+        ]
+        self._attach_text(results)
+        meta: Dict[str, Any] = {
+            "retrieval_mode": "exact",
+            "identifiers": identifiers,
+            "exact_matches": len(hits),
+            "component_scores": {
+                doc_id: {"exact": {"rank": rank, "score": score}}
+                for rank, (doc_id, score) in enumerate(hits[:top_k], start=1)
+            },
+            "reranked": False,
+            "latency_ms": 0,
+        }
+        return results, meta
+
+    def _attach_text(self, docs: List[Dict[str, Any]]) -> None:
+        get_documents: Callable[[List[str]], List[Optional[str]]] | None = getattr(
+            self.lexical, "get_documents", None
+        )
+        get_document: Callable[[str], Optional[str]] | None = getattr(
+            self.lexical, "get_document", None
+        )
+        text_lookup: Dict[str, str] = {}
+        if callable(get_documents):
+            ids = [doc["id"] for doc in docs]
+            text_lookup = {
+                doc_id: text or ""
+                for doc_id, text in zip(ids, get_documents(ids), strict=True)
+            }
+        elif callable(get_document):
+            text_lookup = {doc["id"]: get_document(doc["id"]) or "" for doc in docs}
+        elif hasattr(self.lexical, "doc_ids") and hasattr(
+            self.lexical, "documents"
+        ):  # noqa: E501
+            text_lookup = {
+                doc_id: text
+                for doc_id, text in zip(  # noqa: E501
+                    self.lexical.doc_ids, self.lexical.documents, strict=False
+                )
+            }
+        for doc in docs:
+            doc["text"] = text_lookup.get(doc["id"], "")
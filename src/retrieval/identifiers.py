@@ -0,0 +1,122 @@
+"""Exact-match index over identifier tokens such as ticket numbers.
+
+Queries like ``AB-123`` name a document rather than describe it. The
+:class:`IdentifierIndex` maps every identifier found in the corpus to the
+documents containing it, so such lookups are a dictionary access instead
+of a BM25 pass plus a dense embedding round trip.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from .lexical_snapshot import StringTable
+
+RARE_TOKEN_PATTERN = re.compile(r"[A-Z]{2,}\-?\d+")
+
+
+def extract_identifiers(text: str) -> List[str]:
+    """Return identifiers in ``text``, normalised so ``AB-123 == AB123``."""
+    return [match.replace("-", "") for match in RARE_TOKEN_PATTERN.findall(text)]
+
+
+class IdentifierIndex:
+    """Inverted index from normalised identifiers to document ids.
+
+    Postings keep the number of occurrences per document, which is the score
+    reported by :meth:`search`. Documents are re-indexed wholesale: adding
+    an id that is already present replaces its identifiers.
+    """
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._by_doc: Dict[str, Tuple[str, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._postings)
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._by_doc.clear()
+
+    def add(self, doc_id: str, text: str) -> None:
+        self.remove(doc_id)
+        counts = Counter(extract_identifiers(text))
+        if not counts:
+            return
+        for identifier, count in counts.items():
+            self._postings.setdefault(identifier, {})[doc_id] = count
+        self._by_doc[doc_id] = tuple(counts)
+
+    def remove(self, doc_id: str) -> None:
+        for identifier in self._by_doc.pop(doc_id, ()):
+            docs = self._postings[identifier]
+            del docs[doc_id]
+            if not docs:
+                del self._postings[identifier]
+
+    def search(
+        self, query: str, limit: int | None = None
+    ) -> Tuple[List[str], List[Tuple[str, float]]]:
+        """Return the query's identifiers and the documents containing them.
+
+        Documents are ranked by how often they mention the queried
+        identifiers; ``limit`` caps the hit list.
+        """
+        identifiers = list(dict.fromkeys(extract_identifiers(query)))
+        scores: Dict[str, int] = {}
+        for identifier in identifiers:
+            for doc_id, count in self._postings.get(identifier, {}).items():
+                scores[doc_id] = scores.get(doc_id, 0) + count
+        ranked = sorted(scores.items(), key=lambda item: -item[1])
+        if limit is not None:
+            ranked = ranked[:limit]
+        return identifiers, [(doc_id, float(score)) for doc_id, score in ranked]
+
+    # ------------------------------------------------------------------
+    # snapshot support
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Encode the postings as flat arrays for a lexical snapshot."""
+        keys = list(self._postings)
+        docs = [doc for key in keys for doc in self._postings[key]]
+        counts = [count for key in keys for count in self._postings[key].values()]
+        indptr = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum([len(self._postings[key]) for key in keys], out=indptr[1:])
+        key_table = StringTable.from_strings(keys)
+        doc_table = StringTable.from_strings(docs)
+        return {
+            "keys.blob": key_table.blob,
+            "keys.offsets": key_table.offsets,
+            "docs.blob": doc_table.blob,
+            "docs.offsets": doc_table.offsets,
+            "indptr": indptr,
+            "counts": np.asarray(counts, dtype=np.int64),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "IdentifierIndex":
+        index = cls()
+        keys = StringTable(arrays["keys.blob"], arrays["keys.offsets"]).tolist()
+        docs = StringTable(arrays["docs.blob"], arrays["docs.offsets"]).tolist()
+        counts = arrays["counts"].tolist()
+        bounds = arrays["indptr"].tolist()
+        by_doc: Dict[str, List[str]] = {}
+        for key, start, end in zip(keys, bounds[:-1], bounds[1:], strict=True):
+            index._postings[key] = dict(
+                zip(docs[start:end], counts[start:end], strict=True)
+            )
+            for doc_id in docs[start:end]:
+                by_doc.setdefault(doc_id, []).append(key)
+        index._by_doc = {doc_id: tuple(names) for doc_id, names in by_doc.items()}
+        return index
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[Tuple[str, str]]) -> "IdentifierIndex":
+        index = cls()
+        for doc_id, text in documents:
+            index.add(doc_id, text)
+        return index
@@ -1,8 +1,21 @@
+import heapq
 import logging
+import math
+import multiprocessing
+import os
 import re
-from typing import Any, Callable, Dict, List, Optional, Tuple
+import threading
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from itertools import pairwise, repeat
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
 
-from rank_bm25 import BM25Okapi
+import numpy as np
+
+from .identifiers import IdentifierIndex
+from .lexical_snapshot import StringTable, read_snapshot, write_snapshot
 
 try:  # pragma: no cover - optional dependency
     from nltk.stem import PorterStemmer
@@ -12,29 +25,518 @@ except Exception:  # pragma: no cover
 
 Tokenizer = Callable[[str], List[str]]
 
+# BM25Okapi parameters (same defaults as ``rank_bm25``)
+BM25_K1 = 1.5
+BM25_B = 0.75
+BM25_EPSILON = 0.25
+
+_EMPTY_SLOTS = np.zeros(0, dtype=np.int64)
+_EMPTY_SCORES = np.zeros(0, dtype=np.float64)
+
+# Segment merge policy
+DEFAULT_MAX_SEGMENTS = 8
+DEFAULT_MERGE_FACTOR = 4
+# Segments whose share of tombstoned postings exceeds this are compacted
+DEFAULT_COMPACTION_THRESHOLD = 0.3
+
+# Array layout written into snapshot metadata; bumped when it changes
+SNAPSHOT_LAYOUT = 2
+
+# Batch preprocessing: batches of at least ``PARALLEL_MIN_DOCS`` documents are
+# tokenized by a process pool in chunks of ``PREPROCESS_CHUNK_SIZE``
+DEFAULT_PREPROCESS_WORKERS = min(4, os.cpu_count() or 1)
+PARALLEL_MIN_DOCS = 2048
+PREPROCESS_CHUNK_SIZE = 512
+DEFAULT_STEM_CACHE_SIZE = 65536
+
+# Batched queries are scored in chunks of at most ``BATCH_SCORE_CELLS``
+# (query, document) cells; chunks with fewer than one posting per
+# ``SPARSE_BATCH_RATIO`` cells are summed by sorting instead of densely
+BATCH_SCORE_CELLS = 1 << 16
+SPARSE_BATCH_RATIO = 8
+
 
 def default_tokenizer(text: str) -> List[str]:
     """Simple regex-based tokenizer."""
     return re.findall(r"\b\w+\b", text.lower())
 
 
-class LexicalBM25:
-    """Lexical retrieval using BM25Okapi with optional stemming."""
+def _cached_stemmer(cache_size: int) -> Callable[[str], str]:
+    """Return ``PorterStemmer().stem`` memoized in a bounded LRU cache."""
+    assert PorterStemmer is not None
+    stemmer: Any = PorterStemmer()  # nltk ships no type stubs
+    stem: Callable[[str], str] = stemmer.stem
+    return lru_cache(maxsize=cache_size)(stem)
+
+
+_worker_stem: Callable[[str], str] | None = None
+
+
+def _preprocess_chunk(
+    texts: List[str], tokenizer: Tokenizer, stemming: bool, cache_size: int
+) -> List[List[str]]:
+    """Process-pool entry point; each worker keeps its own stem cache."""
+    global _worker_stem
+    stem = None
+    if stemming:
+        if _worker_stem is None:
+            _worker_stem = _cached_stemmer(cache_size)
+        stem = _worker_stem
+    token_lists = [tokenizer(text) for text in texts]
+    if stem is None:
+        return token_lists
+    return [[stem(tok) for tok in tokens] for tokens in token_lists]
+
+
+class _Segment:
+    """Immutable BM25 term-weight matrix over one batch of documents.
+
+    Terms are addressed by their id in the index vocabulary. Postings are
+    stored column-wise (CSC): ``term_ids[c]`` is the (ascending) term id of
+    column ``c`` and ``indices[indptr[c]:indptr[c + 1]]`` lists the local
+    documents containing it, with matching frequencies in ``tf``. Documents
+    are addressed by their global slot, kept in ascending order. Arrays may
+    be read-only views into a memory-mapped snapshot; the ``deleted`` bitmap
+    is the only mutable part and marks postings superseded by an update or
+    removed by a delete.
+    """
 
     def __init__(
         self,
-        tokenizer: Optional[Tokenizer] = None,
-        enable_stemming: bool = False,
+        slots: np.ndarray,
+        doc_len: np.ndarray,
+        term_ids: np.ndarray,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        tf: np.ndarray,
+        deleted: np.ndarray | None = None,
+    ) -> None:
+        self.slots = slots
+        self.doc_len = doc_len
+        self.term_ids = term_ids
+        self.indptr = indptr
+        self.indices = indices
+        self.tf = tf
+        self.deleted = (
+            np.array(deleted, dtype=bool)
+            if deleted is not None
+            else np.zeros(len(slots), dtype=bool)
+        )
+        self.dead = int(self.deleted.sum())
+        self._rows: Tuple[np.ndarray, np.ndarray, np.ndarray] | None = None
+        self._weights: Tuple[float, np.ndarray] | None = None
+        self._column_max: Tuple[float, np.ndarray] | None = None
+
+    @classmethod
+    def from_postings(
+        cls,
+        slots: np.ndarray,
+        doc_len: np.ndarray,
+        docs: np.ndarray,
+        terms: np.ndarray,
+        tf: np.ndarray,
+    ) -> "_Segment":
+        """Build a segment from ``(local doc, term id, tf)`` postings."""
+        order = np.lexsort((docs, terms))
+        term_ids, counts = np.unique(terms[order], return_counts=True)
+        indptr = np.zeros(len(term_ids) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        segment = cls(
+            np.asarray(slots, dtype=np.int64),
+            np.asarray(doc_len, dtype=np.float64),
+            term_ids.astype(np.int32),
+            indptr,
+            docs[order].astype(np.int32),
+            tf[order].astype(np.int32),
+        )
+        row_order = np.lexsort((terms, docs))
+        row_ptr = np.zeros(len(slots) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(docs, minlength=len(slots)), out=row_ptr[1:])
+        segment._rows = (
+            row_ptr,
+            terms[row_order].astype(np.int32),
+            tf[row_order].astype(np.int32),
+        )
+        return segment
+
+    @classmethod
+    def from_token_ids(
+        cls, slots: Sequence[int], id_lists: Sequence[np.ndarray]
+    ) -> "_Segment":
+        lengths = np.fromiter((len(ids) for ids in id_lists), np.int64, len(id_lists))
+        docs = np.repeat(np.arange(len(id_lists), dtype=np.int64), lengths)
+        ids = np.concatenate([np.zeros(0, dtype=np.int64), *id_lists]).astype(np.int64)
+        width = int(ids.max()) + 1 if len(ids) else 1
+        keys, tf = np.unique(docs * width + ids, return_counts=True)
+        return cls.from_postings(
+            np.asarray(slots, dtype=np.int64),
+            lengths.astype(np.float64),
+            keys // width,
+            keys % width,
+            tf,
+        )
+
+    @property
+    def rows(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Forward (CSR) view: ``row_ptr``, term ids and frequencies per document.
+
+        Freshly built segments keep the view from construction; segments
+        loaded from a snapshot transpose their postings on first use.
+        """
+        if self._rows is None:
+            terms = np.repeat(self.term_ids, np.diff(self.indptr))
+            order = np.argsort(self.indices, kind="stable")
+            row_ptr = np.zeros(len(self.slots) + 1, dtype=np.int64)
+            np.cumsum(
+                np.bincount(self.indices, minlength=len(self.slots)), out=row_ptr[1:]
+            )
+            self._rows = (row_ptr, terms[order], self.tf[order])
+        return self._rows
+
+    def row_terms(self, local: int) -> np.ndarray:
+        """Term ids of the document at ``local``."""
+        row_ptr, terms, _ = self.rows
+        start, end = row_ptr[local], row_ptr[local + 1]
+        return terms[start:end]
+
+    def weights(self, avgdl: float) -> np.ndarray:
+        """Return ``tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl))``.
+
+        The matrix is computed once per ``avgdl`` and reused by every query
+        until the corpus statistics change.
+        """
+        cached = self._weights
+        if cached is not None and cached[0] == avgdl:
+            return cached[1]
+        tf = self.tf.astype(np.float64)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_len[self.indices] / avgdl)
+        weights = tf * (BM25_K1 + 1) / (tf + norm)
+        self._weights = (avgdl, weights)
+        return weights
+
+    def score(
+        self, term_ids: np.ndarray, query_weights: np.ndarray, avgdl: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Multiply the weight matrix by the sparse query vector.
+
+        Only the columns of query terms are read, so the returned slots are
+        exactly the live documents touched by the query.
+        """
+        if not len(self.term_ids):
+            return _EMPTY_SLOTS, _EMPTY_SCORES
+        pos = np.minimum(np.searchsorted(self.term_ids, term_ids), len(self.term_ids) - 1)
+        hit = self.term_ids[pos] == term_ids
+        if not hit.any():
+            return _EMPTY_SLOTS, _EMPTY_SCORES
+        weights = self.weights(avgdl)
+        starts = self.indptr[pos[hit]].tolist()
+        ends = self.indptr[pos[hit] + 1].tolist()
+        docs = np.concatenate(
+            [self.indices[a:b] for a, b in zip(starts, ends, strict=True)]
+        )
+        contrib = np.concatenate(
+            [
+                weights[a:b] * weight
+                for a, b, weight in zip(
+                    starts, ends, query_weights[hit].tolist(), strict=True
+                )
+            ]
+        )
+        touched, inverse = np.unique(docs, return_inverse=True)
+        scores = np.bincount(inverse, weights=contrib, minlength=len(touched))
+        if self.dead:
+            keep = ~self.deleted[touched]
+            touched, scores = touched[keep], scores[keep]
+        return self.slots[touched], scores
+
+    def score_batch(
+        self,
+        term_ids: np.ndarray,
+        query_weights: np.ndarray,
+        owners: np.ndarray,
+        num_queries: int,
+        avgdl: float,
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """:meth:`score` for ``num_queries`` concatenated query vectors at once.
+
+        ``owners`` gives the query each term belongs to (non-decreasing). The
+        postings of all query terms are gathered in one pass and summed per
+        ``(query, document)`` cell with a single ``bincount`` per chunk of at
+        most ``BATCH_SCORE_CELLS`` cells. Contributions are added in the same
+        order as :meth:`score` adds them, so the scores are identical bit for
+        bit.
+        """
+        if not len(self.term_ids) or not len(term_ids):
+            return [(_EMPTY_SLOTS, _EMPTY_SCORES)] * num_queries
+        per_chunk = max(1, BATCH_SCORE_CELLS // len(self.slots))
+        scored: List[Tuple[np.ndarray, np.ndarray]] = []
+        for first in range(0, num_queries, per_chunk):
+            count = min(per_chunk, num_queries - first)
+            lo, hi = np.searchsorted(owners, [first, first + count]).tolist()
+            scored.extend(
+                self._score_chunk(
+                    term_ids[lo:hi],
+                    query_weights[lo:hi],
+                    owners[lo:hi] - first,
+                    count,
+                    avgdl,
+                )
+            )
+        return scored
+
+    def _score_chunk(
+        self,
+        term_ids: np.ndarray,
+        query_weights: np.ndarray,
+        owners: np.ndarray,
+        num_queries: int,
+        avgdl: float,
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        pos = np.minimum(np.searchsorted(self.term_ids, term_ids), len(self.term_ids) - 1)
+        hit = self.term_ids[pos] == term_ids
+        if not hit.any():
+            return [(_EMPTY_SLOTS, _EMPTY_SCORES)] * num_queries
+        starts = self.indptr[pos[hit]]
+        lengths = self.indptr[pos[hit] + 1] - starts
+        # positions of every posting of every hit column, column by column
+        offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        postings = offsets + np.arange(int(lengths.sum()))
+        width = len(self.slots)
+        keys = np.repeat(owners[hit].astype(np.int64), lengths) * width
+        keys += self.indices[postings]
+        contrib = self.weights(avgdl)[postings] * np.repeat(query_weights[hit], lengths)
+        cells = num_queries * width
+        if len(keys) * SPARSE_BATCH_RATIO < cells:  # sort a few postings
+            touched, inverse = np.unique(keys, return_inverse=True)
+            scores = np.bincount(inverse, weights=contrib, minlength=len(touched))
+        else:  # accumulate many postings densely
+            dense = np.bincount(keys, weights=contrib, minlength=cells)
+            if (contrib > 0).all():  # sums of positive weights mark the touched cells
+                touched = np.flatnonzero(dense)
+            else:
+                marked = np.zeros(cells, dtype=bool)
+                marked[keys] = True
+                touched = np.flatnonzero(marked)
+            scores = dense[touched]
+        docs = touched % width
+        if self.dead:
+            keep = ~self.deleted[docs]
+            touched, docs, scores = touched[keep], docs[keep], scores[keep]
+        bounds = np.searchsorted(touched // width, np.arange(num_queries + 1)).tolist()
+        return [
+            (self.slots[docs[start:end]], scores[start:end])
+            for start, end in pairwise(bounds)
+        ]
+
+    def columns(self, term_ids: np.ndarray) -> np.ndarray:
+        """Column of each of ``term_ids`` in this segment, ``-1`` if absent."""
+        if not len(self.term_ids):
+            return np.full(len(term_ids), -1, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self.term_ids, term_ids), len(self.term_ids) - 1)
+        return np.where(self.term_ids[pos] == term_ids, pos, -1)
+
+    def column_max(self, avgdl: float) -> np.ndarray:
+        """Largest saturated weight of every column, used as a score bound."""
+        cached = self._column_max
+        if cached is not None and cached[0] == avgdl:
+            return cached[1]
+        column_max = np.maximum.reduceat(self.weights(avgdl), self.indptr[:-1])
+        self._column_max = (avgdl, column_max)
+        return column_max
+
+    def column_length(self, col: int) -> int:
+        return int(self.indptr[col + 1] - self.indptr[col])
+
+    def postings(
+        self, col: int, weight: float, avgdl: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Live slots of column ``col`` and their contributions at ``weight``."""
+        start, end = self.indptr[col], self.indptr[col + 1]
+        docs = self.indices[start:end]
+        contrib = self.weights(avgdl)[start:end] * weight
+        if self.dead:
+            keep = ~self.deleted[docs]
+            docs, contrib = docs[keep], contrib[keep]
+        return self.slots[docs], contrib
+
+    def lookup(
+        self, col: int, slots: np.ndarray, weight: float, avgdl: float
+    ) -> np.ndarray:
+        """Contribution of column ``col`` to each of ``slots`` (0 if absent).
+
+        Both the segment slots and the column postings are sorted, so this is
+        a pair of binary searches instead of a scan of the posting list.
+        """
+        out = np.zeros(len(slots))
+        if not len(slots):
+            return out
+        local = np.minimum(np.searchsorted(self.slots, slots), len(self.slots) - 1)
+        start, end = self.indptr[col], self.indptr[col + 1]
+        docs = self.indices[start:end]
+        pos = np.minimum(np.searchsorted(docs, local), len(docs) - 1)
+        hit = (self.slots[local] == slots) & ~self.deleted[local] & (docs[pos] == local)
+        out[hit] = self.weights(avgdl)[start + pos[hit]] * weight
+        return out
+
+    def tombstone(self, slot: int) -> int:
+        """Mark the posting of ``slot`` deleted and return its local index."""
+        local = int(np.searchsorted(self.slots, slot))
+        self.deleted[local] = True
+        self.dead += 1
+        return local
+
+    @property
+    def tombstone_ratio(self) -> float:
+        return self.dead / len(self.slots) if len(self.slots) else 0.0
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    @classmethod
+    def merge(
+        cls, segments: Sequence["_Segment"], deleted: Sequence[np.ndarray]
+    ) -> "_Segment":
+        """Combine ``segments`` into one, dropping postings set in ``deleted``."""
+        slots: List[np.ndarray] = []
+        doc_len: List[np.ndarray] = []
+        post_slots: List[np.ndarray] = []
+        terms: List[np.ndarray] = []
+        tfs: List[np.ndarray] = []
+        for segment, dead in zip(segments, deleted, strict=True):
+            row_ptr, row_terms, row_tf = segment.rows
+            keep = ~dead[np.repeat(np.arange(len(segment)), np.diff(row_ptr))]
+            slots.append(segment.slots[~dead])
+            doc_len.append(segment.doc_len[~dead])
+            post_slots.append(np.repeat(segment.slots, np.diff(row_ptr))[keep])
+            terms.append(row_terms[keep])
+            tfs.append(row_tf[keep])
+        all_slots = np.concatenate([_EMPTY_SLOTS, *slots])
+        order = np.argsort(all_slots)
+        merged_slots = all_slots[order]
+        return cls.from_postings(
+            merged_slots,
+            np.concatenate([_EMPTY_SCORES, *doc_len])[order],
+            np.searchsorted(merged_slots, np.concatenate([_EMPTY_SLOTS, *post_slots])),
+            np.concatenate([np.zeros(0, dtype=np.int32), *terms]),
+            np.concatenate([np.zeros(0, dtype=np.int32), *tfs]),
+        )
+
+
+class _TextColumn:
+    """Slot-indexed optional strings, optionally backed by a mapped snapshot.
+
+    Slots covered by the snapshot are decoded on access unless they have been
+    overwritten; slots added after loading live in a Python list. Cleared
+    slots read as ``None``.
+    """
+
+    def __init__(
+        self, base: StringTable | None = None, present: np.ndarray | None = None
+    ) -> None:
+        self._base = base
+        self._base_len = len(base) if base is not None else 0
+        self._present = (
+            present.copy() if present is not None else np.ones(self._base_len, bool)
+        )
+        self._overrides: Dict[int, str] = {}
+        self._extra: List[Optional[str]] = []
+
+    def __len__(self) -> int:
+        return self._base_len + len(self._extra)
+
+    def __getitem__(self, slot: int) -> Optional[str]:
+        if slot < self._base_len:
+            if self._base is None or not self._present[slot]:
+                return None
+            if slot in self._overrides:
+                return self._overrides[slot]
+            return self._base[slot]
+        return self._extra[slot - self._base_len]
+
+    def __setitem__(self, slot: int, value: Optional[str]) -> None:
+        if slot >= self._base_len:
+            self._extra[slot - self._base_len] = value
+            return
+        self._present[slot] = value is not None
+        if value is None:
+            self._overrides.pop(slot, None)
+        else:
+            self._overrides[slot] = value
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        for slot in range(len(self)):
+            yield self[slot]
+
+    def append(self, value: Optional[str]) -> None:
+        self._extra.append(value)
+
+    def copy(self) -> "_TextColumn":
+        """A copy that later writes to this column do not affect."""
+        clone = _TextColumn(self._base, self._present)
+        clone._overrides = dict(self._overrides)
+        clone._extra = list(self._extra)
+        return clone
+
+
+class _IdfView(Mapping[str, float]):
+    """Read-only mapping of term to BM25Okapi IDF for the live corpus."""
+
+    def __init__(self, index: "BM25Corpus") -> None:
+        self._index = index
+
+    def __getitem__(self, term: str) -> float:
+        idf = self._index.term_idf(term)
+        if idf is None:
+            raise KeyError(term)
+        return idf
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index.live_terms())
+
+    def __len__(self) -> int:
+        return self._index.live_term_count()
+
+
+class BM25Statistics:
+    """Corpus-level BM25 statistics maintained incrementally by ``LexicalBM25``."""
+
+    def __init__(self, index: "BM25Corpus") -> None:
+        self._index = index
+        self.idf = _IdfView(index)
+
+    @property
+    def corpus_size(self) -> int:
+        return self._index.num_docs
+
+    @property
+    def avgdl(self) -> float:
+        return self._index.avgdl()
+
+    @property
+    def average_idf(self) -> float:
+        return self._index.average_idf()
+
+
+class BM25Corpus:
+    """Text preprocessing and corpus-level BM25 statistics.
+
+    Shared by ``LexicalBM25`` and the parent of a ``ShardedLexicalBM25``,
+    which keeps the statistics of all shards so they score with global IDF.
+    """
+
+    _logger: logging.Logger
+
+    def _init_preprocessing(
+        self,
+        tokenizer: Optional[Tokenizer],
+        enable_stemming: bool,
+        stem_cache_size: int,
     ) -> None:
-        self._logger = logging.getLogger(__name__)
         self.tokenizer = tokenizer or default_tokenizer
         self.enable_stemming = enable_stemming and PorterStemmer is not None
         self.stemmer = PorterStemmer() if self.enable_stemming else None
-        self.documents: List[str] = []
-        self.doc_ids: List[str] = []
-        self.corpus_tokens: List[List[str]] = []
-        self.bm25: Optional[BM25Okapi] = None
-
+        self.stem_cache_size = stem_cache_size
+        self._stem = _cached_stemmer(stem_cache_size) if self.stemmer else None
         if enable_stemming and PorterStemmer is None:
             self._logger.warning(
                 "Stemming requested but " "nltk not available; disabling"
@@ -42,60 +544,987 @@ class LexicalBM25:
 
     def _preprocess(self, text: str) -> List[str]:
         tokens = self.tokenizer(text)
-        if self.stemmer:
-            tokens = [self.stemmer.stem(tok) for tok in tokens]
+        if self._stem is not None:
+            tokens = [self._stem(tok) for tok in tokens]
         return tokens
 
+    def _reset_stats(self) -> None:
+        self._vocab: Dict[str, int] = {}
+        self._terms: List[str] = []
+        self._df = np.zeros(0, dtype=np.int64)
+        self._num_docs = 0
+        self._total_len = 0
+        self._average_idf_cache: float | None = None
+
+    # ------------------------------------------------------------------
+    # statistics
+    @property
+    def num_docs(self) -> int:
+        return self._num_docs
+
+    def avgdl(self) -> float:
+        return self._total_len / self._num_docs if self._num_docs else 0.0
+
+    def average_idf(self) -> float:
+        if self._average_idf_cache is None:
+            df = self._df[self._df > 0].astype(np.float64)
+            if not len(df):
+                self._average_idf_cache = 0.0
+            else:
+                idf = np.log(self._num_docs - df + 0.5) - np.log(df + 0.5)
+                self._average_idf_cache = float(idf.mean())
+        return self._average_idf_cache
+
+    def term_idf(self, term: str) -> Optional[float]:
+        """IDF of ``term``, or ``None`` if no live document contains it."""
+        term_id = self._vocab.get(term)
+        if term_id is None or not self._df[term_id]:
+            return None
+        return self._idf(term_id)
+
+    def live_terms(self) -> List[str]:
+        """Terms contained in at least one live document."""
+        return [self._terms[i] for i in np.flatnonzero(self._df).tolist()]
+
+    def live_term_count(self) -> int:
+        return int(np.count_nonzero(self._df))
+
+    def _idf(self, term_id: int) -> float:
+        df = int(self._df[term_id])
+        if not df:
+            return 0.0
+        idf = math.log(self._num_docs - df + 0.5) - math.log(df + 0.5)
+        if idf < 0:
+            return BM25_EPSILON * self.average_idf()
+        return idf
+
+    def _intern(self, tokens: List[str]) -> np.ndarray:
+        """Map ``tokens`` to vocabulary ids, adding unseen terms."""
+        vocab = self._vocab
+        ids = np.fromiter(
+            (vocab.get(tok, -1) for tok in tokens), dtype=np.int64, count=len(tokens)
+        )
+        for pos in np.flatnonzero(ids < 0).tolist():
+            token = tokens[pos]
+            term_id = vocab.get(token)
+            if term_id is None:
+                term_id = vocab[token] = len(self._terms)
+                self._terms.append(token)
+            ids[pos] = term_id
+        return ids
+
+    def _grow_df(self) -> None:
+        if len(self._df) < len(self._terms):
+            grown = np.zeros(max(2 * len(self._df), len(self._terms)), dtype=np.int64)
+            grown[: len(self._df)] = self._df
+            self._df = grown
+
+    def _query_vector(self, tokens: List[str]) -> Tuple[List[str], List[float]]:
+        """Indexed query terms (first occurrence order) and their weights.
+
+        A term's weight is its IDF times its count in the query, so repeated
+        query terms contribute once per occurrence as in ``BM25Okapi``.
+        """
+        terms: List[str] = []
+        weights: List[float] = []
+        for term, count in Counter(tokens).items():
+            term_id = self._vocab.get(term)
+            if term_id is not None and self._df[term_id]:
+                terms.append(term)
+                weights.append(self._idf(term_id) * count)
+        return terms, weights
+
+    @property
+    def bm25(self) -> BM25Statistics | None:
+        """BM25 statistics for the live corpus, or ``None`` while empty."""
+        return BM25Statistics(self) if self._num_docs else None
+
+
+class LexicalBM25(BM25Corpus):
+    """Lexical retrieval using a segmented BM25 index with optional stemming.
+
+    New documents are sealed into small immutable segments, deletes are
+    recorded as tombstones and a background merge compacts segments once
+    there are more than ``max_segments``. Document frequencies and lengths are
+    maintained incrementally so scores match a ``BM25Okapi`` built over the
+    live corpus.
+
+    Each document occupies a slot found through a hash map from its id.
+    Updates keep the slot and tombstone the old posting in its segment;
+    deletes free the slot for reuse by later documents. Segments whose
+    tombstone ratio exceeds ``compaction_threshold`` are rewritten without
+    their dead postings.
+    """
+
+    def __init__(
+        self,
+        tokenizer: Optional[Tokenizer] = None,
+        enable_stemming: bool = False,
+        *,
+        max_segments: int = DEFAULT_MAX_SEGMENTS,
+        merge_factor: int = DEFAULT_MERGE_FACTOR,
+        compaction_threshold: float = DEFAULT_COMPACTION_THRESHOLD,
+        background_merge: bool = True,
+        snapshot_path: str | Path | None = None,
+        preprocess_workers: int = DEFAULT_PREPROCESS_WORKERS,
+        stem_cache_size: int = DEFAULT_STEM_CACHE_SIZE,
+        prune: bool = False,
+    ) -> None:
+        self._logger = logging.getLogger(__name__)
+        self._init_preprocessing(tokenizer, enable_stemming, stem_cache_size)
+        self.preprocess_workers = max(1, preprocess_workers)
+        self._preprocess_executor: ProcessPoolExecutor | None = None
+        self.max_segments = max(1, max_segments)
+        self.merge_factor = max(2, merge_factor)
+        self.compaction_threshold = compaction_threshold
+        self.background_merge = background_merge
+        self.prune = prune
+        self._lock = threading.RLock()
+        self._save_lock = threading.Lock()
+        self._merge_executor: ThreadPoolExecutor | None = None
+        self._merge_future: Future[None] | None = None
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self.clear()
+
+        if self.snapshot_path is not None and self.snapshot_path.exists():
+            try:
+                self.load(self.snapshot_path)
+            except Exception as exc:
+                self._logger.error(
+                    "Failed to load lexical snapshot %s: %s", self.snapshot_path, exc
+                )
+                self.clear()
+
+    def clear(self) -> None:
+        """Drop every document and segment from the index."""
+        self.wait_for_merges()
+        with self._lock:
+            self._segments: List[_Segment] = []
+            self._slot_doc_ids: List[Optional[str]] = []
+            self._slot_texts = _TextColumn()
+            self._slot_by_id: Dict[str, int] = {}
+            self._slot_segment: Dict[int, _Segment] = {}
+            self._live = np.zeros(0, dtype=bool)
+            self._free_slots: List[int] = []
+            self._reset_stats()
+            self._df_journal: Counter[int] | None = None
+            self._identifiers = IdentifierIndex()
+            self._next_id = 0
+            self._snapshot_mmap: Any = None
+
+    def _add_stats(self, segment: _Segment) -> None:
+        self._grow_df()
+        _, terms, _ = segment.rows
+        np.add.at(self._df, terms, 1)
+        if self._df_journal is not None:
+            term_ids, counts = np.unique(terms, return_counts=True)
+            self._df_journal.update(
+                dict(zip(term_ids.tolist(), counts.tolist(), strict=True))
+            )
+        self._num_docs += len(segment)
+        self._total_len += int(segment.doc_len.sum())
+        self._average_idf_cache = None
+
+    def _remove_stats(self, segment: _Segment, local: int) -> None:
+        terms = segment.row_terms(local)
+        self._df[terms] -= 1
+        if self._df_journal is not None:
+            self._df_journal.subtract(terms.tolist())
+        self._num_docs -= 1
+        self._total_len -= int(segment.doc_len[local])
+        self._average_idf_cache = None
+
+    def take_stats_delta(self) -> Dict[str, Any]:
+        """Return document-frequency changes since the previous call.
+
+        The first call (and the first after :meth:`clear` or :meth:`load`)
+        reports the full statistics and starts journaling, so a caller adding
+        up the deltas of several indexes keeps their combined statistics.
+        ``num_docs`` and ``total_len`` are always absolute.
+        """
+        with self._lock:
+            if self._df_journal is None:
+                changed = {
+                    self._terms[i]: int(self._df[i])
+                    for i in np.flatnonzero(self._df).tolist()
+                }
+            else:
+                changed = {
+                    self._terms[i]: delta
+                    for i, delta in self._df_journal.items()
+                    if delta
+                }
+            self._df_journal = Counter()
+            return {
+                "df": changed,
+                "num_docs": self._num_docs,
+                "total_len": self._total_len,
+                "next_id": self._next_id,
+            }
+
+    @property
+    def doc_ids(self) -> List[str]:
+        """IDs of live documents in slot order."""
+        with self._lock:
+            return [doc_id for doc_id in self._slot_doc_ids if doc_id is not None]
+
+    @property
+    def documents(self) -> List[str]:
+        """Text of live documents in slot order."""
+        with self._lock:
+            return [text for text in self._slot_texts if text is not None]
+
+    def get_document(self, doc_id: str) -> Optional[str]:
+        """Return the text of ``doc_id``, or ``None`` if it is not indexed."""
+        with self._lock:
+            slot = self._slot_by_id.get(doc_id)
+            return None if slot is None else self._slot_texts[slot]
+
+    def get_documents(self, doc_ids: Sequence[str]) -> List[Optional[str]]:
+        """Texts of ``doc_ids`` (``None`` for unknown ids) under one lock."""
+        with self._lock:
+            slots = [self._slot_by_id.get(doc_id) for doc_id in doc_ids]
+            return [None if slot is None else self._slot_texts[slot] for slot in slots]
+
+    @property
+    def segment_count(self) -> int:
+        return len(self._segments)
+
+    # ------------------------------------------------------------------
+    # segment management
+    def _preprocess_batch(self, texts: List[str]) -> List[List[str]]:
+        """Tokenize and stem ``texts``, fanning large batches out to processes.
+
+        Chunks are mapped in order, so the result is identical to calling
+        :meth:`_preprocess` on each text. If the pool cannot be used (for
+        example because a custom tokenizer cannot be pickled) the batch is
+        processed serially.
+        """
+        if self.preprocess_workers < 2 or len(texts) < PARALLEL_MIN_DOCS:
+            return [self._preprocess(text) for text in texts]
+        bounds = range(0, len(texts) + PREPROCESS_CHUNK_SIZE, PREPROCESS_CHUNK_SIZE)
+        chunks = [texts[start:end] for start, end in pairwise(bounds)]
+        try:
+            if self._preprocess_executor is None:
+                self._preprocess_executor = ProcessPoolExecutor(
+                    max_workers=self.preprocess_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            results = self._preprocess_executor.map(
+                _preprocess_chunk,
+                chunks,
+                repeat(self.tokenizer),
+                repeat(self._stem is not None),
+                repeat(self.stem_cache_size),
+            )
+            return [tokens for chunk in results for tokens in chunk]
+        except Exception as exc:
+            self._logger.warning(
+                "Parallel preprocessing failed, falling back to serial: %s", exc
+            )
+            return [self._preprocess(text) for text in texts]
+
+    def close(self) -> None:
+        """Shut down the merge thread and the preprocessing process pool."""
+        self.wait_for_merges()
+        for executor in (self._merge_executor, self._preprocess_executor):
+            if executor is not None:
+                executor.shutdown()
+        self._merge_executor = None
+        self._preprocess_executor = None
+
+    def _seal(self, entries: List[Tuple[str, str]]) -> None:
+        """Index ``(doc_id, text)`` pairs as a new segment.
+
+        Ids that are already indexed keep their slot; new ids take the
+        lowest free slot or extend the slot range.
+        """
+        token_lists = self._preprocess_batch([text for _, text in entries])
+        with self._lock:
+            assigned = [self._assign_slot(doc_id) for doc_id, _ in entries]
+            order = sorted(range(len(entries)), key=assigned.__getitem__)
+            slots = [assigned[i] for i in order]
+            entries = [entries[i] for i in order]
+            segment = _Segment.from_token_ids(
+                slots, [self._intern(token_lists[i]) for i in order]
+            )
+            self._segments.append(segment)
+            self._add_stats(segment)
+            for slot, (doc_id, text) in zip(slots, entries, strict=True):
+                self._slot_doc_ids[slot] = doc_id
+                self._slot_texts[slot] = text
+                self._slot_by_id[doc_id] = slot
+                self._slot_segment[slot] = segment
+                self._live[slot] = True
+                self._identifiers.add(doc_id, text)
+        self._maybe_merge()
+
+    def _assign_slot(self, doc_id: str) -> int:
+        slot = self._slot_by_id.get(doc_id)
+        if slot is not None:
+            return slot
+        if self._free_slots:
+            return heapq.heappop(self._free_slots)
+        slot = len(self._slot_doc_ids)
+        self._slot_doc_ids.append(None)
+        self._slot_texts.append(None)
+        if len(self._live) <= slot:
+            grown = np.zeros(max(2 * len(self._live), slot + 1), dtype=bool)
+            grown[: len(self._live)] = self._live
+            self._live = grown
+        return slot
+
+    def _retire_posting(self, slot: int) -> None:
+        """Tombstone the current posting of ``slot`` and drop its statistics."""
+        segment = self._slot_segment.pop(slot)
+        self._remove_stats(segment, segment.tombstone(slot))
+
+    def _tombstone(self, doc_id: str) -> None:
+        slot = self._slot_by_id.pop(doc_id)
+        self._retire_posting(slot)
+        self._identifiers.remove(doc_id)
+        self._slot_doc_ids[slot] = None
+        self._slot_texts[slot] = None
+        self._live[slot] = False
+        heapq.heappush(self._free_slots, slot)
+
+    def _needs_merge(self) -> bool:
+        return len(self._segments) > self.max_segments or any(
+            segment.tombstone_ratio > self.compaction_threshold
+            for segment in self._segments
+        )
+
+    def _maybe_merge(self) -> None:
+        if not self._needs_merge():
+            return
+        if not self.background_merge:
+            self.merge_segments()
+            return
+        with self._lock:
+            if self._merge_future is not None and not self._merge_future.done():
+                return
+            if self._merge_executor is None:
+                self._merge_executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="bm25-merge"
+                )
+            self._merge_future = self._merge_executor.submit(self.merge_segments)
+
+    def merge_segments(self, merge_all: bool = False) -> None:
+        """Merge and compact segments until the policy is satisfied.
+
+        The policy bounds the number of segments by ``max_segments`` and the
+        tombstone ratio of each segment by ``compaction_threshold``. With
+        ``merge_all`` every segment is merged into one.
+        """
+        if merge_all:
+            self._merge_once(merge_all=True)
+            return
+        while self._needs_merge():
+            if not self._merge_once(merge_all=False):
+                break
+
+    def _select_for_merge(self, merge_all: bool) -> List[_Segment]:
+        if merge_all:
+            return list(self._segments)
+        selected = [
+            segment
+            for segment in self._segments
+            if segment.tombstone_ratio > self.compaction_threshold
+        ]
+        if len(self._segments) > self.max_segments:
+            for segment in sorted(self._segments, key=len):
+                if len(selected) >= self.merge_factor:
+                    break
+                if segment not in selected:
+                    selected.append(segment)
+        return selected
+
+    def _merge_once(self, merge_all: bool) -> bool:
+        with self._lock:
+            selected = self._select_for_merge(merge_all)
+            if not selected or (len(selected) == 1 and not selected[0].dead):
+                return False
+            deleted = [segment.deleted.copy() for segment in selected]
+        try:
+            merged = _Segment.merge(selected, deleted)
+        except Exception as exc:  # pragma: no cover - logged for observability
+            self._logger.error("BM25 segment merge failed: %s", exc)
+            return False
+        with self._lock:
+            if any(segment not in self._segments for segment in selected):
+                return False  # index was cleared while merging
+            position = self._segments.index(selected[0])
+            remaining = [s for s in self._segments if s not in selected]
+            if len(merged):
+                remaining.insert(min(position, len(remaining)), merged)
+            self._segments = remaining
+            # postings retired while the merge ran are still live in ``merged``
+            for segment, before in zip(selected, deleted, strict=True):
+                for slot in segment.slots[segment.deleted & ~before].tolist():
+                    merged.tombstone(slot)
+            for slot in merged.slots[~merged.deleted].tolist():
+                self._slot_segment[slot] = merged
+        return True
+
+    def wait_for_merges(self) -> None:
+        """Block until any pending background merge has finished."""
+        future = getattr(self, "_merge_future", None)
+        if future is not None:
+            future.result()
+
+    # ------------------------------------------------------------------
+    # persistence
+    def save(self, path: str | Path) -> None:
+        """Atomically write the index to a versioned snapshot at ``path``.
+
+        The index lock is held only while the mutable state is copied;
+        encoding, checksumming and writing the snapshot happen outside it,
+        so queries and edits carry on meanwhile. Concurrent saves are
+        serialised so the last one started is the one left on disk.
+        """
+        with self._save_lock:
+            with self._lock:
+                slot_count = len(self._slot_doc_ids)
+                live = self._live[:slot_count].copy()
+                doc_ids = list(self._slot_doc_ids)
+                texts = self._slot_texts.copy()
+                terms = list(self._terms)
+                df = self._df[: len(terms)].copy()
+                segments = [
+                    (segment, segment.deleted.copy()) for segment in self._segments
+                ]
+                identifiers = self._identifiers.to_arrays()
+                metadata = {
+                    "layout": SNAPSHOT_LAYOUT,
+                    "segments": len(segments),
+                    "slot_count": slot_count,
+                    "num_docs": self._num_docs,
+                    "total_len": self._total_len,
+                    "next_id": self._next_id,
+                    "stemming": self.enable_stemming,
+                }
+            arrays: Dict[str, np.ndarray] = {"live": live, "df": df}
+            for i, (segment, deleted) in enumerate(segments):
+                prefix = f"seg{i}"
+                arrays[f"{prefix}.slots"] = segment.slots
+                arrays[f"{prefix}.doc_len"] = segment.doc_len
+                arrays[f"{prefix}.indptr"] = segment.indptr
+                arrays[f"{prefix}.indices"] = segment.indices
+                arrays[f"{prefix}.tf"] = segment.tf
+                arrays[f"{prefix}.term_ids"] = segment.term_ids
+                arrays[f"{prefix}.deleted"] = deleted
+            for name, array in identifiers.items():
+                arrays[f"identifiers.{name}"] = array
+            tables = {
+                "doc_ids": StringTable.from_strings(doc_ids),
+                "texts": StringTable.from_strings(texts),
+                "vocab": StringTable.from_strings(terms),
+            }
+            for name, table in tables.items():
+                arrays[f"{name}.blob"] = table.blob
+                arrays[f"{name}.offsets"] = table.offsets
+            write_snapshot(path, metadata, arrays)
+
+    def load(self, path: str | Path, verify: bool = True) -> None:
+        """Replace the index with the snapshot at ``path``.
+
+        Segment arrays and document text stay memory-mapped; only the id map,
+        the vocabulary and document frequencies are materialised. ``verify`` checks the
+        payload checksum before anything is replaced.
+        """
+        metadata, arrays, mapped = read_snapshot(path, verify=verify)
+
+        def table(name: str) -> StringTable:
+            return StringTable(arrays[f"{name}.blob"], arrays[f"{name}.offsets"])
+
+        if metadata.get("layout") != SNAPSHOT_LAYOUT:
+            raise ValueError(
+                "Unsupported lexical snapshot layout %s (expected %s)"
+                % (metadata.get("layout"), SNAPSHOT_LAYOUT)
+            )
+        if bool(metadata.get("stemming")) != self.enable_stemming:
+            self._logger.warning(
+                "Lexical snapshot %s was built with stemming=%s",
+                path,
+                metadata.get("stemming"),
+            )
+        live = arrays["live"].copy()
+        segments = [
+            _Segment(
+                arrays[f"seg{i}.slots"],
+                arrays[f"seg{i}.doc_len"],
+                arrays[f"seg{i}.term_ids"],
+                arrays[f"seg{i}.indptr"],
+                arrays[f"seg{i}.indices"],
+                arrays[f"seg{i}.tf"],
+                arrays[f"seg{i}.deleted"],
+            )
+            for i in range(int(metadata["segments"]))
+        ]
+        terms = table("vocab").tolist()
+        slot_doc_ids: List[Optional[str]] = [
+            doc_id if alive else None
+            for doc_id, alive in zip(
+                table("doc_ids").tolist(), live.tolist(), strict=True
+            )
+        ]
+        texts = _TextColumn(table("texts"), live)
+        prefix = "identifiers."
+        if f"{prefix}indptr" in arrays:
+            identifiers = IdentifierIndex.from_arrays(
+                {
+                    name.removeprefix(prefix): array
+                    for name, array in arrays.items()
+                    if name.startswith(prefix)
+                }
+            )
+        else:  # snapshots written before the identifier index existed
+            identifiers = IdentifierIndex.from_documents(
+                (doc_id, text or "")
+                for doc_id, text in zip(slot_doc_ids, texts, strict=True)
+                if doc_id is not None
+            )
+        self.clear()
+        with self._lock:
+            self._segments = segments
+            self._slot_doc_ids = slot_doc_ids
+            self._slot_texts = texts
+            self._identifiers = identifiers
+            self._slot_by_id = {
+                doc_id: slot
+                for slot, doc_id in enumerate(slot_doc_ids)
+                if doc_id is not None
+            }
+            for segment in segments:
+                for slot in segment.slots[~segment.deleted].tolist():
+                    self._slot_segment[slot] = segment
+            self._live = live
+            self._free_slots = np.flatnonzero(~live).tolist()
+            self._terms = terms
+            self._vocab = {term: term_id for term_id, term in enumerate(terms)}
+            self._df = arrays["df"].copy()
+            self._num_docs = int(metadata["num_docs"])
+            self._total_len = int(metadata["total_len"])
+            self._next_id = int(metadata["next_id"])
+            self._snapshot_mmap = mapped
+
+    def commit(self) -> Dict[str, Any]:
+        """Persist the index to ``snapshot_path`` when one is configured."""
+        if self.snapshot_path is None:
+            return {"status": "skipped"}
+        try:
+            self.save(self.snapshot_path)
+            return {"status": "success", "path": str(self.snapshot_path)}
+        except Exception as exc:
+            self._logger.error("Failed to save lexical snapshot: %s", exc)
+            return {"status": "error", "error": str(exc)}
+
+    # ------------------------------------------------------------------
+    # public API
     def index_documents(
         self,
         documents: List[str],
     ) -> Tuple[List[str], Dict[str, Any]]:
         """Add documents to the BM25 index."""
         try:
-            start = len(self.documents)
-            ids = []
-            for i, doc in enumerate(documents):
-                doc_id = str(start + i)
-                self.documents.append(doc)
-                self.doc_ids.append(doc_id)
-                self.corpus_tokens.append(self._preprocess(doc))
-                ids.append(doc_id)
-            if self.corpus_tokens:
-                self.bm25 = BM25Okapi(self.corpus_tokens)
+            with self._lock:
+                start = self._next_id
+                self._next_id += len(documents)
+            ids = [str(start + i) for i in range(len(documents))]
+            if documents:
+                self._seal(list(zip(ids, documents, strict=True)))
             return ids, {"status": "success", "count": len(ids)}
         except Exception as exc:  # pragma: no cover
             self._logger.error("Failed to index documents: %s", exc)
             return [], {"status": "error", "error": str(exc)}
 
+    def add_documents(self, entries: List[Tuple[str, str]]) -> Dict[str, Any]:
+        """Index ``(doc_id, text)`` pairs under caller-assigned ids.
+
+        Numeric ids advance the id counter so later :meth:`index_documents`
+        calls never reuse them. An id repeated within ``entries`` keeps its
+        last text.
+        """
+        try:
+            unique = list(dict(entries).items())
+            with self._lock:
+                for doc_id, _ in unique:
+                    if doc_id in self._slot_by_id:
+                        self._retire_posting(self._slot_by_id[doc_id])
+                    if doc_id.isdigit():
+                        self._next_id = max(self._next_id, int(doc_id) + 1)
+                if unique:
+                    self._seal(unique)
+            return {"status": "success", "count": len(unique)}
+        except Exception as exc:  # pragma: no cover
+            self._logger.error("Failed to add documents: %s", exc)
+            return {"status": "error", "error": str(exc)}
+
+    def match_identifiers(
+        self, query: str, limit: int | None = None
+    ) -> Tuple[List[str], List[Tuple[str, float]]]:
+        """Look up identifier tokens such as ``AB-123`` in ``query`` exactly.
+
+        Returns the normalised identifiers and the ``(doc_id, occurrences)``
+        hits; see :class:`~src.retrieval.identifiers.IdentifierIndex`.
+        """
+        with self._lock:
+            return self._identifiers.search(query, limit)
+
     def query(
-        self, query: str, top_k: int = 5
+        self, query: str, top_k: int = 5, prune: bool | None = None
     ) -> Tuple[List[Tuple[str, float]], Dict[str, Any]]:
-        """Query the index and return doc IDs with BM25 scores."""
+        """Query the index and return doc IDs with BM25 scores.
+
+        With ``prune`` (defaulting to the ``prune`` setting of the index)
+        documents that cannot reach the top ``top_k`` are skipped using
+        MaxScore; the results are identical to exhaustive scoring.
+        """
         try:
-            if not self.bm25:
+            if not self._num_docs:
                 return [], {"status": "empty"}
+            if top_k <= 0:
+                return [], {"retrieved": 0}
             tokens = self._preprocess(query)
-            scores = self.bm25.get_scores(tokens)
-            ranked = sorted(
-                zip(self.doc_ids, scores, strict=False), key=lambda x: x[1], reverse=True
-            )[:top_k]
+            with self._lock:
+                terms, weights = self._query_vector(tokens)
+                avgdl = self.avgdl()
+            ranked = self.search_vector(terms, weights, avgdl, top_k, prune)
             return ranked, {"retrieved": len(ranked)}
         except Exception as exc:  # pragma: no cover
             self._logger.error("BM25 query failed: %s", exc)
             return [], {"status": "error", "error": str(exc)}
 
+    def search_vector(
+        self,
+        terms: List[str],
+        weights: List[float],
+        avgdl: float,
+        top_k: int,
+        prune: bool | None = None,
+    ) -> List[Tuple[str, float]]:
+        """Rank live documents against a weighted query vector.
+
+        ``weights`` (IDF times query count per term) and ``avgdl`` may come
+        from a larger corpus than this index; shards of a
+        ``ShardedLexicalBM25`` score this way with global statistics.
+        """
+        with self._lock:
+            if not self._num_docs:
+                return []
+            segments = list(self._segments)
+            query_terms: List[int] = []
+            query_weights: List[float] = []
+            for term, weight in zip(terms, weights, strict=True):
+                term_id = self._vocab.get(term)
+                if term_id is not None and self._df[term_id]:
+                    query_terms.append(term_id)
+                    query_weights.append(weight)
+            # copies, so slots freed and reused meanwhile keep their old ids
+            slot_count = len(self._slot_doc_ids)
+            live = self._live[:slot_count].copy()
+            doc_ids = list(self._slot_doc_ids)
+        term_ids = np.asarray(query_terms, dtype=np.int32)
+        term_weights = np.asarray(query_weights, dtype=np.float64)
+        if self.prune if prune is None else prune:
+            slots, scores = self._score_pruned(
+                segments, term_ids, term_weights, avgdl, top_k, slot_count
+            )
+        else:
+            slots, scores = self._score_exhaustive(
+                segments, term_ids, term_weights, avgdl
+            )
+        slots, scores = self._pad_untouched(slots, scores, live, slot_count, top_k)
+        best = self._top_k(slots, scores, top_k)
+        chosen: List[int] = slots[best].tolist()
+        values: List[float] = scores[best].tolist()
+        ranked: List[Tuple[str, float]] = []
+        for slot, score in zip(chosen, values, strict=True):
+            doc_id = doc_ids[slot]
+            if doc_id is not None:
+                ranked.append((doc_id, score))
+        return ranked
+
+    def query_batch(
+        self, queries: List[str], top_k: int = 5, prune: bool | None = None
+    ) -> List[Tuple[List[Tuple[str, float]], Dict[str, Any]]]:
+        """Run :meth:`query` for each of ``queries``, scoring them together.
+
+        Results equal those of calling :meth:`query` per query; see
+        :meth:`search_vectors` for which queries share a scoring pass.
+        """
+        try:
+            if not self._num_docs:
+                return [([], {"status": "empty"}) for _ in queries]
+            if top_k <= 0:
+                return [([], {"retrieved": 0}) for _ in queries]
+            token_lists = [self._preprocess(query) for query in queries]
+            with self._lock:
+                vectors = [self._query_vector(tokens) for tokens in token_lists]
+                avgdl = self.avgdl()
+            ranked = self.search_vectors(vectors, avgdl, top_k, prune)
+            return [(results, {"retrieved": len(results)}) for results in ranked]
+        except Exception as exc:  # pragma: no cover
+            self._logger.error("BM25 batch query failed: %s", exc)
+            return [([], {"status": "error", "error": str(exc)}) for _ in queries]
+
+    def search_vectors(
+        self,
+        vectors: List[Tuple[List[str], List[float]]],
+        avgdl: float,
+        top_k: int,
+        prune: bool | None = None,
+    ) -> List[List[Tuple[str, float]]]:
+        """:meth:`search_vector` for several ``(terms, weights)`` query vectors.
+
+        Multi-term queries that would be scored exhaustively (all of them
+        without ``prune``) share one vectorized pass per segment. Queries
+        MaxScore can prune are pruned one by one, which beats exhaustive
+        scoring of common terms, and single-term queries are scored alone as
+        their one posting list needs no accumulation.
+        """
+        with self._lock:
+            if not self._num_docs:
+                return [[] for _ in vectors]
+            segments = list(self._segments)
+            resolved: List[Tuple[List[int], List[float]]] = []
+            for terms, weights in vectors:
+                query_terms: List[int] = []
+                query_weights: List[float] = []
+                for term, weight in zip(terms, weights, strict=True):
+                    term_id = self._vocab.get(term)
+                    if term_id is not None and self._df[term_id]:
+                        query_terms.append(term_id)
+                        query_weights.append(weight)
+                resolved.append((query_terms, query_weights))
+            # copies, so slots freed and reused meanwhile keep their old ids
+            slot_count = len(self._slot_doc_ids)
+            live = self._live[:slot_count].copy()
+            doc_ids = list(self._slot_doc_ids)
+        prune = self.prune if prune is None else prune
+        batched = [
+            number
+            for number, (term_ids, weights) in enumerate(resolved)
+            if len(term_ids) > 1 and (not prune or min(weights) <= 0)
+        ]
+        term_ids = np.asarray(
+            [term for n in batched for term in resolved[n][0]], dtype=np.int32
+        )
+        term_weights = np.asarray(
+            [weight for n in batched for weight in resolved[n][1]], dtype=np.float64
+        )
+        owners = np.repeat(
+            np.arange(len(batched), dtype=np.int64),
+            [len(resolved[n][0]) for n in batched],
+        )
+        parts = [
+            segment.score_batch(term_ids, term_weights, owners, len(batched), avgdl)
+            for segment in segments
+        ]
+        scored: Dict[int, Tuple[np.ndarray, np.ndarray]] = {
+            number: (
+                np.concatenate([_EMPTY_SLOTS, *(p[position][0] for p in parts)]),
+                np.concatenate([_EMPTY_SCORES, *(p[position][1] for p in parts)]),
+            )
+            for position, number in enumerate(batched)
+        }
+        ranked_lists: List[List[Tuple[str, float]]] = []
+        for number, (query_terms, query_weights) in enumerate(resolved):
+            if number in scored:
+                slots, scores = scored[number]
+            elif not prune:
+                slots, scores = self._score_exhaustive(
+                    segments,
+                    np.asarray(query_terms, dtype=np.int32),
+                    np.asarray(query_weights, dtype=np.float64),
+                    avgdl,
+                )
+            else:
+                slots, scores = self._score_pruned(
+                    segments,
+                    np.asarray(query_terms, dtype=np.int32),
+                    np.asarray(query_weights, dtype=np.float64),
+                    avgdl,
+                    top_k,
+                    slot_count,
+                )
+            slots, scores = self._pad_untouched(slots, scores, live, slot_count, top_k)
+            best = self._top_k(slots, scores, top_k)
+            chosen: List[int] = slots[best].tolist()
+            values: List[float] = scores[best].tolist()
+            ranked: List[Tuple[str, float]] = []
+            for slot, score in zip(chosen, values, strict=True):
+                doc_id = doc_ids[slot]
+                if doc_id is not None:
+                    ranked.append((doc_id, score))
+            ranked_lists.append(ranked)
+        return ranked_lists
+
+    @staticmethod
+    def _score_exhaustive(
+        segments: List[_Segment],
+        term_ids: np.ndarray,
+        weights: np.ndarray,
+        avgdl: float,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        parts = [segment.score(term_ids, weights, avgdl) for segment in segments]
+        return (
+            np.concatenate([_EMPTY_SLOTS, *(p[0] for p in parts)]),
+            np.concatenate([_EMPTY_SCORES, *(p[1] for p in parts)]),
+        )
+
+    @classmethod
+    def _score_pruned(
+        cls,
+        segments: List[_Segment],
+        term_ids: np.ndarray,
+        weights: np.ndarray,
+        avgdl: float,
+        top_k: int,
+        slot_count: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """MaxScore: score only documents that can still enter the top ``top_k``.
+
+        Terms are visited by decreasing upper bound (query weight times the
+        largest saturated weight of the column) and their postings are
+        accumulated until the bounds of the remaining terms sum to less than
+        the current ``top_k``-th partial score. Documents matching only those
+        non-essential terms cannot reach the top ``top_k`` and are never
+        looked at; the remaining terms are probed for the surviving
+        candidates only, dropping candidates whose partial score plus the
+        outstanding bound falls below the threshold. Survivors are rescored
+        term by term in query order so their scores equal the exhaustive
+        ones bit for bit.
+        """
+        if len(term_ids) < 2 or (weights <= 0).any():
+            return cls._score_exhaustive(segments, term_ids, weights, avgdl)
+        columns = [segment.columns(term_ids) for segment in segments]
+        bounds = np.zeros(len(term_ids))
+        for segment, cols in zip(segments, columns, strict=True):
+            present = cols >= 0
+            if present.any():
+                column_max = segment.column_max(avgdl)[cols[present]]
+                bounds[present] = np.maximum(bounds[present], column_max)
+        bounds *= weights
+        order = np.argsort(-bounds, kind="stable").tolist()
+        remaining = np.append(np.cumsum(bounds[order][::-1])[::-1], 0.0)
+
+        def probe(term: int, slots: np.ndarray) -> np.ndarray:
+            """Contribution of ``term`` to ``slots``, in segment order."""
+            present = [
+                (segment, int(cols[term]))
+                for segment, cols in zip(segments, columns, strict=True)
+                if cols[term] >= 0
+            ]
+            postings = sum(segment.column_length(col) for segment, col in present)
+            contrib = np.zeros(len(slots))
+            for segment, col in present:
+                if len(slots) * 16 < postings:
+                    contrib += segment.lookup(col, slots, float(weights[term]), avgdl)
+                else:  # many candidates: scatter the posting list and gather
+                    dense = np.zeros(slot_count)
+                    posting_slots, values = segment.postings(
+                        col, float(weights[term]), avgdl
+                    )
+                    dense[posting_slots] = values
+                    contrib += dense[slots]
+            return contrib
+
+        def kth_best(scores: np.ndarray) -> float:
+            # partial sums are lower bounds; leave room for rounding
+            kth = np.partition(scores, len(scores) - top_k)[len(scores) - top_k]
+            return float(kth) * (1 - 1e-9)
+
+        # essential terms: accumulate full posting lists
+        partial = np.zeros(slot_count)
+        marked = np.zeros(slot_count, dtype=bool)
+        top = _EMPTY_SLOTS
+        threshold = 0.0
+        rank = 0
+        while rank < len(order) and remaining[rank] >= threshold:
+            term = order[rank]
+            touched: List[np.ndarray] = []
+            for segment, cols in zip(segments, columns, strict=True):
+                if cols[term] >= 0:
+                    slots, contrib = segment.postings(
+                        int(cols[term]), float(weights[term]), avgdl
+                    )
+                    partial[slots] += contrib
+                    touched.append(slots)
+            changed = np.concatenate([_EMPTY_SLOTS, *touched])
+            marked[changed] = True
+            pool = np.concatenate([top[~marked[top]], changed])
+            marked[changed] = False
+            if len(pool) >= top_k:
+                best = np.argpartition(-partial[pool], top_k - 1)[:top_k]
+                top = pool[best]
+                threshold = kth_best(partial[top])
+            else:
+                top = pool
+            rank += 1
+
+        # non-essential terms: probe surviving candidates only
+        candidates = np.flatnonzero(
+            (partial > 0) & (partial + remaining[rank] >= threshold)
+        )
+        partial = partial[candidates]
+        for position in range(rank, len(order)):
+            partial += probe(order[position], candidates)
+            if len(partial) >= top_k:
+                threshold = max(threshold, kth_best(partial))
+            keep = partial + remaining[position + 1] >= threshold
+            candidates, partial = candidates[keep], partial[keep]
+
+        scores = np.zeros(len(candidates))
+        for term in range(len(term_ids)):
+            scores += probe(term, candidates)
+        return candidates, scores
+
+    @staticmethod
+    def _pad_untouched(
+        slots: np.ndarray,
+        scores: np.ndarray,
+        live: np.ndarray,
+        slot_count: int,
+        top_k: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Add zero-score live documents the query did not touch.
+
+        ``BM25Okapi`` ranks every document, so callers asking for more results
+        than there are matches (or matches scoring below zero) still receive
+        unmatched documents with a score of ``0.0``.
+        """
+        if len(slots) >= top_k and (not len(scores) or scores.min() >= 0):
+            return slots, scores
+        candidates = np.flatnonzero(live[:slot_count])[: top_k + len(slots)]
+        extra = candidates[~np.isin(candidates, slots)][:top_k]
+        return (
+            np.concatenate([slots, extra]),
+            np.concatenate([scores, np.zeros(len(extra))]),
+        )
+
+    @staticmethod
+    def _top_k(slots: np.ndarray, scores: np.ndarray, top_k: int) -> np.ndarray:
+        """Return positions of the ``top_k`` best scores, ties broken by slot."""
+        candidates = np.arange(len(scores))
+        if len(scores) > top_k:
+            partitioned = np.argpartition(-scores, top_k - 1)[:top_k]
+            threshold = scores[partitioned].min()
+            candidates = np.flatnonzero(scores >= threshold)
+        order = np.lexsort((slots[candidates], -scores[candidates]))
+        return candidates[order[:top_k]]
+
     # Index management helpers
     def update_document(self, doc_id: str, content: str) -> Dict[str, Any]:
         """Update existing document content."""
         try:
-            idx = self.doc_ids.index(doc_id)
-            self.documents[idx] = content
-            self.corpus_tokens[idx] = self._preprocess(content)
-            if self.corpus_tokens:
-                self.bm25 = BM25Okapi(self.corpus_tokens)
+            with self._lock:
+                slot = self._slot_by_id.get(doc_id)
+                if slot is None:
+                    return {"status": "not_found"}
+                self._retire_posting(slot)
+                self._seal([(doc_id, content)])
             return {"status": "success"}
-        except ValueError:
-            return {"status": "not_found"}
         except Exception as exc:  # pragma: no cover
             self._logger.error("Failed to update %s: %s", doc_id, exc)
             return {"status": "error", "error": str(exc)}
@@ -103,17 +1532,12 @@ class LexicalBM25:
     def delete_document(self, doc_id: str) -> Dict[str, Any]:
         """Remove a document from the index."""
         try:
-            idx = self.doc_ids.index(doc_id)
-            del self.doc_ids[idx]
-            del self.documents[idx]
-            del self.corpus_tokens[idx]
-            if self.corpus_tokens:
-                self.bm25 = BM25Okapi(self.corpus_tokens)
-            else:
-                self.bm25 = None
+            with self._lock:
+                if doc_id not in self._slot_by_id:
+                    return {"status": "not_found"}
+                self._tombstone(doc_id)
+            self._maybe_merge()
             return {"status": "success"}
-        except ValueError:
-            return {"status": "not_found"}
         except Exception as exc:  # pragma: no cover
             self._logger.error("Failed to delete %s: %s", doc_id, exc)
             return {"status": "error", "error": str(exc)}
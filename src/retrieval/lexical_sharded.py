@@ -0,0 +1,406 @@
+"""Hash-partitioned lexical index served by worker processes.
+
+Each shard is a :class:`LexicalBM25` living in its own process, so shards
+score queries in parallel instead of contending for the GIL. The parent
+keeps the corpus statistics of all shards (document frequencies, document
+count and total length), turns every query into a vector weighted by the
+global IDF and sends it to all shards at once; each shard returns its top-k
+and the parent merges them. Scores therefore equal those of a single
+``LexicalBM25`` over the same documents; only equally scored documents may
+come back in a different order, as ties are broken by id instead of slot.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import threading
+import zlib
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .lexical import (
+    DEFAULT_STEM_CACHE_SIZE,
+    BM25Corpus,
+    LexicalBM25,
+    Tokenizer,
+)
+
+DEFAULT_NUM_SHARDS = 2
+
+# Shard calls that change the index reply with a statistics delta
+_MUTATING = {"add_documents", "update_document", "delete_document", "clear"}
+
+# (method, args) sent to a shard; ``None`` leaves the shard out of a fan-out
+_Request = Optional[Tuple[str, Tuple[Any, ...]]]
+
+
+def _items(index: LexicalBM25) -> List[Tuple[str, str]]:
+    return list(zip(index.doc_ids, index.documents, strict=True))
+
+
+_SHARD_CALLS: Dict[str, Callable[..., Any]] = {
+    "add_documents": LexicalBM25.add_documents,
+    "update_document": LexicalBM25.update_document,
+    "delete_document": LexicalBM25.delete_document,
+    "search_vector": LexicalBM25.search_vector,
+    "search_vectors": LexicalBM25.search_vectors,
+    "get_document": LexicalBM25.get_document,
+    "get_documents": LexicalBM25.get_documents,
+    "match_identifiers": LexicalBM25.match_identifiers,
+    "items": _items,
+    "take_stats_delta": LexicalBM25.take_stats_delta,
+    "commit": LexicalBM25.commit,
+    "clear": LexicalBM25.clear,
+    "wait_for_merges": LexicalBM25.wait_for_merges,
+}
+
+
+def _serve_shard(conn: Connection, index_kwargs: Dict[str, Any]) -> None:
+    """Worker loop: apply ``(method, args)`` requests to a local index."""
+    index = LexicalBM25(**index_kwargs)
+    while True:
+        try:
+            method, args = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if method == "close":
+            index.close()
+            conn.send(("ok", None, None))
+            break
+        try:
+            result = _SHARD_CALLS[method](index, *args)
+            delta = index.take_stats_delta() if method in _MUTATING else None
+            conn.send(("ok", result, delta))
+        except Exception as exc:
+            conn.send(("error", f"{type(exc).__name__}: {exc}", None))
+    conn.close()
+
+
+def shard_for(doc_id: str, num_shards: int) -> int:
+    """Stable shard assignment (``hash()`` is salted per process)."""
+    return zlib.crc32(doc_id.encode("utf-8")) % num_shards
+
+
+def _id_order(doc_id: str) -> Tuple[int, int, str]:
+    """Sort key placing numeric ids in insertion order."""
+    return (0, int(doc_id), "") if doc_id.isdigit() else (1, 0, doc_id)
+
+
+class _Shard:
+    """Parent-side handle of one shard process."""
+
+    def __init__(self, ctx: Any, number: int, index_kwargs: Dict[str, Any]) -> None:
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_serve_shard,
+            args=(child, index_kwargs),
+            name=f"bm25-shard-{number}",
+            daemon=True,
+        )
+        self.process.start()
+        child.close()
+        self.lock = threading.Lock()
+
+    def send(self, method: str, *args: Any) -> None:
+        self.conn.send((method, args))
+
+    def receive(self) -> Tuple[Any, Optional[Dict[str, Any]]]:
+        status, result, delta = self.conn.recv()
+        if status != "ok":
+            raise RuntimeError(result)
+        return result, delta
+
+
+class ShardedLexicalBM25(BM25Corpus):
+    """``LexicalBM25`` partitioned by document id across worker processes.
+
+    Exposes the same interface as :class:`LexicalBM25`. Documents are
+    routed to shards by a CRC32 hash of their id; queries fan out to every
+    shard and the partial top-k lists are merged, breaking score ties by
+    insertion order. ``index_kwargs`` are forwarded to every shard; with a
+    ``snapshot_path`` each shard persists to its own file next to it.
+    """
+
+    def __init__(
+        self,
+        num_shards: int = DEFAULT_NUM_SHARDS,
+        tokenizer: Optional[Tokenizer] = None,
+        enable_stemming: bool = False,
+        *,
+        snapshot_path: str | Path | None = None,
+        stem_cache_size: int = DEFAULT_STEM_CACHE_SIZE,
+        prune: bool = False,
+        **index_kwargs: Any,
+    ) -> None:
+        self._logger = logging.getLogger(__name__)
+        self._init_preprocessing(tokenizer, enable_stemming, stem_cache_size)
+        self.prune = prune
+        self.num_shards = max(1, num_shards)
+        self._lock = threading.RLock()
+        self._reset_stats()
+        self._shard_stats: List[Tuple[int, int]] = [(0, 0)] * self.num_shards
+        self._next_id = 0
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        ctx = multiprocessing.get_context("spawn")
+        self._shards: List[_Shard] = []
+        for number in range(self.num_shards):
+            kwargs = {
+                "tokenizer": tokenizer,
+                "enable_stemming": enable_stemming,
+                "stem_cache_size": stem_cache_size,
+                "preprocess_workers": 1,
+                **index_kwargs,
+            }
+            if self.snapshot_path is not None:
+                path = self.snapshot_path
+                kwargs["snapshot_path"] = path.with_name(
+                    f"{path.stem}.shard{number}{path.suffix}"
+                )
+            self._shards.append(_Shard(ctx, number, kwargs))
+        # shards restored from snapshots report their full statistics here
+        for number, delta in enumerate(self._call_all("take_stats_delta")):
+            self._apply_delta(number, delta)
+
+    # ------------------------------------------------------------------
+    # shard communication
+    def _apply_delta(self, number: int, delta: Optional[Dict[str, Any]]) -> None:
+        if delta is None:
+            return
+        with self._lock:
+            changed = delta["df"]
+            if changed:
+                term_ids = self._intern(list(changed))
+                self._grow_df()
+                np.add.at(self._df, term_ids, list(changed.values()))
+            self._shard_stats[number] = (delta["num_docs"], delta["total_len"])
+            self._num_docs = sum(docs for docs, _ in self._shard_stats)
+            self._total_len = sum(length for _, length in self._shard_stats)
+            self._next_id = max(self._next_id, delta["next_id"])
+            self._average_idf_cache = None
+
+    def _call(self, number: int, method: str, *args: Any) -> Any:
+        shard = self._shards[number]
+        with shard.lock:
+            shard.send(method, *args)
+            result, delta = shard.receive()
+        self._apply_delta(number, delta)
+        return result
+
+    def _call_all(self, method: str, *args: Any) -> List[Any]:
+        return self._scatter([(method, args)] * self.num_shards)
+
+    def _scatter(self, requests: Sequence[_Request]) -> List[Any]:
+        """Send one request per shard (``None`` skips it) and gather replies.
+
+        All requests are sent before any reply is read so the shards work in
+        parallel. Shard locks are taken in shard order to avoid deadlocks
+        between concurrent fan-outs.
+        """
+        active = [n for n, request in enumerate(requests) if request is not None]
+        for number in active:
+            self._shards[number].lock.acquire()
+        try:
+            for number in active:
+                request = requests[number]
+                assert request is not None
+                method, args = request
+                self._shards[number].send(method, *args)
+            replies: List[Any] = [None] * self.num_shards
+            errors: List[RuntimeError] = []
+            for number in active:
+                try:
+                    replies[number] = self._shards[number].receive()
+                except RuntimeError as exc:
+                    errors.append(exc)
+        finally:
+            for number in active:
+                self._shards[number].lock.release()
+        results: List[Any] = [None] * self.num_shards
+        for number in active:
+            if replies[number] is not None:
+                result, delta = replies[number]
+                self._apply_delta(number, delta)
+                results[number] = result
+        if errors:
+            raise errors[0]
+        return results
+
+    # ------------------------------------------------------------------
+    # public API
+    @property
+    def doc_ids(self) -> List[str]:
+        """IDs of live documents, numeric ids in insertion order."""
+        return [doc_id for doc_id, _ in self._items()]
+
+    @property
+    def documents(self) -> List[str]:
+        """Text of live documents, in the order of :attr:`doc_ids`."""
+        return [text for _, text in self._items()]
+
+    def _items(self) -> List[Tuple[str, str]]:
+        items = [item for shard in self._call_all("items") for item in shard]
+        return sorted(items, key=lambda item: _id_order(item[0]))
+
+    def get_document(self, doc_id: str) -> Optional[str]:
+        """Return the text of ``doc_id``, or ``None`` if it is not indexed."""
+        return self._call(shard_for(doc_id, self.num_shards), "get_document", doc_id)
+
+    def get_documents(self, doc_ids: Sequence[str]) -> List[Optional[str]]:
+        """Texts of ``doc_ids`` (``None`` for unknown ids), one request per shard."""
+        batches: List[List[str]] = [[] for _ in self._shards]
+        for doc_id in doc_ids:
+            batches[shard_for(doc_id, self.num_shards)].append(doc_id)
+        results = self._scatter(
+            [("get_documents", (batch,)) if batch else None for batch in batches]
+        )
+        texts: Dict[str, Optional[str]] = {}
+        for batch, found in zip(batches, results, strict=True):
+            if batch:
+                texts.update(zip(batch, found, strict=True))
+        return [texts[doc_id] for doc_id in doc_ids]
+
+    def index_documents(
+        self,
+        documents: List[str],
+    ) -> Tuple[List[str], Dict[str, Any]]:
+        """Add documents, spreading them over the shards by id."""
+        try:
+            with self._lock:
+                start = self._next_id
+                self._next_id += len(documents)
+            ids = [str(start + i) for i in range(len(documents))]
+            batches: List[List[Tuple[str, str]]] = [[] for _ in self._shards]
+            for doc_id, text in zip(ids, documents, strict=True):
+                batches[shard_for(doc_id, self.num_shards)].append((doc_id, text))
+            results = self._scatter(
+                [("add_documents", (batch,)) if batch else None for batch in batches]
+            )
+            for result in results:
+                if result is not None and result.get("status") != "success":
+                    raise RuntimeError(result.get("error", "shard indexing failed"))
+            return ids, {"status": "success", "count": len(ids)}
+        except Exception as exc:
+            self._logger.error("Failed to index documents: %s", exc)
+            return [], {"status": "error", "error": str(exc)}
+
+    def query(
+        self, query: str, top_k: int = 5, prune: bool | None = None
+    ) -> Tuple[List[Tuple[str, float]], Dict[str, Any]]:
+        """Query all shards with global IDF and merge their top-k lists."""
+        try:
+            if not self._num_docs:
+                return [], {"status": "empty"}
+            if top_k <= 0:
+                return [], {"retrieved": 0}
+            tokens = self._preprocess(query)
+            with self._lock:
+                terms, weights = self._query_vector(tokens)
+                avgdl = self.avgdl()
+            prune = self.prune if prune is None else prune
+            partial = self._call_all("search_vector", terms, weights, avgdl, top_k, prune)
+            candidates = [item for shard in partial for item in shard]
+            candidates.sort(key=lambda item: (-item[1], _id_order(item[0])))
+            ranked = candidates[:top_k]
+            return ranked, {"retrieved": len(ranked), "shards": self.num_shards}
+        except Exception as exc:
+            self._logger.error("BM25 query failed: %s", exc)
+            return [], {"status": "error", "error": str(exc)}
+
+    def query_batch(
+        self, queries: List[str], top_k: int = 5, prune: bool | None = None
+    ) -> List[Tuple[List[Tuple[str, float]], Dict[str, Any]]]:
+        """Score all ``queries`` on every shard in one round trip per shard."""
+        try:
+            if not self._num_docs:
+                return [([], {"status": "empty"}) for _ in queries]
+            if top_k <= 0:
+                return [([], {"retrieved": 0}) for _ in queries]
+            token_lists = [self._preprocess(query) for query in queries]
+            with self._lock:
+                vectors = [self._query_vector(tokens) for tokens in token_lists]
+                avgdl = self.avgdl()
+            prune = self.prune if prune is None else prune
+            partial = self._call_all("search_vectors", vectors, avgdl, top_k, prune)
+            replies: List[Tuple[List[Tuple[str, float]], Dict[str, Any]]] = []
+            for number in range(len(queries)):
+                candidates = [item for shard in partial for item in shard[number]]
+                candidates.sort(key=lambda item: (-item[1], _id_order(item[0])))
+                ranked = candidates[:top_k]
+                replies.append(
+                    (ranked, {"retrieved": len(ranked), "shards": self.num_shards})
+                )
+            return replies
+        except Exception as exc:
+            self._logger.error("BM25 batch query failed: %s", exc)
+            return [([], {"status": "error", "error": str(exc)}) for _ in queries]
+
+    def match_identifiers(
+        self, query: str, limit: int | None = None
+    ) -> Tuple[List[str], List[Tuple[str, float]]]:
+        """Exact identifier lookup on every shard, merged by occurrences."""
+        replies = self._call_all("match_identifiers", query, limit)
+        hits = [hit for _, shard_hits in replies for hit in shard_hits]
+        hits.sort(key=lambda item: (-item[1], _id_order(item[0])))
+        return replies[0][0], hits if limit is None else hits[:limit]
+
+    def update_document(self, doc_id: str, content: str) -> Dict[str, Any]:
+        """Update existing document content on its shard."""
+        try:
+            number = shard_for(doc_id, self.num_shards)
+            return self._call(number, "update_document", doc_id, content)
+        except Exception as exc:
+            self._logger.error("Failed to update %s: %s", doc_id, exc)
+            return {"status": "error", "error": str(exc)}
+
+    def delete_document(self, doc_id: str) -> Dict[str, Any]:
+        """Remove a document from its shard."""
+        try:
+            return self._call(
+                shard_for(doc_id, self.num_shards), "delete_document", doc_id
+            )
+        except Exception as exc:
+            self._logger.error("Failed to delete %s: %s", doc_id, exc)
+            return {"status": "error", "error": str(exc)}
+
+    def clear(self) -> None:
+        """Drop every document from every shard."""
+        with self._lock:
+            self._reset_stats()
+            self._shard_stats = [(0, 0)] * self.num_shards
+            self._next_id = 0
+        self._call_all("clear")
+
+    def wait_for_merges(self) -> None:
+        self._call_all("wait_for_merges")
+
+    def commit(self) -> Dict[str, Any]:
+        """Persist every shard to its snapshot file."""
+        if self.snapshot_path is None:
+            return {"status": "skipped"}
+        try:
+            results = self._call_all("commit")
+        except Exception as exc:
+            self._logger.error("Failed to save lexical shards: %s", exc)
+            return {"status": "error", "error": str(exc)}
+        errors = [r.get("error") for r in results if r.get("status") == "error"]
+        if errors:
+            return {"status": "error", "error": "; ".join(map(str, errors))}
+        return {"status": "success", "shards": self.num_shards}
+
+    def close(self) -> None:
+        """Stop the shard processes."""
+        for shard in self._shards:
+            if not shard.process.is_alive():
+                continue
+            try:
+                with shard.lock:
+                    shard.send("close")
+                    shard.receive()
+            except (EOFError, OSError, RuntimeError):
+                pass
+            shard.process.join(timeout=5)
+        self._shards = [s for s in self._shards if s.process.is_alive()]
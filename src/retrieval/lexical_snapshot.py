@@ -0,0 +1,166 @@
+"""Versioned on-disk snapshots for the segmented lexical index.
+
+Layout::
+
+    MAGIC (8 bytes) | header length (uint64, little endian) | JSON header
+    | padding | array payload
+
+The JSON header records the format version, caller supplied metadata, the
+SHA-256 of the payload and the offset, dtype and shape of every array.
+Arrays are aligned to 64 bytes so they can be exposed as read-only NumPy
+views over an ``mmap`` of the file: loading is close to free and several
+worker processes that open the same snapshot share its pages.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+SNAPSHOT_MAGIC = b"PRCBM25\x00"
+SNAPSHOT_VERSION = 1
+ALIGNMENT = 64
+
+_LENGTH = struct.Struct("<Q")
+
+
+class StringTable:
+    """Immutable table of UTF-8 strings stored as a byte blob plus offsets."""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray) -> None:
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        return self.blob[start:end].tobytes().decode("utf-8")
+
+    def tolist(self) -> List[str]:
+        data = self.blob.tobytes()
+        bounds = self.offsets.tolist()
+        return [
+            data[start:end].decode("utf-8")
+            for start, end in zip(bounds[:-1], bounds[1:], strict=True)
+        ]
+
+    @classmethod
+    def from_strings(cls, values: Iterable[Optional[str]]) -> "StringTable":
+        """Encode ``values``; ``None`` entries are stored as empty strings."""
+        encoded = [(value or "").encode("utf-8") for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(item) for item in encoded], out=offsets[1:])
+        blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(blob, offsets)
+
+
+def _padding(position: int) -> int:
+    return -position % ALIGNMENT
+
+
+def write_snapshot(
+    path: str | Path,
+    metadata: Dict[str, Any],
+    arrays: Dict[str, np.ndarray],
+) -> None:
+    """Atomically write ``arrays`` and ``metadata`` to ``path``.
+
+    The snapshot is written to a temporary file in the target directory,
+    flushed to disk and then moved into place with :func:`os.replace`, so
+    readers see either the previous snapshot or the new one.
+    """
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    layout: Dict[str, Dict[str, Any]] = {}
+    digest = hashlib.sha256()
+    position = 0
+    contiguous = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    for name, array in contiguous.items():
+        layout[name] = {
+            "offset": position,
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+        }
+        digest.update(memoryview(array).cast("B"))
+        pad = _padding(position + array.nbytes)
+        digest.update(b"\x00" * pad)
+        position += array.nbytes + pad
+    header = json.dumps(
+        {
+            "version": SNAPSHOT_VERSION,
+            "metadata": metadata,
+            "arrays": layout,
+            "payload_bytes": position,
+            "sha256": digest.hexdigest(),
+        }
+    ).encode("utf-8")
+    prefix = len(SNAPSHOT_MAGIC) + _LENGTH.size + len(header)
+    fd, tmp_name = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(SNAPSHOT_MAGIC)
+            handle.write(_LENGTH.pack(len(header)))
+            handle.write(header)
+            handle.write(b"\x00" * _padding(prefix))
+            for array in contiguous.values():
+                handle.write(memoryview(array).cast("B"))
+                handle.write(b"\x00" * _padding(handle.tell()))
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_name, target)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+def read_snapshot(
+    path: str | Path, verify: bool = True
+) -> Tuple[Dict[str, Any], Dict[str, np.ndarray], mmap.mmap]:
+    """Map the snapshot at ``path`` and return its metadata and arrays.
+
+    Arrays are read-only views into the returned ``mmap`` object, which must
+    be kept alive for as long as they are used. With ``verify`` the payload
+    checksum is recomputed and a mismatch raises ``ValueError``.
+    """
+    with open(path, "rb") as handle:
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    if mapped[: len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+        raise ValueError(f"{path} is not a lexical index snapshot")
+    (header_len,) = _LENGTH.unpack_from(mapped, len(SNAPSHOT_MAGIC))
+    header_start = len(SNAPSHOT_MAGIC) + _LENGTH.size
+    header_end = header_start + header_len
+    header = json.loads(mapped[header_start:header_end])
+    if header.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(
+            "Unsupported lexical snapshot version %s (expected %s)"
+            % (header.get("version"), SNAPSHOT_VERSION)
+        )
+    payload_start = header_end + _padding(header_end)
+    payload_end = payload_start + int(header["payload_bytes"])
+    if payload_end > len(mapped):
+        raise ValueError(f"Lexical snapshot {path} is truncated")
+    if verify:
+        digest = hashlib.sha256(memoryview(mapped)[payload_start:payload_end])
+        if digest.hexdigest() != header["sha256"]:
+            raise ValueError(f"Lexical snapshot {path} failed checksum verification")
+    arrays: Dict[str, np.ndarray] = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        shape = tuple(spec["shape"])
+        count = int(np.prod(shape)) if shape else 1
+        array = np.frombuffer(
+            mapped, dtype=dtype, count=count, offset=payload_start + spec["offset"]
+        )
+        arrays[name] = array.reshape(shape)
+    return header["metadata"], arrays, mapped
@@ -0,0 +1,250 @@
+"""ONNX Runtime CPU backend for Sentence-Transformers models.
+
+The full Sentence-Transformers pipeline (transformer, pooling and
+normalisation) is exported to ONNX once and cached on disk, optionally with
+int8 dynamic quantization of the weights, then served through an
+``onnxruntime`` CPU session. The export is checked against the PyTorch
+model once and the result is recorded next to the artifact together with
+the tokenizer, so later loads never build the PyTorch model. ``onnx`` and
+``onnxruntime`` are optional dependencies (the ``onnx-cpu`` extra).
+"""
+
+from __future__ import annotations
+
+import importlib
+import inspect
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+import torch
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_ONNX_CACHE_DIR = Path("data") / "onnx"
+# minimum cosine similarity to the PyTorch embeddings accepted at export
+FP32_MIN_COSINE = 0.9999
+INT8_MIN_COSINE = 0.98
+_PROBES = (
+    "How do I reset my password?",
+    "Quarterly revenue grew by 12 percent compared with last year.",
+    "AB-123",
+)
+
+
+class _SentenceEmbedding(torch.nn.Module):
+    """Traceable wrapper returning the ``sentence_embedding`` output."""
+
+    def __init__(self, model: Any, input_names: Sequence[str]) -> None:
+        super().__init__()
+        self.model = model
+        self.input_names = list(input_names)
+
+    def forward(self, *inputs: torch.Tensor) -> torch.Tensor:
+        features = dict(zip(self.input_names, inputs, strict=True))
+        return self.model(features)["sentence_embedding"]
+
+
+class OnnxSentenceEncoder:
+    """``encode`` compatible stand-in for a ``SentenceTransformer`` on CPU.
+
+    Use :meth:`load` to export (first run) or reuse the cached artifact.
+    """
+
+    def __init__(
+        self, session: Any, tokenizer: Any, max_seq_length: int, path: Path
+    ) -> None:
+        self.session = session
+        self.tokenizer = tokenizer
+        self.max_seq_length = max_seq_length
+        self.path = path
+        self._input_names = [node.name for node in session.get_inputs()]
+
+    @classmethod
+    def load(
+        cls,
+        model: Callable[[], Any],
+        name: str,
+        revision: str,
+        cache_dir: str | Path = DEFAULT_ONNX_CACHE_DIR,
+        quantize: bool = False,
+        intra_op_threads: int = 0,
+    ) -> "OnnxSentenceEncoder":
+        """Open the cached ONNX export of a model, creating it if missing.
+
+        ``model`` returns the ``SentenceTransformer`` and is only called when
+        there is no checked artifact yet. The new export is then compared with
+        it on a few probe sentences, a ``RuntimeError`` is raised when their
+        cosine similarity falls below the fp32 or int8 tolerance, and the
+        result is recorded in ``<artifact>.json``.
+        """
+        cache_dir = Path(cache_dir)
+        stem = f"{name.replace('/', '--')}-{revision}"
+        fp32_path = cache_dir / f"{stem}-fp32.onnx"
+        path = cache_dir / f"{stem}-int8.onnx" if quantize else fp32_path
+        tokenizer_dir = cache_dir / f"{stem}-tokenizer"
+        record_path = path.with_suffix(".json")
+        if path.exists() and record_path.exists() and tokenizer_dir.exists():
+            record = json.loads(record_path.read_text(encoding="utf-8"))
+            transformers = _optional("transformers")
+            tokenizer = transformers.AutoTokenizer.from_pretrained(str(tokenizer_dir))
+            session = _session(path, intra_op_threads)
+            return cls(session, tokenizer, int(record["max_seq_length"]), path)
+
+        reference = model()
+        if not fp32_path.exists():
+            _export(reference, fp32_path)
+        if quantize and not path.exists():
+            _quantize(fp32_path, path)
+        reference.tokenizer.save_pretrained(str(tokenizer_dir))
+        session = _session(path, intra_op_threads)
+        encoder = cls(session, reference.tokenizer, reference.max_seq_length, path)
+        threshold = INT8_MIN_COSINE if quantize else FP32_MIN_COSINE
+        record = {
+            "model": name,
+            "revision": revision,
+            "quantized": quantize,
+            "max_seq_length": int(reference.max_seq_length),
+            "min_cosine": encoder.verify(reference, threshold),
+            "threshold": threshold,
+        }
+        _write_record(record_path, record)
+        return encoder
+
+    def _features(self, sentences: List[str]) -> Dict[str, np.ndarray]:
+        tokens = self.tokenizer(
+            sentences,
+            padding=True,
+            truncation=True,
+            max_length=self.max_seq_length,
+            return_tensors="np",
+        )
+        return {name: tokens[name].astype(np.int64) for name in self._input_names}
+
+    def encode(
+        self,
+        sentences: str | List[str],
+        batch_size: int = 32,
+        **_: Any,
+    ) -> np.ndarray:
+        """Embed ``sentences`` like ``SentenceTransformer.encode``.
+
+        A single string gives a 1-D vector, a list a ``(n, dimension)``
+        float32 matrix.
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        rows: List[np.ndarray] = []
+        for start in range(0, len(texts), max(1, batch_size)):
+            batch = texts[start : start + batch_size]  # noqa: E203
+            (embedding,) = self.session.run(None, self._features(batch))
+            rows.append(np.asarray(embedding, dtype=np.float32))
+        matrix: np.ndarray = (
+            np.concatenate(rows) if rows else np.empty((0, 0), np.float32)
+        )
+        return matrix[0] if single else matrix
+
+    def verify(self, model: Any, min_cosine: float) -> float:
+        """Lowest cosine similarity to ``model`` on the probe sentences."""
+        reference = np.asarray(
+            model.encode(list(_PROBES), show_progress_bar=False), dtype=np.float32
+        )
+        candidate = self.encode(list(_PROBES))
+        cosine = np.sum(reference * candidate, axis=1) / (
+            np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+        )
+        worst = float(cosine.min())
+        if worst < min_cosine:
+            raise RuntimeError(
+                f"ONNX embeddings from {self.path} differ from PyTorch "
+                f"(cosine {worst:.4f} < {min_cosine})"
+            )
+        return worst
+
+
+def _optional(module: str) -> Any:
+    """Import an optional dependency of the ``onnx_cpu`` device."""
+    try:
+        return importlib.import_module(module)
+    except Exception as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError(f"{module} is required for the onnx_cpu device") from exc
+
+
+def _session(path: Path, intra_op_threads: int) -> Any:
+    """ONNX Runtime CPU session over the model at ``path``."""
+    ort = _optional("onnxruntime")
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if intra_op_threads > 0:
+        options.intra_op_num_threads = intra_op_threads
+    return ort.InferenceSession(str(path), options, providers=["CPUExecutionProvider"])
+
+
+def _write_record(path: Path, record: Dict[str, Any]) -> None:
+    """Atomically write the parity ``record`` of an artifact."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(record, handle, indent=2)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _export(model: Any, path: Path) -> None:
+    """Trace ``model`` (a ``SentenceTransformer``) to an ONNX file at ``path``."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    sample = model.tokenizer(list(_PROBES[:2]), padding=True, return_tensors="pt")
+    names = [
+        name
+        for name in ("input_ids", "attention_mask", "token_type_ids")
+        if name in sample
+    ]
+    wrapper = _SentenceEmbedding(model, names).eval()
+    axes = {name: {0: "batch", 1: "sequence"} for name in names}
+    axes["sentence_embedding"] = {0: "batch"}
+    export: Callable[..., Any] = torch.onnx.export  # type: ignore
+    # the TorchScript exporter; newer torch defaults to the dynamo one
+    legacy: Dict[str, Any] = (
+        {"dynamo": False} if "dynamo" in inspect.signature(export).parameters else {}
+    )
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".onnx")
+    os.close(fd)
+    try:
+        with torch.no_grad():
+            export(
+                wrapper,
+                tuple(sample[name] for name in names),
+                tmp,
+                input_names=names,
+                output_names=["sentence_embedding"],
+                dynamic_axes=axes,
+                opset_version=17,
+                **legacy,
+            )
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    _logger.info("Exported ONNX embedding model to %s", path)
+
+
+def _quantize(source: Path, path: Path) -> None:
+    """Write an int8 dynamically quantized copy of ``source`` to ``path``."""
+    quantization = _optional("onnxruntime.quantization")
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".onnx")
+    os.close(fd)
+    try:
+        quantization.quantize_dynamic(
+            str(source), tmp, weight_type=quantization.QuantType.QInt8
+        )
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    _logger.info("Quantized ONNX embedding model to %s", path)
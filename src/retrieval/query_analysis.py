@@ -5,10 +5,9 @@ from __future__ import annotations
 import re
 from typing import Any, Dict, Tuple
 
+from .identifiers import RARE_TOKEN_PATTERN
 from .lexical import LexicalBM25
 
-RARE_TOKEN_PATTERN = re.compile(r"[A-Z]{2,}\-?\d+")
-
 
 def analyze_query(
     query: str,
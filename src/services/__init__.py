@@ -3,7 +3,9 @@
 This module provides small helpers that lazily construct the
 ``DocumentService`` and ``HybridRetriever`` used across the UI layers.  The
 actual dense retriever may be unavailable in offline environments; in that
-case a no-op implementation is used so that lexical search still functions.
+case a no-op implementation is used so that lexical search still functions,
+unless ``dense_backend`` selects the in-process ``LocalVectorStore``.
+The lexical index is restored from its on-disk snapshot when one exists.
 """
 
 from __future__ import annotations
@@ -12,10 +14,23 @@ import os
 from typing import Any, Dict, List, Tuple, cast
 
 from src.config.runtime_config import config_manager
+from src.integrations.ivf_index import DEFAULT_NPROBE
+from src.integrations.local_vector_store import LocalVectorStore
+from src.integrations.pinecone_async import DEFAULT_MAX_CONNECTIONS, AsyncPineconeClient
+from src.monitoring.performance import MetricsDashboard
 from src.query_service import QueryService
-from src.retrieval.dense import DenseRetriever
+from src.retrieval.dense import MODEL_NAME, MODEL_REVISION, DenseRetriever
+from src.retrieval.embedding_batcher import DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_WAIT_MS
+from src.retrieval.embedding_cache import (
+    DEFAULT_DOCUMENT_CACHE_MB,
+    DEFAULT_QUERY_CACHE_SIZE,
+    DocumentEmbeddingCache,
+)
+from src.retrieval.embedding_pool import EmbeddingPool
 from src.retrieval.hybrid import HybridRetriever
 from src.retrieval.lexical import LexicalBM25
+from src.retrieval.lexical_sharded import ShardedLexicalBM25
+from src.retrieval.onnx_encoder import DEFAULT_ONNX_CACHE_DIR
 from src.services.document_service import DocumentService
 
 try:  # pragma: no cover - optional dependency
@@ -27,9 +42,7 @@ except Exception:  # pragma: no cover
 class NoopDenseRetriever:
     """Fallback dense retriever that performs no operations."""
 
-    def index_corpus(
-        self, *args: Any, **kwargs: Any
-    ) -> Tuple[List[str], Dict[str, str]]:
+    def index_corpus(self, *args: Any, **kwargs: Any) -> Tuple[List[str], Dict[str, str]]:
         return [], {"status": "noop"}
 
     index_corpus_sync = index_corpus
@@ -49,9 +62,7 @@ class NoopDenseRetriever:
 
     delete_document_sync = delete_document
 
-    def validate_index(
-        self, *args: Any, **kwargs: Any
-    ) -> Tuple[bool, Dict[str, str]]:
+    def validate_index(self, *args: Any, **kwargs: Any) -> Tuple[bool, Dict[str, str]]:
         return True, {"status": "noop"}
 
 
@@ -64,21 +75,85 @@ def _build_components() -> Tuple[DocumentService, HybridRetriever, QueryService]
     """Construct core service instances with safe fallbacks."""
 
     dense_retriever: DenseRetriever | NoopDenseRetriever
-    if PineconeClient is not None and os.getenv("PINECONE_API_KEY"):
+    index_name = config_manager.get("pinecone_dense_index", "dense-index")
+    dashboard = MetricsDashboard()
+    dense_options: Dict[str, Any] = {"dashboard": dashboard}
+    # 0 is meaningful for these settings, so only None falls back to the default
+    for option, key, default in [
+        ("query_cache_size", "query_embedding_cache_size", DEFAULT_QUERY_CACHE_SIZE),
+        ("query_batch_size", "query_batch_max_size", DEFAULT_MAX_BATCH_SIZE),
+        ("query_batch_wait_ms", "query_batch_max_wait_ms", DEFAULT_MAX_WAIT_MS),
+    ]:
+        value = config_manager.get(key)
+        dense_options[option] = type(default)(value if value is not None else default)
+    if config_manager.get("device") == "onnx_cpu":
+        dense_options["device"] = "onnx_cpu"
+        dense_options["precision"] = config_manager.get("precision") or "fp32"
+        dense_options["onnx_cache_dir"] = (
+            config_manager.get("onnx_cache_path") or DEFAULT_ONNX_CACHE_DIR
+        )
+        dense_options["onnx_threads"] = int(
+            config_manager.get("onnx_intra_op_threads") or 0
+        )
+    workers = int(config_manager.get("embedding_workers") or 1)
+    if workers > 1:
+        dense_options["embedding_pool"] = EmbeddingPool.for_model(
+            MODEL_NAME,
+            MODEL_REVISION,
+            workers,
+            int(config_manager.get("embedding_worker_threads") or 0),
+        )
+    cache_path = config_manager.get("embedding_cache_path")
+    if cache_path:
+        cache_mb = int(
+            config_manager.get("embedding_cache_max_mb") or DEFAULT_DOCUMENT_CACHE_MB
+        )
+        dense_options["document_cache"] = DocumentEmbeddingCache(
+            cache_path, max_bytes=cache_mb * 1024**2
+        )
+    if config_manager.get("dense_backend") == "local":
+        store = LocalVectorStore(
+            config_manager.get("local_vector_path") or None,
+            index_type=config_manager.get("local_vector_index") or "flat",
+            nlist=config_manager.get("ivf_nlist") or None,
+            nprobe=int(config_manager.get("ivf_nprobe") or DEFAULT_NPROBE),
+            quantization=config_manager.get("embedding_quantization") or "none",
+        )
+        dense_retriever = DenseRetriever(store, index_name, **dense_options)
+    elif PineconeClient is not None and os.getenv("PINECONE_API_KEY"):
         try:
             client = PineconeClient()
-            index_name = config_manager.get("pinecone_dense_index", "dense-index")
-            dense_retriever = DenseRetriever(client, index_name)
+            if config_manager.get("pinecone_async_queries"):
+                dense_options["async_client"] = AsyncPineconeClient(
+                    max_connections=int(
+                        config_manager.get("pinecone_max_connections")
+                        or DEFAULT_MAX_CONNECTIONS
+                    )
+                )
+            dense_retriever = DenseRetriever(client, index_name, **dense_options)
         except Exception:  # pragma: no cover - fallback on any failure
             dense_retriever = NoopDenseRetriever()
     else:
         dense_retriever = NoopDenseRetriever()
 
-    lexical_retriever = LexicalBM25()
+    lexical_retriever: LexicalBM25 | ShardedLexicalBM25
+    snapshot_path = config_manager.get("lexical_index_path") or None
+    shards = int(config_manager.get("lexical_shards") or 1)
+    if shards > 1:
+        # same interface as LexicalBM25, served by worker processes
+        lexical_retriever = cast(
+            LexicalBM25, ShardedLexicalBM25(shards, snapshot_path=snapshot_path)
+        )
+    else:
+        lexical_retriever = LexicalBM25(snapshot_path=snapshot_path)
     dense_instance = cast(DenseRetriever, dense_retriever)
-    hybrid = HybridRetriever(dense_instance, lexical_retriever)
+    hybrid = HybridRetriever(
+        dense_instance,
+        lexical_retriever,
+        exact_match_max_hits=int(config_manager.get("exact_match_max_hits") or 0),
+    )
     document_service = DocumentService(dense_instance, lexical_retriever)
-    query_service = QueryService(hybrid)
+    query_service = QueryService(hybrid, dashboard=dashboard)
     return document_service, hybrid, query_service
 
 
@@ -109,10 +184,29 @@ def get_query_service() -> QueryService:
     return _query_service
 
 
+def shutdown_services() -> None:
+    """Save pending lexical edits and release the shared services' workers."""
+
+    global _document_service, _hybrid_retriever, _query_service
+    if _document_service is not None:
+        _document_service.index_management.flush()
+    if _hybrid_retriever is not None:
+        _hybrid_retriever.close()
+        pool: EmbeddingPool | None = getattr(
+            _hybrid_retriever.dense, "embedding_pool", None
+        )
+        if pool is not None:
+            pool.close()
+        close_lexical = getattr(_hybrid_retriever.lexical, "close", None)
+        if callable(close_lexical):
+            close_lexical()
+    _document_service = _hybrid_retriever = _query_service = None
+
+
 __all__ = [
     "get_document_service",
     "get_hybrid_retriever",
     "get_query_service",
+    "shutdown_services",
     "NoopDenseRetriever",
 ]
-
@@ -137,6 +137,7 @@ class DocumentService:
             if progress:
                 progress(step / total_steps, "Indexing lexical documents")
             lexical_ids, lexical_meta = self.lexical_retriever.index_documents(all_chunks)
+            self._commit_lexical()
         if progress:
             progress(1.0, "Ingestion complete")
         metrics = perf.metrics()
@@ -148,6 +149,17 @@ class DocumentService:
             "chunk_count": len(all_chunks),
         }
 
+    def _commit_lexical(self) -> None:
+        """Persist the lexical index snapshot if the retriever supports it."""
+        commit: Callable[[], Dict[str, Any] | None] | None = getattr(
+            self.lexical_retriever, "commit", None
+        )
+        if commit is None:
+            return
+        result = commit()
+        if result is not None and result.get("status") == "error":
+            self._logger.warning("Lexical snapshot not saved: %s", result.get("error"))
+
     # Index management
     def update_document(
         self, doc_id: str, content: str, metadata: Dict[str, Any] | None = None
@@ -1,26 +1,63 @@
 import datetime
 import json
 import logging
+import threading
 from pathlib import Path
 from typing import Any, Dict, List
 
 from src.retrieval.dense import DenseRetriever
 from src.retrieval.lexical import LexicalBM25
 
+# Single edits within this many seconds share one lexical snapshot write
+COMMIT_DELAY_SECONDS = 2.0
+
 
 class IndexManagement:
-    """Manage index updates, deletions, and health checks."""
+    """Manage index updates, deletions, and health checks.
+
+    Single updates and deletes do not save the lexical snapshot themselves:
+    the first edit schedules a commit ``commit_delay`` seconds later and
+    every edit until then rides along, so a burst of edits costs one
+    snapshot write. :meth:`flush` writes a pending commit at once; with
+    ``commit_delay <= 0`` every edit commits immediately.
+    """
 
-    def __init__(self, dense: DenseRetriever, lexical: LexicalBM25) -> None:
+    def __init__(
+        self,
+        dense: DenseRetriever,
+        lexical: LexicalBM25,
+        commit_delay: float = COMMIT_DELAY_SECONDS,
+    ) -> None:
         self._logger = logging.getLogger(__name__)
         self.dense = dense
         self.lexical = lexical
+        self.commit_delay = commit_delay
         self._audit_log: List[Dict[str, Any]] = []
+        self._commit_timer: threading.Timer | None = None
+        self._commit_lock = threading.Lock()
 
     def update_document(
         self, doc_id: str, content: str, metadata: Dict[str, Any] | None = None
     ) -> Dict[str, Any]:
         """Update document in both dense and lexical indices."""
+        result = self._update(doc_id, content, metadata)
+        self._schedule_commit()
+        return result
+
+    def delete_document(self, doc_id: str) -> Dict[str, Any]:
+        """Delete document from both dense and lexical indices."""
+        result = self._delete(doc_id)
+        self._schedule_commit()
+        return result
+
+    def flush(self) -> None:
+        """Write a pending lexical commit now instead of when it is due."""
+        if self._take_pending_commit():
+            self._commit_lexical()
+
+    def _update(
+        self, doc_id: str, content: str, metadata: Dict[str, Any] | None = None
+    ) -> Dict[str, Any]:
         metadata = metadata or {}
         dense_result = self.dense.update_document(doc_id, content, metadata)
         lexical_result = self.lexical.update_document(doc_id, content)
@@ -34,8 +71,7 @@ class IndexManagement:
         self._audit_log.append(entry)
         return {"dense": dense_result, "lexical": lexical_result}
 
-    def delete_document(self, doc_id: str) -> Dict[str, Any]:
-        """Delete document from both dense and lexical indices."""
+    def _delete(self, doc_id: str) -> Dict[str, Any]:
         dense_result = self.dense.delete_document(doc_id)
         lexical_result = self.lexical.delete_document(doc_id)
         entry = {
@@ -48,6 +84,33 @@ class IndexManagement:
         self._audit_log.append(entry)
         return {"dense": dense_result, "lexical": lexical_result}
 
+    def _schedule_commit(self) -> None:
+        if self.commit_delay <= 0:
+            self._commit_lexical()
+            return
+        with self._commit_lock:
+            if self._commit_timer is not None:
+                return
+            timer = threading.Timer(self.commit_delay, self.flush)
+            timer.daemon = True
+            self._commit_timer = timer
+        timer.start()
+
+    def _take_pending_commit(self) -> bool:
+        """Cancel the scheduled commit; returns whether one was pending."""
+        with self._commit_lock:
+            timer, self._commit_timer = self._commit_timer, None
+        if timer is None:
+            return False
+        timer.cancel()
+        return True
+
+    def _commit_lexical(self) -> None:
+        """Persist the lexical index snapshot if the retriever supports it."""
+        commit = getattr(self.lexical, "commit", None)
+        if callable(commit):
+            commit()
+
     def log_retrieval(
         self,
         query: str,
@@ -72,21 +135,26 @@ class IndexManagement:
         self,
         operations: List[Dict[str, Any]],
     ) -> Dict[str, Any]:
-        """Execute bulk update/delete operations."""
+        """Execute bulk update/delete operations.
+
+        The lexical snapshot is saved once after the whole batch.
+        """
         results: List[Dict[str, Any]] = []
         for op in operations:
             action = op.get("action")
             if action == "update":
-                res = self.update_document(
+                res = self._update(
                     op["doc_id"],
                     op["content"],
                     op.get("metadata", {}),
                 )
             elif action == "delete":
-                res = self.delete_document(op["doc_id"])
+                res = self._delete(op["doc_id"])
             else:
                 res = {"status": "error", "error": f"unknown action {action}"}
             results.append({"action": action, "result": res})
+        self._take_pending_commit()
+        self._commit_lexical()
         return {"results": results}
 
     def index_health_check(self) -> Dict[str, Any]:
@@ -0,0 +1,69 @@
+"""Long-lived event loop for running coroutines from synchronous code.
+
+``asyncio.run`` creates and closes a loop on every call, which puts loop
+setup on the hot path and stops loop-bound primitives from being shared
+between calls. :class:`BackgroundLoop` owns one loop in a daemon thread;
+synchronous callers submit coroutines with
+:func:`asyncio.run_coroutine_threadsafe` and block on the result.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class BackgroundLoop:
+    """An event loop running forever in its own daemon thread."""
+
+    def __init__(self, name: str = "background-loop") -> None:
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name=name, daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self._loop
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> "Future[T]":
+        """Schedule ``coro`` on the loop and return a concurrent future."""
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("cannot block on the background loop from its own thread")
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """Run ``coro`` on the loop and wait for its result."""
+        return self.submit(coro).result(timeout)
+
+    def close(self) -> None:
+        if self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+_shared: Optional[BackgroundLoop] = None
+_shared_lock = threading.Lock()
+
+
+def get_background_loop() -> BackgroundLoop:
+    """Process-wide :class:`BackgroundLoop`, started on first use."""
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = BackgroundLoop()
+    return _shared
+
+
+def run_sync(coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+    """Run ``coro`` on the shared background loop from synchronous code."""
+    return get_background_loop().run(coro, timeout)
@@ -0,0 +1,40 @@
+"""Batching helpers for model inference."""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Callable, List, Sequence
+
+import numpy as np
+
+_logger = logging.getLogger(__name__)
+
+
+def token_lengths(
+    tokenizer: Callable[..., Any] | None, texts: Sequence[str]
+) -> List[int]:
+    """Token counts of ``texts`` from ``tokenizer``, else whitespace word counts."""
+    if tokenizer is not None:
+        try:
+            encoded = tokenizer(list(texts), add_special_tokens=False, truncation=True)
+            lengths = [len(row) for row in encoded["input_ids"]]
+            if len(lengths) == len(texts):
+                return lengths
+        except Exception as exc:  # pragma: no cover - falls back below
+            _logger.debug("Tokenizer length estimate failed: %s", exc)
+    return [len(text.split()) for text in texts]
+
+
+def length_sorted_batches(lengths: Sequence[int], batch_size: int) -> List[np.ndarray]:
+    """Split item indices into batches of similar ``lengths``.
+
+    Items are ordered longest first (ties keep their input order) and cut
+    into runs of ``batch_size``, so padding each batch to its longest member
+    wastes little compute. Write results back through the returned indices
+    to restore the input order.
+    """
+    order = np.argsort(-np.asarray(lengths, dtype=np.int64), kind="stable")
+    size = max(1, batch_size)
+    return [
+        order[start : start + size] for start in range(0, len(order), size)  # noqa: E203
+    ]
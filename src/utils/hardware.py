@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+import importlib
 import logging
+from typing import Any
 
 _logger = logging.getLogger(__name__)
 
@@ -34,21 +36,35 @@ def has_torch_xpu() -> bool:
         return False
 
 
+def has_onnxruntime() -> bool:
+    """Return True if ONNX Runtime with the CPU provider is installed."""
+    try:
+        onnxruntime: Any = importlib.import_module("onnxruntime")
+        return "CPUExecutionProvider" in onnxruntime.get_available_providers()
+    except Exception as exc:  # pragma: no cover
+        _logger.debug("ONNX Runtime check failed: %s", exc)
+        return False
+
+
 def detect_device(preference: str) -> str:
     """Detect best compute backend based on user preference and availability.
 
     Parameters
     ----------
     preference: str
-        Desired backend: "xpu", "openvino", or "auto". Case-insensitive.
+        Desired backend: "xpu", "openvino", "onnx_cpu", or "auto".
+        Case-insensitive.
 
     Returns
     -------
     str
-        Selected backend identifier: "xpu", "openvino", or "cpu".
+        Selected backend identifier: "xpu", "openvino", "onnx_cpu", or "cpu".
     """
     pref = (preference or "").lower()
 
+    if pref == "onnx_cpu":
+        return "onnx_cpu" if has_onnxruntime() else "cpu"
+
     if pref == "xpu":
         if has_torch_xpu():
             return "xpu"
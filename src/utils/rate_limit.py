@@ -0,0 +1,53 @@
+"""Request rate limiting."""
+
+from __future__ import annotations
+
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing ``rate`` requests per second.
+
+    Up to ``capacity`` requests may go out back to back; after that each
+    :meth:`acquire` reserves the next free slot and sleeps until it. The
+    rate adapts AIMD style: :meth:`throttle` cuts it (e.g. on HTTP 429) down
+    to no less than ``min_rate`` and :meth:`recover` grows it back towards
+    the configured rate in steps of a tenth.
+    """
+
+    def __init__(
+        self, rate: float, capacity: float = 1.0, min_rate: float | None = None
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(rate, min_rate if min_rate is not None else rate / 16)
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until it is available; returns the wait."""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = max(0.0, now - self._updated)
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+            self._tokens -= 1.0
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def throttle(self, factor: float = 0.5) -> None:
+        """Multiply the rate by ``factor`` (not below ``min_rate``)."""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * factor)
+
+    def recover(self) -> None:
+        """Raise the rate by a tenth of the configured rate, up to it."""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
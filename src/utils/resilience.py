@@ -0,0 +1,98 @@
+"""Retry policies and a circuit breaker for remote calls."""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a backend whose circuit breaker is open."""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How often and how patiently to retry one kind of operation.
+
+    Backoff uses "full jitter": before retry ``n`` (0-based) the caller sleeps
+    a uniform random time up to ``min(max_delay, base_delay * 2**n)``, which
+    keeps concurrent clients from retrying in lockstep.
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 8.0
+
+    def backoff(self, retry: int) -> float:
+        """Seconds to wait before retry number ``retry``."""
+        return random.uniform(0.0, min(self.max_delay, self.base_delay * 2**retry))
+
+
+class CircuitBreaker:
+    """Fail fast while a backend keeps failing.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    :meth:`allow` refuses calls for ``reset_timeout`` seconds. Then a single
+    probe call is let through (half-open): success closes the circuit,
+    failure opens it for another ``reset_timeout``. A rate-limited probe
+    says nothing about the backend's health, so it re-opens the circuit
+    without counting as a failure.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """``"closed"``, ``"open"`` or ``"half_open"`` (probe allowed or running)."""
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._probing or time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now; claims the probe when half-open."""
+        return self.admit() is not None
+
+    def admit(self) -> str | None:
+        """Like :meth:`allow`, but says how the call was let through.
+
+        Returns ``"closed"`` for an ordinary call, ``"probe"`` when the call
+        claimed the half-open probe, and ``None`` when it is refused.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._probing or time.monotonic() - self._opened_at < self.reset_timeout:
+                return None
+            self._probing = True
+            return "probe"
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def record_rate_limited(self) -> None:
+        """Record a throttled call; releases a running probe and re-opens."""
+        with self._lock:
+            if self._probing:
+                self._opened_at = time.monotonic()
+                self._probing = False
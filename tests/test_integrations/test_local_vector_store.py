@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pytest
+
+from src.integrations import local_vector_store
+from src.integrations.local_vector_store import LocalVectorStore
+
+
+def _vectors(count: int, dimension: int = 8, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(size=(count, dimension)).astype(np.float32)
+
+
+def test_query_matches_brute_force_cosine() -> None:
+    data = _vectors(50)
+    store = LocalVectorStore()
+    store.upsert_embeddings(
+        "idx", [(str(i), row.tolist(), {"n": i}) for i, row in enumerate(data)]
+    )
+    queries = _vectors(3, seed=1)
+    responses = store.query_batch("idx", queries.tolist(), top_k=5)
+
+    unit = data / np.linalg.norm(data, axis=1, keepdims=True)
+    for query, response in zip(queries, responses, strict=True):
+        expected = np.argsort(-(unit @ (query / np.linalg.norm(query))))[:5]
+        assert [m["id"] for m in response.matches] == [str(i) for i in expected]
+        assert response.matches[0]["metadata"]["n"] == expected[0]
+    single = store.query("idx", queries[0].tolist(), top_k=5).matches
+    assert [m["id"] for m in single] == [m["id"] for m in responses[0].matches]
+    assert [m["score"] for m in single] == pytest.approx(
+        [m["score"] for m in responses[0].matches], rel=1e-5
+    )
+
+
+def test_delete_and_upsert_reuse_rows() -> None:
+    data = _vectors(4)
+    store = LocalVectorStore()
+    store.upsert_embeddings("idx", [(str(i), row, {}) for i, row in enumerate(data)])
+    store.delete_embeddings("idx", ["1", "missing"])
+    hits = store.query("idx", data[1], top_k=10).matches
+    assert "1" not in [m["id"] for m in hits]
+    assert len(hits) == 3
+
+    store.upsert_embeddings("idx", [("new", data[1], {})])
+    assert store.query("idx", data[1], top_k=1).matches[0]["id"] == "new"
+    assert store.describe_index_stats("idx")["total_vector_count"] == 4
+
+
+def test_persists_to_memory_mapped_files(tmp_path: Path) -> None:
+    data = _vectors(6)
+    store = LocalVectorStore(tmp_path)
+    store.upsert_embeddings("idx", [(str(i), row, {}) for i, row in enumerate(data)])
+    store.delete_embeddings("idx", ["2"])
+    expected = store.query("idx", data[0], top_k=3).matches
+
+    restored = LocalVectorStore(tmp_path)
+    assert restored.query("idx", data[0], top_k=3).matches == expected
+    assert isinstance(restored._indexes["idx"].vectors, np.memmap)
+    assert restored.validate_index("idx", 8)
+    assert not restored.validate_index("idx", 384)
+    restored.upsert_embeddings("idx", [("2", data[2], {})])
+    assert restored.query("idx", data[2], top_k=1).matches[0]["id"] == "2"
+
+
+def _ids(response) -> list[str]:
+    return [m["id"] for m in response.matches]
+
+
+def test_ivf_search_with_incremental_updates(tmp_path: Path) -> None:
+    data = _vectors(600, seed=2)
+    exact = LocalVectorStore()
+    ivf = LocalVectorStore(tmp_path, index_type="ivf", nlist=8, train_threshold=500)
+    for store in (exact, ivf):
+        store.upsert_embeddings("idx", [(str(i), row, {}) for i, row in enumerate(data)])
+    assert ivf.describe_index_stats("idx")["ann_trained"]
+
+    extra = _vectors(20, seed=3)
+    for store in (exact, ivf):
+        store.upsert_embeddings(
+            "idx", [(f"x{i}", row, {}) for i, row in enumerate(extra)]
+        )
+        store.delete_embeddings("idx", ["0", "x1"])
+    queries = [data[0], extra[1], extra[2], data[5]]
+    for query in queries:
+        expected = _ids(exact.query("idx", query, top_k=5))
+        # probing every cluster is exhaustive
+        assert _ids(ivf.query("idx", query, top_k=5, nprobe=8)) == expected
+    assert _ids(ivf.query("idx", extra[2], top_k=1, nprobe=1)) == ["x2"]
+
+    restored = LocalVectorStore(tmp_path, index_type="ivf", nlist=8, train_threshold=500)
+    assert _ids(restored.query("idx", data[5], top_k=5, nprobe=8)) == _ids(
+        exact.query("idx", data[5], top_k=5)
+    )
+    assert restored.describe_index_stats("idx")["ann_trained"]
+
+
+@pytest.mark.parametrize("mode", ["int8", "binary"])
+def test_quantized_scan_rescores_float16(tmp_path: Path, mode: str) -> None:
+    data = _vectors(300, dimension=64, seed=4)
+    exact = LocalVectorStore()
+    store = LocalVectorStore(tmp_path, quantization=mode, rescore_candidates=100)
+    for target in (exact, store):
+        target.upsert_embeddings("idx", [(str(i), row, {}) for i, row in enumerate(data)])
+        target.delete_embeddings("idx", ["7"])
+    index = store._indexes["idx"]
+    assert index.vectors.dtype == np.float16
+    assert index.codes is not None
+    assert index.codes.nbytes < exact._indexes["idx"].vectors.nbytes / 3
+
+    for query in (data[3], data[10], data[7]):
+        expected = exact.query("idx", query, top_k=5).matches
+        found = store.query("idx", query, top_k=5).matches
+        assert "7" not in _ids(store.query("idx", query, top_k=300))
+        assert found[0]["id"] == expected[0]["id"]
+        assert found[0]["score"] == pytest.approx(expected[0]["score"], abs=1e-3)
+
+    restored = LocalVectorStore(tmp_path, quantization=mode)
+    assert _ids(restored.query("idx", data[3], top_k=5)) == _ids(
+        store.query("idx", data[3], top_k=5)
+    )
+    assert isinstance(restored._indexes["idx"].vectors, np.memmap)
+    # reopening with another mode re-encodes from the stored vectors
+    plain = LocalVectorStore(tmp_path)
+    assert plain.query("idx", data[10], top_k=1).matches[0]["id"] == "10"
+
+
+def test_quantized_rows_stay_file_backed(tmp_path: Path) -> None:
+    data = _vectors(1500, dimension=16, seed=5)
+    memory = LocalVectorStore(quantization="int8")
+    disk = LocalVectorStore(tmp_path, quantization="int8")
+    for store in (memory, disk):
+        store.upsert_embeddings("idx", [(str(i), row, {}) for i, row in enumerate(data)])
+        assert isinstance(store._indexes["idx"].vectors, np.memmap)
+        assert store.query("idx", data[1200], top_k=1).matches[0]["id"] == "1200"
+    assert (tmp_path / "idx" / "g0" / "vectors.f16").stat().st_size >= 1500 * 16 * 2
+
+    disk.delete_index("idx")
+    assert not (tmp_path / "idx").exists()
+
+
+def test_mutations_append_and_compact(tmp_path: Path) -> None:
+    data = _vectors(40)
+    store = LocalVectorStore(tmp_path, compaction_threshold=0.25)
+    store.upsert_embeddings("idx", [(str(i), row, {}) for i, row in enumerate(data)])
+    ids_file = tmp_path / "idx" / "g0" / "ids.jsonl"
+    size = ids_file.stat().st_size
+    store.upsert_embeddings("idx", [("3", data[4], {"v": 2})])
+    store.delete_embeddings("idx", ["5", "6"], namespace="ignored")
+    assert ids_file.stat().st_size > size
+    assert (tmp_path / "idx" / "g0" / "tombstones.i64").stat().st_size == 16
+
+    restored = LocalVectorStore(tmp_path)
+    assert restored.describe_index_stats("idx")["total_vector_count"] == 38
+    hit = restored.query("idx", data[4], top_k=2).matches
+    assert {m["id"] for m in hit} == {"3", "4"}
+    assert "5" not in _ids(restored.query("idx", data[5], top_k=40))
+
+    restored.delete_embeddings("idx", [str(i) for i in range(7, 15)])
+    assert (tmp_path / "idx" / "g1").exists()
+    assert not (tmp_path / "idx" / "g0").exists()
+    assert len(restored._indexes["idx"].ids) == 30
+    reopened = LocalVectorStore(tmp_path)
+    assert reopened.describe_index_stats("idx")["total_vector_count"] == 30
+    assert reopened.query("idx", data[20], top_k=1).matches[0]["id"] == "20"
+
+
+def test_batch_search_scores_outside_the_store_lock(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    data = _vectors(20)
+    store = LocalVectorStore(tmp_path, compaction_threshold=0.1)
+    store.upsert_embeddings("idx", [(str(i), row, {}) for i, row in enumerate(data)])
+    search = local_vector_store._IndexView.search
+
+    def write_meanwhile(view: Any, *args: Any) -> Any:
+        # deletes past the threshold compact the index into a new generation
+        def write() -> None:
+            store.delete_embeddings("idx", ["0", "1", "2"])
+            store.upsert_embeddings("idx", [("new", data[0], {})])
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        writer.join(timeout=5)
+        assert not writer.is_alive()
+        return search(view, *args)
+
+    monkeypatch.setattr(local_vector_store._IndexView, "search", write_meanwhile)
+    [response] = store.query_batch("idx", [data[0]], top_k=1)
+    assert response.matches[0]["id"] == "0"
+    monkeypatch.undo()
+    assert (tmp_path / "idx" / "g1").exists()
+    assert store.query("idx", data[0], top_k=1).matches[0]["id"] == "new"
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, cast
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from src.integrations.pinecone_async import AsyncPineconeClient
+from src.integrations.pinecone_client import EMBEDDING_DIMENSION
+from src.retrieval.dense import DenseRetriever
+from src.utils.resilience import CircuitBreaker
+
+
+class FakePinecone(ThreadingHTTPServer):
+    """Control and data plane of one index, recording connections."""
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.url = f"http://127.0.0.1:{self.server_address[1]}"
+        self.connections: set = set()
+        self.vectors: Dict[str, List[float]] = {}
+        self.api_keys: set = set()
+        self.fail_queries = 0
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def fake(self) -> FakePinecone:
+        return cast(FakePinecone, self.server)
+
+    def setup(self) -> None:
+        super().setup()
+        with self.fake.lock:
+            self.fake.connections.add(self.client_address)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _reply(self, status: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        self.fake.api_keys.add(self.headers.get("Api-Key"))
+        self._reply(200, {"dimension": EMBEDDING_DIMENSION, "host": self.fake.url})
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.path == "/vectors/upsert":
+            for vector in body["vectors"]:
+                self.fake.vectors[vector["id"]] = vector["values"]
+            self._reply(200, {"upsertedCount": len(body["vectors"])})
+            return
+        with self.fake.lock:
+            failing = self.fake.fail_queries > 0
+            self.fake.fail_queries -= failing
+            self.fake.active += 1
+            self.fake.peak = max(self.fake.peak, self.fake.active)
+        time.sleep(0.02)
+        with self.fake.lock:
+            self.fake.active -= 1
+        if failing:
+            self._reply(503, {"error": "unavailable"})
+            return
+        matches = [
+            {"id": doc_id, "score": float(np.dot(values, body["vector"]))}
+            for doc_id, values in self.fake.vectors.items()
+        ]
+        matches.sort(key=lambda match: -match["score"])
+        self._reply(200, {"matches": matches[: body["topK"]]})
+
+
+@pytest.fixture
+def server() -> Iterator[FakePinecone]:
+    server = FakePinecone()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_concurrent_queries_share_pooled_connections(server: FakePinecone) -> None:
+    vectors = [
+        (str(i), np.eye(EMBEDDING_DIMENSION)[i].tolist(), {"n": i}) for i in range(5)
+    ]
+    server.fail_queries = 1
+
+    async def run() -> List[Any]:
+        client = AsyncPineconeClient(
+            api_key="key", controller_url=server.url, max_connections=4
+        )
+        try:
+            report = await client.upsert_embeddings("idx", vectors, batch_size=2)
+            assert report == {"vectors": 5, "retries": 0}
+            queries = [
+                client.query("idx", np.eye(EMBEDDING_DIMENSION)[i % 5], top_k=1)
+                for i in range(40)
+            ]
+            return await asyncio.gather(*queries)
+        finally:
+            await client.aclose()
+
+    responses = asyncio.run(run())
+    assert [r.matches[0]["id"] for r in responses] == [str(i % 5) for i in range(40)]
+    assert len(server.vectors) == 5
+    assert server.api_keys == {"key"}
+    assert len(server.connections) <= 4
+    assert server.peak > 1
+
+
+@patch("src.retrieval.dense.SentenceTransformer")
+def test_dense_retriever_awaits_async_client(mock_model, server: FakePinecone) -> None:
+    server.vectors = {"doc": [1.0] + [0.0] * (EMBEDDING_DIMENSION - 1)}
+    model = MagicMock()
+    model.get_sentence_embedding_dimension.return_value = EMBEDDING_DIMENSION
+    model.encode.return_value = np.eye(EMBEDDING_DIMENSION)[0]
+    mock_model.return_value = model
+    sync_client = MagicMock()
+    sync_client.circuit_open = False
+    retriever = DenseRetriever(
+        sync_client,
+        "idx",
+        async_client=AsyncPineconeClient(api_key="key", controller_url=server.url),
+    )
+    results, meta = retriever.query_sync("hello", top_k=1)
+    assert results == [("doc", 1.0)] and meta == {"retrieved": 1}
+    sync_client.query.assert_not_called()
+
+
+def test_cancelled_call_releases_only_its_own_probe() -> None:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    client = AsyncPineconeClient(api_key="key", breakers={"query": breaker})
+
+    async def hang() -> Any:
+        await asyncio.sleep(10)
+
+    async def cancel_call(opened_meanwhile: bool) -> None:
+        task = asyncio.create_task(client._with_retries(hang, "query"))
+        await asyncio.sleep(0)
+        if opened_meanwhile:
+            breaker.record_failure()
+            assert breaker.admit() == "probe"
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    async def run() -> None:
+        # admitted while closed: the probe claimed meanwhile stays claimed
+        await cancel_call(opened_meanwhile=True)
+        assert breaker.state == "half_open" and not breaker.allow()
+        # a cancelled probe is released and re-opens the circuit
+        breaker.record_failure()
+        await cancel_call(opened_meanwhile=False)
+        assert breaker.admit() == "probe"
+
+    asyncio.run(run())
@@ -1,14 +1,17 @@
 from __future__ import annotations
 
 import pytest
+import threading
 import types
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Sequence, Tuple
 
 from src.integrations import pinecone_client
 from src.integrations.pinecone_client import (
     EMBEDDING_DIMENSION,
     PineconeClient,
 )
+from src.utils import resilience
+from src.utils.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy
 
 
 class FakeIndex:
@@ -36,6 +39,10 @@ class FakeIndex:
         return {"matches": []}
 
 
+def _zero_vectors(count: int) -> List[Tuple[str, Sequence[float], Dict[str, Any]]]:
+    return [(str(i), [0.0] * EMBEDDING_DIMENSION, {}) for i in range(count)]
+
+
 def test_create_index_retries(monkeypatch: pytest.MonkeyPatch) -> None:
     calls: Dict[str, int] = {"create": 0, "init": 0}
 
@@ -106,21 +113,80 @@ def test_upsert_batches_and_retries(monkeypatch: pytest.MonkeyPatch) -> None:
 
     client = PineconeClient(api_key="key", environment="env")
     sleep_calls: List[float] = []
-    monkeypatch.setattr(
-        pinecone_client.time,
-        "sleep",
-        lambda s: sleep_calls.append(s),
-    )
-    vectors = [(str(i), [0.0] * EMBEDDING_DIMENSION, {}) for i in range(250)]
-    client.upsert_embeddings(
+    now = [0.0]
+
+    def fake_sleep(seconds: float) -> None:
+        sleep_calls.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(pinecone_client.time, "sleep", fake_sleep)
+    monkeypatch.setattr(pinecone_client.time, "monotonic", lambda: now[0])
+    # no jitter: the first retry waits the full 1s base delay
+    monkeypatch.setattr(resilience.random, "uniform", lambda low, high: high)
+    vectors = _zero_vectors(250)
+    report = client.upsert_embeddings(
         "test",
         vectors,
         batch_size=100,
         requests_per_minute=120,
+        max_in_flight=1,
     )
     assert index.upsert_call_count == 4  # first batch retried
     assert [len(b) for b in index.upsert_success_calls] == [100, 100, 50]
+    # 1s retry backoff, then the 2 requests/s limit spaces the other batches
     assert sleep_calls == [1.0, 0.5, 0.5]
+    assert [b["retries"] for b in report["batches"]] == [1, 0, 0]
+    assert report["vectors"] == 250 and report["retries"] == 1
+
+
+class RateLimited(Exception):
+    status = 429
+
+
+def test_concurrent_upserts_throttle_on_rate_limit(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    index = FakeIndex()
+    in_flight = {"now": 0, "max": 0, "limited": 1}
+    lock = threading.Lock()
+    barrier = threading.Barrier(3, timeout=5)
+
+    def upsert(vectors, namespace=None):
+        with lock:
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            limited = in_flight["limited"] > 0
+            in_flight["limited"] -= 1
+        try:
+            if limited:
+                raise RateLimited("Too Many Requests")
+            barrier.wait()
+            index.upsert_success_calls.append(vectors)
+        finally:
+            with lock:
+                in_flight["now"] -= 1
+
+    index.upsert = upsert
+    fake_pinecone = types.SimpleNamespace(
+        init=lambda api_key=None, environment=None: None,
+        Index=lambda name: index,
+        describe_index=lambda name: types.SimpleNamespace(dimension=EMBEDDING_DIMENSION),
+        list_indexes=lambda: [],
+        create_index=lambda **kwargs: None,
+        delete_index=lambda name: None,
+    )
+    monkeypatch.setattr(pinecone_client, "pinecone", fake_pinecone)
+    monkeypatch.setattr(pinecone_client.time, "sleep", lambda seconds: None)
+
+    client = PineconeClient(api_key="key", environment="env")
+    vectors = _zero_vectors(30)
+    report = client.upsert_embeddings(
+        "test", vectors, batch_size=10, requests_per_minute=0, max_in_flight=3
+    )
+    assert in_flight["max"] == 3
+    assert sorted(len(b) for b in index.upsert_success_calls) == [10, 10, 10]
+    assert report["retries"] == report["throttled"] == 1
+    assert all(b["vectors_per_second"] > 0 for b in report["batches"])
 
 
 def test_query_retries(monkeypatch: pytest.MonkeyPatch) -> None:
@@ -140,3 +206,107 @@ def test_query_retries(monkeypatch: pytest.MonkeyPatch) -> None:
     result = client.query("test", [0.1] * EMBEDDING_DIMENSION, top_k=5)
     assert result == {"matches": []}
     assert index.query_call_count == 2
+
+
+def test_validation_and_index_handles_are_cached(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls: Dict[str, int] = {"describe": 0, "index": 0}
+    indexes: List[str] = ["test"]
+    now = [100.0]
+
+    def fake_describe(name):
+        calls["describe"] += 1
+        return types.SimpleNamespace(dimension=EMBEDDING_DIMENSION)
+
+    def fake_index(name):
+        calls["index"] += 1
+        return FakeIndex()
+
+    fake_pinecone = types.SimpleNamespace(
+        init=lambda api_key=None, environment=None: None,
+        Index=fake_index,
+        describe_index=fake_describe,
+        list_indexes=lambda: indexes,
+        create_index=lambda **kwargs: indexes.append(kwargs["name"]),
+        delete_index=lambda name: indexes.remove(name),
+    )
+    monkeypatch.setattr(pinecone_client, "pinecone", fake_pinecone)
+    monkeypatch.setattr(pinecone_client.time, "monotonic", lambda: now[0])
+
+    client = PineconeClient(api_key="key", environment="env", validation_ttl=60.0)
+    for _ in range(3):
+        client.query("test", [0.1] * EMBEDDING_DIMENSION)
+    client.upsert_embeddings("test", [("a", [0.0] * EMBEDDING_DIMENSION, {})])
+    assert calls == {"describe": 1, "index": 1}
+    assert client.validate_index("test", EMBEDDING_DIMENSION + 1) is False
+    assert calls["describe"] == 2
+
+    now[0] += 61.0
+    client.query("test", [0.1] * EMBEDDING_DIMENSION)
+    assert calls == {"describe": 3, "index": 1}
+
+    client.delete_index("test")
+    client.create_index("test")
+    client.query("test", [0.1] * EMBEDDING_DIMENSION)
+    assert calls == {"describe": 4, "index": 2}
+
+
+def _failing_client(monkeypatch: pytest.MonkeyPatch, index: FakeIndex, **kwargs):
+    fake_pinecone = types.SimpleNamespace(
+        init=lambda api_key=None, environment=None: None,
+        Index=lambda name: index,
+        describe_index=lambda name: types.SimpleNamespace(dimension=EMBEDDING_DIMENSION),
+        list_indexes=lambda: [],
+        create_index=lambda **kwargs: None,
+        delete_index=lambda name: None,
+    )
+    monkeypatch.setattr(pinecone_client, "pinecone", fake_pinecone)
+    return PineconeClient(api_key="key", environment="env", **kwargs)
+
+
+def test_query_retries_stop_at_deadline(monkeypatch: pytest.MonkeyPatch) -> None:
+    index = FakeIndex(fail_query_times=10)
+    slow = RetryPolicy(max_attempts=5, base_delay=10.0, max_delay=10.0)
+    client = _failing_client(monkeypatch, index, retry_policies={"query": slow})
+    monkeypatch.setattr(resilience.random, "uniform", lambda low, high: high)
+    with pytest.raises(Exception, match="network"):
+        client.query("test", [0.1] * EMBEDDING_DIMENSION, timeout=5.0)
+    assert index.query_call_count == 1
+
+
+def test_circuit_breaker_short_circuits_queries(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    index = FakeIndex(fail_query_times=4)
+    client = _failing_client(
+        monkeypatch,
+        index,
+        breakers={"query": CircuitBreaker(failure_threshold=4, reset_timeout=60)},
+    )
+    monkeypatch.setattr(pinecone_client.time, "sleep", lambda seconds: None)
+    for _ in range(2):
+        with pytest.raises(Exception, match="network"):
+            client.query("test", [0.1] * EMBEDDING_DIMENSION)
+    assert index.query_call_count == 4 and client.circuit_open
+    with pytest.raises(CircuitOpenError):
+        client.query("test", [0.1] * EMBEDDING_DIMENSION)
+    assert index.query_call_count == 4
+
+    client.breakers["query"].reset_timeout = 0.0
+    assert client.query("test", [0.1] * EMBEDDING_DIMENSION) == {"matches": []}
+    assert client.breakers["query"].state == "closed"
+
+
+def test_failing_upserts_do_not_open_the_query_circuit(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    index = FakeIndex(fail_query_times=0)
+    client = _failing_client(
+        monkeypatch,
+        index,
+        breakers={"upsert": CircuitBreaker(failure_threshold=1, reset_timeout=60)},
+    )
+    client.breakers["upsert"].record_failure()
+    assert client.breakers["upsert"].state == "open" and not client.circuit_open
+    assert client.query("test", [0.1] * EMBEDDING_DIMENSION) == {"matches": []}
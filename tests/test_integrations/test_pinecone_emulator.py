@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from src.integrations import pinecone_client
+from src.integrations.pinecone_async import AsyncPineconeClient
+from src.integrations.pinecone_client import EMBEDDING_DIMENSION, PineconeClient
+from src.integrations.pinecone_emulator import (
+    EmulatorError,
+    FaultProfile,
+    PineconeEmulator,
+)
+from src.retrieval.pinecone_sparse import PineconeSparseRetriever
+from src.utils.resilience import CircuitBreaker, RetryPolicy
+
+EYE = np.eye(EMBEDDING_DIMENSION, dtype=np.float32)
+
+
+@pytest.fixture
+def emulator(monkeypatch: pytest.MonkeyPatch) -> PineconeEmulator:
+    emulator = PineconeEmulator()
+    monkeypatch.setattr(pinecone_client, "pinecone", emulator)
+    return emulator
+
+
+def test_sync_client_round_trip(emulator: PineconeEmulator) -> None:
+    client = PineconeClient(api_key="key")
+    client.create_index("dense")
+    vectors = [(str(i), EYE[i], {"n": i}) for i in range(3)]
+    client.upsert_embeddings("dense", vectors, requests_per_minute=0)
+    response = client.query("dense", EYE[1] + 0.1 * EYE[2], top_k=2)
+    assert [m["id"] for m in response.matches] == ["1", "2"]
+    assert response.matches[0]["metadata"] == {"n": 1}
+
+    client.delete_embeddings("dense", ["1"])
+    assert client.query("dense", EYE[1], top_k=1).matches[0]["id"] != "1"
+    client.delete_index("dense")
+    assert emulator.list_indexes() == []
+    assert emulator.stats["upsert"] == 1 and emulator.stats["query"] == 2
+
+
+def test_sparse_query(emulator: PineconeEmulator) -> None:
+    client = PineconeClient(api_key="key")
+    client.create_index("sparse")
+    emulator.Index("sparse").upsert(
+        [
+            {"id": "a", "sparse_values": {"indices": ["apple", "pie"], "values": [2, 1]}},
+            {"id": "b", "sparse_values": {"indices": ["banana"], "values": [3]}},
+        ]
+    )
+    results, _ = PineconeSparseRetriever(client, "sparse").query("apple apple tart")
+    assert results == [("a", 4.0), ("b", 0.0)]
+
+
+def test_faults_drive_retries_and_rate_limits(emulator: PineconeEmulator) -> None:
+    fast = RetryPolicy(max_attempts=3, base_delay=0.001, max_delay=0.001)
+    client = PineconeClient(api_key="key", retry_policies={"query": fast})
+    client.create_index("dense")
+    emulator.faults = FaultProfile(error_rate=1.0)
+    with pytest.raises(EmulatorError, match="503"):
+        client.query("dense", EYE[0])
+    # the describe_index behind validation fails too
+    assert emulator.stats["query"] == 3 and emulator.stats["errors"] == 4
+
+    emulator.faults = FaultProfile(requests_per_second=2)
+    with pytest.raises(EmulatorError) as excinfo:
+        for _ in range(5):
+            emulator.Index("dense").query(vector=EYE[0].tolist(), top_k=1)
+    assert excinfo.value.status == 429 and emulator.stats["rate_limited"] == 1
+
+    emulator.faults = FaultProfile(latency_ms=20.0, latency_sigma=0.5, seed=0)
+    started = time.perf_counter()
+    emulator.Index("dense").query(vector=EYE[0].tolist(), top_k=1)
+    assert time.perf_counter() - started > 0.002
+
+
+def test_http_server_serves_async_client(emulator: PineconeEmulator) -> None:
+    url = emulator.serve()
+    emulator.create_index("dense", EMBEDDING_DIMENSION)
+    emulator.faults = FaultProfile(error_rate=0.3, seed=1)
+
+    async def run():
+        patient = RetryPolicy(max_attempts=10, base_delay=0.001, max_delay=0.002)
+        client = AsyncPineconeClient(
+            api_key="key",
+            controller_url=url,
+            retry_policies=dict.fromkeys(["query", "upsert", "admin"], patient),
+            breakers={
+                operation: CircuitBreaker(failure_threshold=100)
+                for operation in ("query", "upsert", "admin")
+            },
+        )
+        try:
+            vectors = [(str(i), EYE[i], {}) for i in range(10)]
+            await client.upsert_embeddings("dense", vectors, batch_size=3)
+            return await asyncio.gather(
+                *(client.query("dense", EYE[i], top_k=1) for i in range(10))
+            )
+        finally:
+            await client.aclose()
+
+    try:
+        responses = asyncio.run(run())
+    finally:
+        emulator.shutdown()
+    assert [r.matches[0]["id"] for r in responses] == [str(i) for i in range(10)]
+    assert emulator.stats["errors"] > 0
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Any
+
 from src.query_service import QueryService
 
 
@@ -11,16 +13,34 @@ class StubHybrid:
         self.last_mode = mode
         return [], {}
 
+    def query_batch(self, queries, mode=None, top_k=5, **kwargs):
+        self.last_mode = mode
+        self.last_top_k = top_k
+        return [([], {}) for _ in queries]
+
+
+def _service(stub: Any) -> QueryService:
+    return QueryService(stub)
+
 
 def test_query_service_defaults_to_hybrid() -> None:
     stub = StubHybrid()
-    service = QueryService(stub)
+    service = _service(stub)
     service.query("hello")
     assert stub.last_mode == "hybrid"
 
 
 def test_query_service_mode_override() -> None:
     stub = StubHybrid()
-    service = QueryService(stub)
+    service = _service(stub)
     service.query("hello", mode="lexical")
     assert stub.last_mode == "lexical"
+
+
+def test_query_batch_shares_parameters_and_logs_batch() -> None:
+    stub = StubHybrid()
+    service = _service(stub)
+    replies = service.query_batch(["a", "b", "c"], mode="lexical", top_k=7)
+    assert stub.last_mode == "lexical" and stub.last_top_k == 7
+    assert [meta["batch_size"] for _, meta in replies] == [3, 3, 3]
+    assert service.dashboard.p95_latency("lexical") == 0.0
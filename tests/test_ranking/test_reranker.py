@@ -67,3 +67,39 @@ def test_reranker_falls_back_to_cpu_when_xpu_missing() -> None:
 def test_reranker_falls_back_to_cpu_when_openvino_missing() -> None:
     reranker = CrossEncoderReranker(load_model=False, device="gpu_openvino")
     assert reranker.device == "cpu"
+
+
+def _tiny_cross_encoder(tmp_path):
+    from transformers.models.bert import (
+        BertConfig,
+        BertForSequenceClassification,
+        BertTokenizerFast,
+    )
+
+    words = [f"w{i}" for i in range(50)]
+    vocab = tmp_path / "vocab.txt"
+    vocab.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", *words]))
+    tokenizer = BertTokenizerFast(vocab_file=str(vocab))
+    config = BertConfig(
+        vocab_size=len(words) + 4,
+        hidden_size=16,
+        num_hidden_layers=1,
+        num_attention_heads=2,
+        intermediate_size=32,
+        num_labels=1,
+    )
+    return tokenizer, BertForSequenceClassification(config).eval()
+
+
+def test_length_bucketed_scores_match_single_padded_batch(tmp_path) -> None:
+    reranker = CrossEncoderReranker(load_model=False, batch_size=2)
+    reranker.tokenizer, reranker.model = _tiny_cross_encoder(tmp_path)
+    texts = [" ".join(f"w{j % 50}" for j in range(n)) for n in (3, 40, 1, 25, 7)]
+
+    bucketed = reranker._score_pairs("w1 w2", texts)
+    reranker.batch_size = len(texts)
+    padded_together = reranker._score_pairs("w1 w2", texts)
+    one_by_one = [reranker._score_pairs("w1 w2", [text])[0] for text in texts]
+    assert bucketed == pytest.approx(one_by_one, abs=1e-5)
+    assert padded_together == pytest.approx(one_by_one, abs=1e-5)
+    assert reranker._score_pairs("w1", []) == []
@@ -6,8 +6,11 @@ from unittest.mock import MagicMock, patch
 import numpy as np
 import sys
 import types
+from typing import Any
 
+from src.monitoring.performance import MetricsDashboard
 from src.retrieval.dense import EMBEDDING_DIMENSION, DenseRetriever
+from src.retrieval.embedding_cache import DocumentEmbeddingCache
 
 
 class MockPineconeClient:
@@ -21,6 +24,10 @@ class MockPineconeClient:
         self.vectors.extend(vectors)
 
 
+def _dense(client: Any, **options: Any) -> DenseRetriever:
+    return DenseRetriever(client, "test-index", **options)
+
+
 @patch("src.retrieval.dense.SentenceTransformer")
 def test_embed_query_returns_dimension(mock_model) -> None:
     mock_instance = MagicMock()
@@ -88,3 +95,218 @@ def test_openvino_device_uses_compile(monkeypatch: pytest.MonkeyPatch) -> None:
         retriever = DenseRetriever(client, "test-index", device="gpu_openvino")
         retriever.embed_query_sync("hi")
         core_instance.compile_model.assert_called()
+
+
+@patch("src.retrieval.dense.SentenceTransformer")
+def test_query_cache_skips_encode_and_resets_on_model_change(mock_model) -> None:
+    mock_instance = MagicMock()
+    mock_instance.get_sentence_embedding_dimension.return_value = EMBEDDING_DIMENSION
+    mock_instance.encode.side_effect = lambda text: np.ones(EMBEDDING_DIMENSION)
+    mock_model.return_value = mock_instance
+
+    dashboard = MetricsDashboard()
+    retriever = _dense(MockPineconeClient(), dashboard=dashboard)
+    first, meta = retriever.embed_query_sync("reset  my password")
+    second, hit_meta = retriever.embed_query_sync(" reset my password ")
+    assert mock_instance.encode.call_count == 1
+    assert not meta["cache_hit"] and hit_meta["cache_hit"]
+    assert second is first and second.dtype == np.float32
+    assert not second.flags.writeable
+    assert dashboard.cache_metrics()["query_embedding"] == {
+        "hits": 1,
+        "misses": 1,
+        "hit_rate": 0.5,
+    }
+
+    retriever._model = MagicMock(wraps=mock_instance)
+    retriever.embed_query_sync("reset my password")
+    assert mock_instance.encode.call_count == 2
+
+
+@patch("src.retrieval.dense.SentenceTransformer")
+def test_document_cache_only_encodes_new_chunks(mock_model, tmp_path) -> None:
+    mock_instance = MagicMock()
+    mock_instance.get_sentence_embedding_dimension.return_value = EMBEDDING_DIMENSION
+    encoded: list[list[str]] = []
+
+    def encode_fn(texts, batch_size, show_progress_bar):
+        encoded.append(list(texts))
+        return np.array([np.full(EMBEDDING_DIMENSION, len(t)) for t in texts])
+
+    mock_instance.encode.side_effect = encode_fn
+    mock_model.return_value = mock_instance
+
+    cache = DocumentEmbeddingCache(tmp_path / "embeddings.sqlite")
+    retriever = _dense(MockPineconeClient(), document_cache=cache)
+    first = retriever._embed_documents_sync(["alpha", "beta", "alpha"])
+    second = retriever._embed_documents_sync(["beta", "gamma!"])
+    assert encoded == [["alpha", "beta"], ["gamma!"]]
+    assert first[0].tolist() == first[2].tolist() == [5.0] * EMBEDDING_DIMENSION
+    assert second[0].tolist() == first[1].tolist()
+
+    bumped = _dense(
+        MockPineconeClient(),
+        document_cache=DocumentEmbeddingCache(tmp_path / "embeddings.sqlite"),
+        model_revision="v2",
+    )
+    bumped._embed_documents_sync(["alpha"])
+    assert encoded[-1] == ["alpha"]
+
+    quantized = _dense(
+        MockPineconeClient(),
+        document_cache=DocumentEmbeddingCache(tmp_path / "embeddings.sqlite"),
+        precision="int8",
+    )
+    quantized._embed_documents_sync(["beta"])
+    assert encoded[-1] == ["beta"]
+    assert len(encoded) == 4
+
+
+def test_document_cache_evicts_least_recently_used(tmp_path) -> None:
+    row_bytes = 4 * 4
+    cache = DocumentEmbeddingCache(tmp_path / "cache.sqlite", max_bytes=3 * row_bytes)
+    keys = [cache.key("m", "r", str(i)) for i in range(4)]
+    cache.put_many(keys[:3], np.ones((3, 4)))
+    cache.get_many([keys[0]])
+    cache.put_many(keys[3:], np.ones((1, 4)))
+    assert set(cache.get_many(keys)) == {keys[0], keys[3]}
+    assert cache.nbytes == 2 * row_bytes
+    assert len(DocumentEmbeddingCache(tmp_path / "cache.sqlite")) == 2
+
+
+def test_model_load_is_single_flight_across_threads_and_loops() -> None:
+    import asyncio
+    import threading
+    import time
+
+    def slow_load(*args, **kwargs):
+        time.sleep(0.05)
+        instance = MagicMock()
+        instance.get_sentence_embedding_dimension.return_value = EMBEDDING_DIMENSION
+        instance.encode.return_value = np.zeros(EMBEDDING_DIMENSION)
+        return instance
+
+    with patch("src.retrieval.dense.SentenceTransformer", side_effect=slow_load) as model:
+        retriever = _dense(MockPineconeClient(), query_cache_size=0)
+        threads = [
+            threading.Thread(target=retriever.embed_query_sync, args=(f"q{i}",))
+            for i in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        # a caller with its own event loop shares the same load
+        embedding, _ = asyncio.run(retriever.embed_query("own loop"))
+        for thread in threads:
+            thread.join()
+        assert model.call_count == 1
+        assert len(embedding) == EMBEDDING_DIMENSION
+
+
+@patch("src.retrieval.dense.SentenceTransformer")
+def test_concurrent_queries_are_encoded_in_one_batch(mock_model) -> None:
+    import threading
+
+    mock_instance = MagicMock()
+    mock_instance.get_sentence_embedding_dimension.return_value = EMBEDDING_DIMENSION
+    mock_instance.encode.side_effect = lambda texts, **kwargs: np.ones(
+        (len(texts), EMBEDDING_DIMENSION)
+    )
+    mock_model.return_value = mock_instance
+
+    retriever = _dense(MockPineconeClient(), query_batch_size=8, query_batch_wait_ms=100)
+    retriever.embed_query_sync("warm up")
+    threads = [
+        threading.Thread(target=retriever.embed_query_sync, args=(f"q{i}",))
+        for i in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [len(call.args[0]) for call in mock_instance.encode.call_args_list] == [1, 4]
+
+
+@patch("src.retrieval.dense.SentenceTransformer")
+def test_embedding_pool_embeds_documents_without_local_model(mock_model) -> None:
+    pool = MagicMock()
+    pool.encode.side_effect = lambda texts, batch_size: np.ones(
+        (len(texts), EMBEDDING_DIMENSION), dtype=np.float32
+    )
+    retriever = _dense(MockPineconeClient(), embedding_pool=pool)
+    ids, meta = retriever.index_corpus_sync(["doc1", "doc2"], [{}, {}], batch_size=8)
+    assert meta == {"status": "success", "count": 2}
+    pool.encode.assert_called_once_with(["doc1", "doc2"], 8)
+    mock_model.assert_not_called()
+
+
+@patch("src.retrieval.dense.SentenceTransformer")
+def test_query_short_circuits_when_backend_circuit_is_open(mock_model) -> None:
+    client = MagicMock()
+    client.circuit_open = True
+    retriever = DenseRetriever(client, "test-index")
+    results, meta = retriever.query_sync("hello")
+    assert results == [] and meta["status"] == "error"
+    client.query.assert_not_called()
+    mock_model.assert_not_called()
+
+
+@patch("src.retrieval.dense.SentenceTransformer")
+def test_query_batch_encodes_once_and_matches_query(mock_model) -> None:
+    from src.integrations.local_vector_store import LocalVectorStore
+
+    vectors = {
+        text: np.eye(EMBEDDING_DIMENSION)[i] for i, text in enumerate(["a", "b", "c"])
+    }
+    mock_instance = MagicMock()
+    mock_instance.get_sentence_embedding_dimension.return_value = EMBEDDING_DIMENSION
+    mock_instance.encode.side_effect = lambda texts, **kwargs: (
+        vectors[texts]
+        if isinstance(texts, str)
+        else np.stack([vectors[t] for t in texts])
+    )
+    mock_model.return_value = mock_instance
+    store = LocalVectorStore()
+    store.upsert_embeddings(
+        "idx", [(text, vector.tolist(), {}) for text, vector in vectors.items()]
+    )
+    dashboard = MetricsDashboard()
+    retriever = DenseRetriever(store, "idx", dashboard=dashboard)
+
+    batch = retriever.query_batch_sync(["b", "a", "b", "c"], top_k=2)
+    assert [len(call.args[0]) for call in mock_instance.encode.call_args_list] == [3]
+    assert batch == [retriever.query_sync(text, top_k=2) for text in ["b", "a", "b", "c"]]
+    assert batch[0][0][0] == ("b", pytest.approx(1.0))
+    assert mock_instance.encode.call_count == 1
+    cache = dashboard.cache_metrics()["query_embedding"]
+    assert (cache["hits"], cache["misses"]) == (4, 4)
+
+
+@patch("src.retrieval.dense.SentenceTransformer")
+def test_blocking_client_calls_do_not_serialize_sync_queries(mock_model) -> None:
+    import threading
+    import time
+
+    from src.integrations.local_vector_store import QueryResponse
+
+    class SlowClient:
+        circuit_open = False
+
+        def query(self, index_name, embedding, top_k=5):
+            time.sleep(0.2)
+            return QueryResponse([{"id": "doc", "score": 1.0}])
+
+    mock_instance = MagicMock()
+    mock_instance.get_sentence_embedding_dimension.return_value = EMBEDDING_DIMENSION
+    mock_instance.encode.return_value = np.zeros(EMBEDDING_DIMENSION)
+    mock_model.return_value = mock_instance
+    retriever = _dense(SlowClient())
+    retriever.embed_query_sync("warm up")
+    threads = [
+        threading.Thread(target=retriever.query_sync, args=(f"q{i}",)) for i in range(5)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.perf_counter() - started < 0.6
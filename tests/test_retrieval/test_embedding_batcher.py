@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import time
+
+import numpy as np
+import pytest
+
+from src.monitoring.performance import MetricsDashboard
+from src.retrieval.embedding_batcher import EmbeddingBatcher
+
+
+def test_concurrent_submits_share_one_encode() -> None:
+    calls: list[list[str]] = []
+
+    def encode(texts):
+        calls.append(list(texts))
+        return np.array([[len(text), i] for i, text in enumerate(texts)])
+
+    dashboard = MetricsDashboard()
+    batcher = EmbeddingBatcher(
+        encode, max_batch_size=8, max_wait_ms=50, dashboard=dashboard
+    )
+    futures = [batcher.submit("x" * n) for n in range(1, 6)]
+    rows = [future.result(timeout=2) for future in futures]
+
+    assert calls == [["x", "xx", "xxx", "xxxx", "xxxxx"]]
+    assert [row[0] for row in rows] == [1, 2, 3, 4, 5]
+    assert rows[0].dtype == np.float32
+    histograms = dashboard.histogram_metrics()
+    assert histograms["query_batch_size"]["max"] == 5
+    assert histograms["query_queue_wait_ms"]["count"] == 5
+
+
+def test_batches_are_capped_and_errors_reach_every_caller() -> None:
+    sizes: list[int] = []
+
+    def encode(texts):
+        sizes.append(len(texts))
+        if "bad" in texts:
+            raise RuntimeError("model failed")
+        time.sleep(0.01)
+        return np.zeros((len(texts), 2))
+
+    batcher = EmbeddingBatcher(encode, max_batch_size=3, max_wait_ms=20)
+    futures = [batcher.submit(str(i)) for i in range(7)]
+    for future in futures:
+        future.result(timeout=2)
+    assert max(sizes) <= 3 and sum(sizes) == 7
+
+    failing = [batcher.submit("bad"), batcher.submit("ok")]
+    for future in failing:
+        with pytest.raises(RuntimeError):
+            future.result(timeout=2)
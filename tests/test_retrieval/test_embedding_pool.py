@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.retrieval.embedding_pool import EmbeddingPool
+
+
+class _LengthModel:
+    """Embeds a text as ``[word count, worker pid, worker OMP_NUM_THREADS]``."""
+
+    tokenizer = None
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False):
+        threads = int(os.environ.get("OMP_NUM_THREADS", "0"))
+        return np.array([[len(text.split()), os.getpid(), threads] for text in texts])
+
+
+def _factory() -> _LengthModel:
+    return _LengthModel()
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = EmbeddingPool(_factory, workers=2, threads=1, shard_size=7)
+    yield pool
+    pool.close()
+
+
+def test_pool_reassembles_embeddings_in_input_order(pool: EmbeddingPool) -> None:
+    texts = [" ".join(["word"] * (1 + (i * 7) % 13)) for i in range(40)]
+    embeddings = pool.encode(texts, batch_size=4)
+    assert embeddings.dtype == np.float32
+    assert embeddings[:, 0].tolist() == [len(text.split()) for text in texts]
+    assert os.getpid() not in embeddings[:, 1]
+    assert pool.encode([]).shape == (0, 0)
+
+
+def test_pool_reuses_workers_across_jobs(pool: EmbeddingPool) -> None:
+    texts = [f"text {i}" for i in range(30)]
+    first = set(pool.encode(texts)[:, 1])
+    second = set(pool.encode(texts)[:, 1])
+    assert len(first | second) <= pool.workers
+
+
+def test_workers_are_spawned_with_thread_limits() -> None:
+    before = os.environ.get("OMP_NUM_THREADS")
+    pool = EmbeddingPool(_factory, workers=2, threads=3)
+    try:
+        embeddings = pool.encode([f"text {i}" for i in range(8)])
+    finally:
+        pool.close()
+    assert set(embeddings[:, 2].tolist()) == {3}
+    assert os.environ.get("OMP_NUM_THREADS") == before
+
+
+def test_worker_bootstrap_loads_before_numpy() -> None:
+    # the initializer's module must not pull in numpy ahead of the limits
+    check = "import sys, src.retrieval.embedding_worker; print('numpy' in sys.modules)"
+    output = subprocess.run(
+        [sys.executable, "-c", check],
+        cwd=Path(__file__).parents[2],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert output.strip() == "False"
@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+import threading
+import time
+from typing import Any
+
 from src.retrieval.hybrid import HybridRetriever
 
 
@@ -13,6 +17,11 @@ class StubLexical:
         return [("b", 1.0), ("c", 0.5)], {"retrieved": 2}
 
 
+def _hybrid(dense: Any, lexical: Any, **options: Any) -> HybridRetriever:
+    """A retriever over duck-typed stub legs."""
+    return HybridRetriever(dense, lexical, **options)
+
+
 def test_hybrid_rrf_merges_and_tags_sources() -> None:
     hybrid = HybridRetriever(StubDense(), StubLexical())
     results, meta = hybrid.query("test")
@@ -50,3 +59,102 @@ def test_rare_token_query_shifts_toward_lexical() -> None:
     hybrid = _build_hybrid_with_lexical_corpus()
     _, meta = hybrid.query("AB-123 malfunction")
     assert meta["rrf_weights"]["lexical"] > meta["rrf_weights"]["dense"]
+
+
+class FailingDense:
+    def query(self, query, top_k=5):
+        raise AssertionError("dense leg should be skipped")
+
+
+def test_identifier_query_skips_dense_leg() -> None:
+    from src.retrieval.lexical import LexicalBM25
+
+    lex = LexicalBM25()
+    lex.index_documents(["alpha beta", "AB-123 device", "AB-123 follow-up AB-123"])
+    hybrid = _hybrid(FailingDense(), lex, exact_match_max_hits=2)
+    results, meta = hybrid.query("what happened to AB-123")
+    assert [r["id"] for r in results] == ["2", "1"]
+    assert results[0]["source"] == "exact"
+    assert results[1]["text"] == "AB-123 device"
+    assert meta["retrieval_mode"] == "exact"
+    assert meta["identifiers"] == ["AB123"]
+
+
+def test_large_identifier_hit_set_uses_hybrid() -> None:
+    hybrid = _build_hybrid_with_lexical_corpus()
+    hybrid.exact_match_max_hits = 1
+    _, meta = hybrid.query("AB-123 malfunction")
+    assert meta["retrieval_mode"] == "exact"
+    hybrid.lexical.index_documents(["AB123 replacement"])
+    _, meta = hybrid.query("AB-123 malfunction")
+    assert meta["retrieval_mode"] == "hybrid"
+
+
+class BatchingDense(StubDense):
+    def __init__(self) -> None:
+        self.batches = []
+
+    def query(self, query, top_k=5):
+        return [(query[:1], 1.0), ("b", 0.8)], {"retrieved": 2}
+
+    def query_batch_sync(self, queries, top_k=5, timeout=1.0):
+        self.batches.append(list(queries))
+        return [self.query(query, top_k=top_k) for query in queries]
+
+
+def test_query_batch_matches_query_loop() -> None:
+    from src.retrieval.lexical import LexicalBM25
+
+    lex = LexicalBM25()
+    lex.index_documents(["alpha beta", "gamma delta", "AB-123 device"])
+    dense = BatchingDense()
+    hybrid = _hybrid(dense, lex, exact_match_max_hits=1)
+    queries = ["alpha beta", "AB-123", "gamma", "device alpha"]
+    for mode in ("hybrid", "dense", "lexical"):
+        assert hybrid.query_batch(queries, mode=mode, top_k=3) == [
+            hybrid.query(query, mode=mode, top_k=3) for query in queries
+        ]
+    # the identifier query is answered exactly, without the dense leg
+    assert dense.batches == [["alpha beta", "gamma", "device alpha"], queries]
+
+
+def test_query_batch_falls_back_to_per_query_calls() -> None:
+    hybrid = _hybrid(StubDense(), StubLexical())
+    replies = hybrid.query_batch(["one", "two"])
+    assert replies == [hybrid.query("one"), hybrid.query("two")]
+
+
+class SlowDense(StubDense):
+    def query(self, query, top_k=5):
+        time.sleep(0.2)
+        return super().query(query, top_k)
+
+
+def test_concurrent_hybrid_queries_run_in_parallel() -> None:
+    hybrid = _hybrid(SlowDense(), StubLexical())
+    threads = [threading.Thread(target=hybrid.query, args=("q",)) for _ in range(8)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.perf_counter() - started < 0.6
+    hybrid.close()
+
+
+class RecordingDense(StubDense):
+    def __init__(self) -> None:
+        self.timeouts = []
+
+    def query_sync(self, query, top_k=5, timeout=1.0):
+        self.timeouts.append(timeout)
+        return self.query(query, top_k)
+
+
+def test_timeout_reaches_the_dense_leg() -> None:
+    dense = RecordingDense()
+    hybrid = _hybrid(dense, StubLexical())
+    hybrid.query("q", timeout=0.25)
+    hybrid.query("q", mode="dense", timeout=0.5)
+    hybrid.query_batch(["q", "r"], timeout=0.75)
+    assert dense.timeouts == [0.25, 0.5, 0.75, 0.75]
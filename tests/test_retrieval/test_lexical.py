@@ -1,5 +1,12 @@
 from __future__ import annotations
 
+import threading
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from src.retrieval import lexical
 from src.retrieval.lexical import LexicalBM25
 
 
@@ -40,8 +47,245 @@ def test_stemming_enables_root_match() -> None:
     assert results[0][1] > 0
 
 
+def test_parallel_preprocessing_matches_serial(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(lexical, "PARALLEL_MIN_DOCS", 4)
+    monkeypatch.setattr(lexical, "PREPROCESS_CHUNK_SIZE", 3)
+    texts = [f"running runners ran {i} connected connections" for i in range(10)]
+    serial = LexicalBM25(enable_stemming=True, preprocess_workers=1)
+    parallel = LexicalBM25(enable_stemming=True, preprocess_workers=2)
+    try:
+        assert parallel._preprocess_batch(texts) == serial._preprocess_batch(texts)
+        assert parallel._preprocess_executor is not None
+    finally:
+        parallel.close()
+
+
 def test_without_stemming_no_match() -> None:
     retriever = LexicalBM25()
     retriever.index_documents(["running fast"])
     results, _ = retriever.query("run")
     assert results[0][1] == 0
+
+
+def _reference_scores(corpus: list[str], query: str) -> list[float]:
+    from rank_bm25 import BM25Okapi
+
+    # the stubs declare the corpus as strings; it is tokenized documents
+    okapi: Any = BM25Okapi
+    bm25 = okapi([doc.lower().split() for doc in corpus])
+    return list(bm25.get_scores(query.lower().split()))
+
+
+def test_scores_match_bm25okapi_after_updates_and_deletes() -> None:
+    retriever = LexicalBM25(max_segments=2, background_merge=False)
+    ids, _ = retriever.index_documents(["apple banana", "banana cherry"])
+    more, _ = retriever.index_documents(["cherry apple apple", "date"])
+    retriever.update_document(ids[1], "banana banana fig")
+    retriever.delete_document(more[1])
+    retriever.index_documents(["apple fig grape", "grape"])
+
+    results, _ = retriever.query("apple fig", top_k=10)
+    scores = dict(results)
+    expected = _reference_scores(retriever.documents, "apple fig")
+    for doc_id, score in zip(retriever.doc_ids, expected, strict=True):
+        assert abs(scores[doc_id] - score) < 1e-9
+    assert retriever.segment_count <= 2
+
+
+def test_delete_keeps_ids_stable() -> None:
+    retriever = LexicalBM25()
+    ids, _ = retriever.index_documents(["alpha", "beta", "gamma"])
+    assert retriever.delete_document(ids[0])["status"] == "success"
+    assert retriever.delete_document(ids[0])["status"] == "not_found"
+    new_ids, _ = retriever.index_documents(["delta"])
+    assert new_ids == ["3"]
+    results, _ = retriever.query("gamma")
+    assert results[0][0] == ids[2]
+
+
+def test_update_keeps_slot_and_deleted_slots_are_reused() -> None:
+    retriever = LexicalBM25()
+    ids, _ = retriever.index_documents(["alpha", "beta", "gamma"])
+    retriever.update_document(ids[0], "alpha prime")
+    assert retriever.doc_ids == ids
+    assert retriever.get_document(ids[0]) == "alpha prime"
+
+    retriever.delete_document(ids[1])
+    assert retriever.get_document(ids[1]) is None
+    assert retriever.get_documents([ids[1], ids[0]]) == [None, "alpha prime"]
+    new_ids, _ = retriever.index_documents(["delta"])
+    assert retriever.doc_ids == [ids[0], new_ids[0], ids[2]]
+    results, _ = retriever.query("beta", top_k=3)
+    assert ids[1] not in dict(results)
+
+
+def test_add_documents_keeps_last_text_of_repeated_ids() -> None:
+    retriever = LexicalBM25()
+    result = retriever.add_documents([("7", "alpha"), ("8", "beta"), ("7", "gamma")])
+    assert result["count"] == 2
+    assert sorted(retriever.doc_ids) == ["7", "8"]
+    assert retriever.get_document("7") == "gamma"
+    assert retriever.bm25 is not None and retriever.bm25.corpus_size == 2
+    results, _ = retriever.query("alpha", top_k=2)
+    assert all(score == 0 for _, score in results)
+
+
+@pytest.mark.parametrize("batched", [False, True])
+def test_slot_reused_during_query_keeps_scored_doc_id(
+    monkeypatch: pytest.MonkeyPatch, batched: bool
+) -> None:
+    retriever = LexicalBM25()
+    ids, _ = retriever.index_documents(["apple pie", "banana split"])
+    pad = LexicalBM25._pad_untouched
+
+    def delete_and_readd(*args: Any) -> Any:
+        # another thread frees slot 0 and hands it to a new document
+        def mutate() -> None:
+            retriever.delete_document(ids[0])
+            retriever.add_documents([("new", "cherry tart")])
+
+        worker = threading.Thread(target=mutate)
+        worker.start()
+        worker.join()
+        return pad(*args)
+
+    monkeypatch.setattr(LexicalBM25, "_pad_untouched", staticmethod(delete_and_readd))
+    if batched:
+        [(results, _)] = retriever.query_batch(["apple"], top_k=1)
+    else:
+        results, _ = retriever.query("apple", top_k=1)
+    assert [doc_id for doc_id, _ in results] == [ids[0]]
+    assert retriever.get_document("new") == "cherry tart"
+
+
+def test_tombstone_ratio_triggers_compaction() -> None:
+    retriever = LexicalBM25(background_merge=False, compaction_threshold=0.5)
+    ids, _ = retriever.index_documents(["one", "two", "three", "four"])
+    retriever.delete_document(ids[0])
+    retriever.delete_document(ids[1])
+    assert retriever.segment_count == 1
+    assert retriever._segments[0].dead == 2
+    retriever.delete_document(ids[2])
+    assert retriever.segment_count == 1
+    assert retriever._segments[0].dead == 0
+    results, _ = retriever.query("four")
+    assert results == [(ids[3], results[0][1])]
+
+
+def test_idf_view_tracks_live_vocabulary() -> None:
+    retriever = LexicalBM25()
+    ids, _ = retriever.index_documents(["alpha beta", "beta gamma", "delta"])
+    retriever.delete_document(ids[1])
+    assert retriever.bm25 is not None
+    assert sorted(retriever.bm25.idf) == ["alpha", "beta", "delta"]
+    assert "gamma" not in retriever.bm25.idf
+    retriever.update_document(ids[0], "gamma")
+    assert sorted(retriever.bm25.idf) == ["delta", "gamma"]
+
+
+def test_pruned_query_matches_exhaustive() -> None:
+    words = ["common"] * 6 + ["shared", "shared", "rare", "unique", "other"]
+    corpus = [
+        " ".join(words[(i * 7 + j) % len(words)] for j in range(i % 5 + 2))
+        for i in range(60)
+    ]
+    retriever = LexicalBM25(max_segments=3, background_merge=False)
+    ids, _ = retriever.index_documents(corpus[:30])
+    retriever.index_documents(corpus[30:])
+    retriever.delete_document(ids[3])
+    retriever.update_document(ids[4], "rare rare common")
+    for query in ["common shared", "rare common shared other", "unique rare"]:
+        for top_k in (1, 5, 50):
+            assert retriever.query(query, top_k=top_k, prune=True) == retriever.query(
+                query, top_k=top_k, prune=False
+            )
+
+
+def test_query_batch_matches_query_loop() -> None:
+    words = ["common"] * 6 + ["shared", "shared", "rare", "unique", "other"]
+    corpus = [
+        " ".join(words[(i * 7 + j) % len(words)] for j in range(i % 5 + 2))
+        for i in range(60)
+    ]
+    retriever = LexicalBM25(max_segments=3, background_merge=False)
+    ids, _ = retriever.index_documents(corpus[:30])
+    retriever.index_documents(corpus[30:])
+    retriever.delete_document(ids[3])
+    retriever.update_document(ids[4], "rare rare common")
+    queries = ["common shared", "rare common shared other", "missing", "", "unique"]
+    for top_k in (1, 5, 50):
+        assert retriever.query_batch(queries, top_k=top_k) == [
+            retriever.query(query, top_k=top_k) for query in queries
+        ]
+
+
+def test_background_merge_compacts_segments() -> None:
+    retriever = LexicalBM25(max_segments=2, merge_factor=2)
+    for word in ["one", "two", "three", "four", "five"]:
+        retriever.index_documents([word])
+    retriever.wait_for_merges()
+    retriever.merge_segments(merge_all=True)
+    assert retriever.segment_count == 1
+    results, _ = retriever.query("four")
+    assert results[0][0] == "3"
+
+
+def test_query_ranks_matches_then_pads_with_zero_scores() -> None:
+    retriever = LexicalBM25()
+    retriever.index_documents(["red fish", "blue fish", "red red car", "boat", "sky"])
+    results, meta = retriever.query("red", top_k=3)
+    assert [doc_id for doc_id, _ in results] == ["2", "0", "1"]
+    assert results[0][1] > results[1][1] > 0
+    assert results[2][1] == 0.0
+    assert meta["retrieved"] == 3
+
+
+def test_identifier_lookup_tracks_updates_and_snapshots(tmp_path: Path) -> None:
+    path = tmp_path / "lexical.snap"
+    retriever = LexicalBM25(snapshot_path=path)
+    retriever.index_documents(
+        ["AB-123 crashes on start", "see AB123 and CD-9, AB-123 again", "no tickets"]
+    )
+    identifiers, hits = retriever.match_identifiers("status of AB-123?")
+    assert identifiers == ["AB123"]
+    assert hits == [("1", 2.0), ("0", 1.0)]
+
+    retriever.update_document("0", "fixed in CD-9")
+    retriever.delete_document("1")
+    assert retriever.match_identifiers("AB-123")[1] == []
+    retriever.commit()
+    restored = LexicalBM25(snapshot_path=path)
+    assert restored.match_identifiers("CD9")[1] == [("0", 1.0)]
+    assert restored.match_identifiers("plain words") == ([], [])
+
+
+def test_snapshot_round_trip_preserves_results(tmp_path: Path) -> None:
+    path = tmp_path / "lexical.snap"
+    retriever = LexicalBM25(snapshot_path=path)
+    retriever.index_documents(["alpha beta", "beta gamma", "gamma delta"])
+    retriever.delete_document("1")
+    assert retriever.commit()["status"] == "success"
+
+    restored = LexicalBM25(snapshot_path=path)
+    assert restored.doc_ids == retriever.doc_ids
+    assert restored.query("gamma") == retriever.query("gamma")
+    new_ids, _ = restored.index_documents(["gamma epsilon"])
+    assert new_ids == ["3"]
+    assert restored.get_document("3") == "gamma epsilon"
+
+
+def test_corrupted_snapshot_is_rejected(tmp_path: Path) -> None:
+    path = tmp_path / "lexical.snap"
+    retriever = LexicalBM25()
+    retriever.index_documents(["alpha beta", "beta gamma"])
+    retriever.save(path)
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+    restored = LexicalBM25(snapshot_path=path)
+    assert restored.doc_ids == []
+
+
+def test_commit_without_snapshot_path_is_skipped() -> None:
+    assert LexicalBM25().commit()["status"] == "skipped"
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from src.retrieval.lexical import LexicalBM25
+from src.retrieval.lexical_sharded import ShardedLexicalBM25
+
+DOCS = [
+    "apple banana cherry",
+    "banana split dessert",
+    "cherry pie with apple",
+    "quantum physics lecture",
+    "apple orchard harvest",
+    "banana bread recipe",
+    "physics of cherry stones",
+    "ticket AB-7 mentions apple",
+]
+
+
+@pytest.fixture
+def sharded():
+    index = ShardedLexicalBM25(3)
+    yield index
+    index.close()
+
+
+def _ranking(results):
+    """Scores in rank order plus ids of matched documents (zero ties vary)."""
+    scores = [pytest.approx(score) for _, score in results]
+    return scores, [doc_id for doc_id, score in results if score > 0]
+
+
+def test_sharded_scores_match_single_index(sharded: ShardedLexicalBM25) -> None:
+    single = LexicalBM25()
+    for index in (single, sharded):
+        index.index_documents(DOCS)
+        index.update_document("1", "apple apple pudding")
+        index.delete_document("3")
+    for query in ("apple", "banana cherry", "physics apple pudding", "missing"):
+        expected, _ = single.query(query, top_k=4)
+        actual, meta = sharded.query(query, top_k=4)
+        assert _ranking(actual) == _ranking(expected)
+        assert meta["shards"] == 3
+    assert sharded.doc_ids == single.doc_ids
+    assert sharded.get_document("1") == "apple apple pudding"
+    assert sharded.get_documents(["1", "3", "2"]) == single.get_documents(["1", "3", "2"])
+    stats = sharded.bm25
+    assert stats is not None and stats.corpus_size == 7
+    assert sharded.match_identifiers("AB7") == single.match_identifiers("AB7")
+
+
+def test_sharded_query_batch_matches_query_loop(sharded: ShardedLexicalBM25) -> None:
+    sharded.index_documents(DOCS)
+    queries = ["apple", "banana cherry", "physics apple", "missing"]
+    assert sharded.query_batch(queries, top_k=4) == [
+        sharded.query(query, top_k=4) for query in queries
+    ]
+
+
+def test_sharded_snapshot_restores_statistics(tmp_path: Path) -> None:
+    path = tmp_path / "lexical.snap"
+    index = ShardedLexicalBM25(2, snapshot_path=path)
+    index.index_documents(DOCS)
+    assert index.commit()["status"] == "success"
+    expected, _ = index.query("apple cherry")
+    index.close()
+
+    restored = ShardedLexicalBM25(2, snapshot_path=path)
+    try:
+        assert _ranking(restored.query("apple cherry")[0]) == _ranking(expected)
+        assert restored.index_documents(["late apple"])[0] == ["8"]
+    finally:
+        restored.close()
@@ -0,0 +1,66 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+st_models = pytest.importorskip("sentence_transformers.models")
+
+from sentence_transformers import SentenceTransformer  # noqa: E402
+
+from src.retrieval.onnx_encoder import OnnxSentenceEncoder  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def tiny_model(tmp_path_factory: pytest.TempPathFactory) -> SentenceTransformer:
+    from transformers.models.bert import BertConfig, BertModel, BertTokenizerFast
+
+    directory = tmp_path_factory.mktemp("tiny-bert")
+    words = ["how", "do", "i", "reset", "my", "password", "revenue", "grew"]
+    vocab = directory / "vocab.txt"
+    vocab.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", *words]))
+    BertTokenizerFast(vocab_file=str(vocab)).save_pretrained(directory)
+    config = BertConfig(
+        vocab_size=len(words) + 5,
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+    )
+    BertModel(config).save_pretrained(directory)
+    encoder = st_models.Transformer(str(directory), max_seq_length=64)
+    modules = [encoder, st_models.Pooling(32), st_models.Normalize()]
+    return SentenceTransformer(modules=modules, device="cpu")
+
+
+@pytest.mark.parametrize("quantize", [False, True])
+def test_onnx_encoder_matches_pytorch(
+    tiny_model: SentenceTransformer, tmp_path: Path, quantize: bool
+) -> None:
+    encoder = OnnxSentenceEncoder.load(
+        lambda: tiny_model, "org/tiny", "main", tmp_path, quantize=quantize
+    )
+    assert encoder.path.exists()
+    assert encoder.path.name.endswith("-int8.onnx" if quantize else "-fp32.onnx")
+    record = json.loads(encoder.path.with_suffix(".json").read_text())
+    assert record["min_cosine"] >= record["threshold"]
+
+    texts = ["how do i reset my password", "revenue grew"]
+    expected = tiny_model.encode(texts)
+    actual = encoder.encode(texts, batch_size=1)
+    assert actual.shape == expected.shape
+    cosine = np.sum(expected * actual, axis=1)
+    assert cosine.min() > (0.98 if quantize else 0.9999)
+    assert encoder.encode("revenue grew").shape == (32,)
+
+    def no_model() -> SentenceTransformer:
+        raise AssertionError("a cached artifact must not build the PyTorch model")
+
+    mtime = encoder.path.stat().st_mtime_ns
+    cached = OnnxSentenceEncoder.load(
+        no_model, "org/tiny", "main", tmp_path, quantize=quantize
+    )
+    assert encoder.path.stat().st_mtime_ns == mtime
+    np.testing.assert_allclose(cached.encode(texts, batch_size=1), actual, atol=1e-6)
@@ -7,10 +7,7 @@ def test_smoke_retrieval_returns_results() -> None:
     doc_service = get_document_service()
     # reset any previous state for isolated testing
     lex = doc_service.lexical_retriever
-    lex.documents = []
-    lex.doc_ids = []
-    lex.corpus_tokens = []
-    lex.bm25 = None
+    lex.clear()
 
     lex.index_documents(["alpha beta", "gamma delta"])
     # dense retriever may be a no-op but call for completeness
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 import datetime
+import time
 from pathlib import Path
 from typing import Any, Dict
 
@@ -42,8 +43,11 @@ class DummyLexical:
         return {"status": "lexical"}
 
 
-def build_manager():
-    return IndexManagement(DummyDense(), DummyLexical())
+def build_manager(lexical: Any = None, **options: Any) -> IndexManagement:
+    dense: Any = DummyDense()
+    if lexical is None:
+        lexical = DummyLexical()
+    return IndexManagement(dense, lexical, **options)
 
 
 def test_update_and_delete_record_audit() -> None:
@@ -104,3 +108,40 @@ def test_log_retrieval_records_and_exports(tmp_path: Path) -> None:
     with export_path.open() as f:
         data = json.load(f)
     assert data == exported
+
+
+class CommittingLexical(DummyLexical):
+    def __init__(self):
+        super().__init__()
+        self.commits = 0
+
+    def commit(self):
+        self.commits += 1
+        return {"status": "success"}
+
+
+def test_single_edits_share_one_lexical_commit() -> None:
+    lexical = CommittingLexical()
+    mgr = build_manager(lexical, commit_delay=60.0)
+    mgr.update_document("1", "a")
+    mgr.update_document("2", "b")
+    mgr.delete_document("1")
+    assert lexical.commits == 0
+    mgr.flush()
+    mgr.flush()
+    assert lexical.commits == 1
+
+    immediate = build_manager(lexical, commit_delay=0)
+    immediate.delete_document("2")
+    assert lexical.commits == 2
+
+
+def test_scheduled_commit_runs_after_delay() -> None:
+    lexical = CommittingLexical()
+    mgr = build_manager(lexical, commit_delay=0.05)
+    mgr.update_document("1", "a")
+    mgr.update_document("2", "b")
+    deadline = time.monotonic() + 2.0
+    while lexical.commits == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert lexical.commits == 1
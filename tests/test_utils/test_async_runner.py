@@ -0,0 +1,28 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.utils.async_runner import BackgroundLoop, get_background_loop, run_sync
+
+
+async def _loop_and_thread():
+    return asyncio.get_running_loop(), threading.current_thread()
+
+
+def test_run_sync_reuses_one_background_loop() -> None:
+    first_loop, first_thread = run_sync(_loop_and_thread())
+    second_loop, second_thread = run_sync(_loop_and_thread())
+    assert first_loop is second_loop is get_background_loop().loop
+    assert first_thread is second_thread is not threading.current_thread()
+
+
+def test_blocking_from_the_loop_thread_is_rejected() -> None:
+    runner = BackgroundLoop()
+
+    async def nested():
+        return runner.run(asyncio.sleep(0))
+
+    with pytest.raises(RuntimeError):
+        runner.run(nested())
+    runner.close()
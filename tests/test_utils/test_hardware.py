@@ -85,3 +85,18 @@ def test_detect_device(
     else:
         monkeypatch.setitem(sys.modules, "openvino", None)
     assert hardware.detect_device(preference) == expected
+
+
+@pytest.mark.parametrize(
+    "providers, expected",
+    [(["CPUExecutionProvider"], "onnx_cpu"), (None, "cpu")],
+)
+def test_detect_device_onnx_cpu(
+    monkeypatch: pytest.MonkeyPatch, providers: Optional[List[str]], expected: str
+) -> None:
+    if providers is None:
+        monkeypatch.setitem(sys.modules, "onnxruntime", None)
+    else:
+        ort = types.SimpleNamespace(get_available_providers=lambda: providers)
+        monkeypatch.setitem(sys.modules, "onnxruntime", ort)
+    assert hardware.detect_device("onnx_cpu") == expected
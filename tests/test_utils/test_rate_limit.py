@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from typing import List
+
+import pytest
+
+from src.utils import rate_limit
+from src.utils.rate_limit import TokenBucket
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> List[float]:
+    now = [0.0]
+    sleeps: List[float] = []
+
+    def fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(rate_limit.time, "sleep", fake_sleep)
+    return sleeps
+
+
+def test_token_bucket_allows_burst_then_paces(clock: List[float]) -> None:
+    bucket = TokenBucket(rate=4.0, capacity=2)
+    waits = [bucket.acquire() for _ in range(4)]
+    assert waits == [0.0, 0.0, 0.25, 0.25]
+    assert clock == [0.25, 0.25]
+
+
+def test_token_bucket_throttles_and_recovers(clock: List[float]) -> None:
+    bucket = TokenBucket(rate=10.0)
+    bucket.throttle()
+    bucket.throttle()
+    assert bucket.rate == pytest.approx(2.5)
+    for _ in range(10):
+        bucket.throttle()
+    assert bucket.rate == pytest.approx(10.0 / 16)
+    for _ in range(20):
+        bucket.recover()
+    assert bucket.rate == 10.0
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from typing import List
+
+import pytest
+
+from src.utils import resilience
+from src.utils.resilience import CircuitBreaker, RetryPolicy
+
+
+@pytest.fixture
+def now(monkeypatch: pytest.MonkeyPatch) -> List[float]:
+    clock = [0.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: clock[0])
+    return clock
+
+
+def test_retry_policy_backoff_is_jittered_and_capped() -> None:
+    policy = RetryPolicy(max_attempts=5, base_delay=0.5, max_delay=3.0)
+    for retry, cap in enumerate([0.5, 1.0, 2.0, 3.0, 3.0]):
+        delays = [policy.backoff(retry) for _ in range(50)]
+        assert all(0.0 <= delay <= cap for delay in delays)
+        assert len(set(delays)) > 1
+
+
+def test_circuit_breaker_opens_probes_and_closes(now: List[float]) -> None:
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10.0)
+    breaker.record_failure()
+    assert breaker.allow() and breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    now[0] = 10.0
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()  # only one probe at a time
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    now[0] = 20.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_rate_limited_probe_releases_and_reopens(now: List[float]) -> None:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10.0)
+    breaker.record_failure()
+    now[0] += 10.0
+    assert breaker.allow()  # the probe
+    breaker.record_rate_limited()
+    assert breaker.state == "open" and not breaker.allow()
+    now[0] += 10.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
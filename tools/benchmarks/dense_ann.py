@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Measure recall and latency of IVF search against exact local search.
+
+A clustered synthetic corpus (Gaussian blobs around random unit centres in
+a low-rank subspace, closer to real sentence embeddings than isotropic
+noise) is loaded into a flat and an IVF ``LocalVectorStore``. For every
+``nprobe`` the IVF top-k is compared with the exact top-k of the same
+queries. ``--intrinsic-dimension 384`` gives a much harder, full-rank
+corpus.
+
+Usage::
+
+    python tools/benchmarks/dense_ann.py --docs 200000 --nprobe 8 16 32 64
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.integrations.local_vector_store import LocalVectorStore  # noqa: E402
+
+
+def clustered_vectors(
+    rng: np.random.Generator,
+    count: int,
+    basis: np.ndarray,
+    centres: np.ndarray,
+    spread: float,
+) -> np.ndarray:
+    """Points around ``centres`` in a low-rank subspace mapped by ``basis``."""
+    labels = rng.integers(len(centres), size=count)
+    noise = rng.normal(
+        scale=spread / np.sqrt(basis.shape[0]), size=(count, basis.shape[0])
+    )
+    return ((centres[labels] + noise) @ basis).astype(np.float32)
+
+
+def timed_queries(store, queries: np.ndarray, top_k: int, **kwargs):
+    start = time.perf_counter()
+    results = [
+        {m["id"] for m in store.query("bench", query, top_k=top_k, **kwargs).matches}
+        for query in queries
+    ]
+    return (time.perf_counter() - start) * 1000 / len(queries), results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=2000)
+    parser.add_argument("--spread", type=float, default=0.8)
+    parser.add_argument(
+        "--intrinsic-dimension",
+        type=int,
+        default=48,
+        help="rank of the subspace holding the corpus (embeddings are low-rank)",
+    )
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=None)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32, 64])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    rank = min(args.intrinsic_dimension, args.dimension)
+    basis = np.linalg.qr(rng.normal(size=(args.dimension, rank)))[0].T
+    centres = rng.normal(size=(args.clusters, rank))
+    centres /= np.linalg.norm(centres, axis=1, keepdims=True)
+    data = clustered_vectors(rng, args.docs, basis, centres, args.spread)
+    queries = clustered_vectors(rng, args.queries, basis, centres, args.spread)
+    vectors = [(str(i), row, {}) for i, row in enumerate(data)]
+
+    exact = LocalVectorStore()
+    exact.upsert_embeddings("bench", vectors)
+    start = time.perf_counter()
+    ivf = LocalVectorStore(index_type="ivf", nlist=args.nlist, train_threshold=1)
+    ivf.upsert_embeddings("bench", vectors)
+    build_s = time.perf_counter() - start
+    nlist = len(ivf._indexes["bench"].ivf.centroids)
+
+    exact_ms, truth = timed_queries(exact, queries, args.top_k)
+    print(f"{args.docs} vectors x {args.dimension}, nlist {nlist}, build {build_s:.1f}s")
+    print(
+        f"{'search':>12}{'recall@' + str(args.top_k):>12}{'ms/query':>11}{'speedup':>9}"
+    )
+    print(f"{'exact':>12}{1.0:>12.3f}{exact_ms:>11.2f}{1.0:>8.1f}x")
+    for nprobe in args.nprobe:
+        ms, found = timed_queries(ivf, queries, args.top_k, nprobe=nprobe)
+        recall = np.mean([len(a & b) / len(b) for a, b in zip(found, truth, strict=True)])
+        label = f"nprobe {nprobe}"
+        print(f"{label:>12}{recall:>12.3f}{ms:>11.2f}{exact_ms / ms:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Measure memory, recall and latency of quantized local vector storage.
+
+The same clustered low-rank corpus as ``dense_ann.py`` is loaded into a
+``LocalVectorStore`` per quantization mode. Each mode reports the bytes per
+vector of the scanned codes, the heap bytes per vector the built store
+keeps alive (traced with ``tracemalloc``: ids, metadata, codes and any
+in-memory rows), the bytes per vector of the float16 rows that quantized
+stores keep in a memory-mapped file (resident only while paged in), and
+recall@k against exact float32 search.
+
+Usage::
+
+    python tools/benchmarks/dense_quantization.py --docs 200000 --rescore 128 256
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.integrations.local_vector_store import LocalVectorStore  # noqa: E402
+from tools.benchmarks.dense_ann import clustered_vectors, timed_queries  # noqa: E402
+
+
+def built_store(vectors: list, **options: Any) -> tuple[LocalVectorStore, float]:
+    """A store holding ``vectors`` and the heap bytes it keeps alive."""
+    tracemalloc.start()
+    store = LocalVectorStore(**options)
+    store.upsert_embeddings("bench", vectors)
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return store, held
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=2000)
+    parser.add_argument("--spread", type=float, default=0.8)
+    parser.add_argument("--intrinsic-dimension", type=int, default=48)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--rescore", type=int, nargs="+", default=[64, 256])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    rank = min(args.intrinsic_dimension, args.dimension)
+    basis = np.linalg.qr(rng.normal(size=(args.dimension, rank)))[0].T
+    centres = rng.normal(size=(args.clusters, rank))
+    centres /= np.linalg.norm(centres, axis=1, keepdims=True)
+    data = clustered_vectors(rng, args.docs, basis, centres, args.spread)
+    queries = clustered_vectors(rng, args.queries, basis, centres, args.spread)
+    vectors = [(str(i), row, {}) for i, row in enumerate(data)]
+
+    exact, held = built_store(vectors)
+    exact_ms, truth = timed_queries(exact, queries, args.top_k)
+    float_bytes = exact._indexes["bench"].vectors[: args.docs].nbytes / args.docs
+
+    print(f"{args.docs} vectors x {args.dimension}")
+    header = f"{'mode':>16}{'scan B/vec':>12}{'heap B/vec':>12}{'mapped B/vec':>14}"
+    print(header + f"{'recall@' + str(args.top_k):>12}{'ms/query':>11}")
+    print(
+        f"{'none':>16}{float_bytes:>12.0f}{held / args.docs:>12.0f}{0:>14.0f}"
+        f"{1.0:>12.3f}{exact_ms:>11.2f}"
+    )
+    for mode in ("int8", "binary"):
+        for rescore in args.rescore:
+            store, held = built_store(
+                vectors, quantization=mode, rescore_candidates=rescore
+            )
+            index = store._indexes["bench"]
+            assert index.codes is not None
+            scan_bytes = index.codes.nbytes / len(index.codes.codes)
+            mapped = index.vectors[: args.docs].nbytes / args.docs
+            ms, found = timed_queries(store, queries, args.top_k)
+            recall = np.mean(
+                [len(a & b) / len(b) for a, b in zip(found, truth, strict=True)]
+            )
+            label = f"{mode} r={rescore}"
+            print(
+                f"{label:>16}{scan_bytes:>12.0f}{held / args.docs:>12.0f}"
+                f"{mapped:>14.0f}"
+                f"{recall:>12.3f}{ms:>11.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
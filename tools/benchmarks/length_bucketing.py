@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Measure length-bucketed batching for reranking and document embedding.
+
+A mixed-length corpus (mostly short chunks with a few long ones) is scored
+by a randomly initialised BERT of MiniLM size, so no weights are
+downloaded. The baseline cuts batches in input order, which pads every pair
+to the longest text in its batch. The bucketed run is what
+``CrossEncoderReranker._score_pairs`` and
+``DenseRetriever._encode_bucketed`` now do. The dense baseline is the
+previous single ``encode`` call, which Sentence-Transformers already sorts
+by character length, so that row shows what token-length buckets add.
+
+Usage::
+
+    python tools/benchmarks/length_bucketing.py --docs 512 --long-fraction 0.1
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.ranking import reranker as reranker_module  # noqa: E402
+from src.ranking.reranker import CrossEncoderReranker  # noqa: E402
+from src.retrieval.dense import EMBEDDING_DIMENSION, DenseRetriever  # noqa: E402
+
+
+def input_order_batches(lengths, batch_size):
+    return [
+        np.arange(start, min(start + batch_size, len(lengths)))
+        for start in range(0, len(lengths), batch_size)
+    ]
+
+
+def build_model(directory: Path, layers: int):
+    from transformers import BertConfig, BertForSequenceClassification, BertTokenizerFast
+
+    words = [f"w{i}" for i in range(2000)]
+    vocab = directory / "vocab.txt"
+    vocab.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", *words]))
+    tokenizer = BertTokenizerFast(vocab_file=str(vocab), model_max_length=512)
+    config = BertConfig(
+        vocab_size=len(words) + 5,
+        hidden_size=EMBEDDING_DIMENSION,
+        num_hidden_layers=layers,
+        num_attention_heads=12,
+        intermediate_size=4 * EMBEDDING_DIMENSION,
+        num_labels=1,
+    )
+    model = BertForSequenceClassification(config).eval()
+    tokenizer.save_pretrained(directory)
+    model.save_pretrained(directory)
+    return tokenizer, model
+
+
+def corpus(rng: np.random.Generator, docs: int, long_fraction: float) -> list[str]:
+    lengths = np.where(
+        rng.random(docs) < long_fraction,
+        rng.integers(300, 500, docs),
+        rng.integers(10, 60, docs),
+    )
+    return [" ".join(f"w{w}" for w in rng.integers(2000, size=n)) for n in lengths]
+
+
+def timed(fn, repeats: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=256)
+    parser.add_argument("--long-fraction", type=float, default=0.1)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--layers", type=int, default=6)
+    parser.add_argument("--repeats", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer, models
+    from transformers.utils import logging as hf_logging
+
+    hf_logging.set_verbosity_error()
+
+    torch.manual_seed(args.seed)
+    texts = corpus(np.random.default_rng(args.seed), args.docs, args.long_fraction)
+    with tempfile.TemporaryDirectory() as tmp:
+        tokenizer, model = build_model(Path(tmp), args.layers)
+        reranker = CrossEncoderReranker(load_model=False, batch_size=args.batch_size)
+        reranker.tokenizer, reranker.model = tokenizer, model
+
+        encoder = models.Transformer(tmp, max_seq_length=512)
+        pooling = models.Pooling(EMBEDDING_DIMENSION)
+        dense = DenseRetriever(None, "bench")  # type: ignore[arg-type]
+        dense._model = SentenceTransformer(modules=[encoder, pooling], device="cpu")
+
+        runs = {
+            "rerank": (
+                lambda: reranker._score_pairs("w1 w2 w3", texts),
+                lambda: reranker._score_pairs("w1 w2 w3", texts),
+            ),
+            "embed": (
+                lambda: dense._model.encode(
+                    texts, batch_size=args.batch_size, show_progress_bar=False
+                ),
+                lambda: dense._encode_bucketed(texts, args.batch_size),
+            ),
+        }
+        print(
+            f"{args.docs} texts, {args.long_fraction:.0%} long, "
+            f"batch {args.batch_size}, {args.layers} layers"
+        )
+        print(f"{'path':>8}{'baseline/s':>12}{'bucketed/s':>12}{'speedup':>9}")
+        for name, (before, after) in runs.items():
+            with patch.object(
+                reranker_module, "length_sorted_batches", input_order_batches
+            ):
+                baseline = timed(before, args.repeats)
+            bucketed = timed(after, args.repeats)
+            print(
+                f"{name:>8}{args.docs / baseline:>12.1f}{args.docs / bucketed:>12.1f}"
+                f"{baseline / bucketed:>8.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Compare resident memory of lexical corpus layouts on a synthetic corpus.
+
+The legacy layout keeps every document as a ``list[str]`` of tokens next to a
+``BM25Okapi`` model (one term-frequency dict per document). The current
+``LexicalBM25`` interns terms into a vocabulary and stores postings as
+integer NumPy arrays. Both layouts reference the same document strings, so
+raw text is not counted.
+
+Usage::
+
+    python tools/benchmarks/lexical_memory.py --docs 20000 --tokens 120
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.retrieval.lexical import LexicalBM25, default_tokenizer  # noqa: E402
+
+
+def synthetic_corpus(docs: int, tokens: int, vocab: int, seed: int) -> List[str]:
+    """Zipf-like corpus: a few frequent terms and a long tail of rare ones."""
+    rng = random.Random(seed)
+    words = [f"term{i}" for i in range(vocab)]
+    weights = [1.0 / (rank + 1) for rank in range(vocab)]
+    return [" ".join(rng.choices(words, weights, k=tokens)) for _ in range(docs)]
+
+
+def measure(build: Callable[[], object]) -> int:
+    """Bytes still allocated once ``build`` returns (its result kept alive)."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+
+def legacy_layout(corpus: List[str]) -> object:
+    from rank_bm25 import BM25Okapi
+
+    corpus_tokens = [default_tokenizer(doc) for doc in corpus]
+    return corpus_tokens, BM25Okapi(corpus_tokens)
+
+
+def interned_layout(corpus: List[str]) -> object:
+    index = LexicalBM25(background_merge=False)
+    index.index_documents(corpus)
+    return index
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--tokens", type=int, default=120, help="tokens per document")
+    parser.add_argument("--vocab", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = synthetic_corpus(args.docs, args.tokens, args.vocab, args.seed)
+    total_tokens = args.docs * args.tokens
+    rows = [
+        ("list[str] + BM25Okapi", measure(lambda: legacy_layout(corpus))),
+        ("interned LexicalBM25", measure(lambda: interned_layout(corpus))),
+    ]
+    print(f"{args.docs} documents, {total_tokens} tokens, vocabulary {args.vocab}")
+    print(f"{'layout':<24}{'MiB':>10}{'bytes/token':>14}")
+    for name, size in rows:
+        print(f"{name:<24}{size / 2**20:>10.1f}{size / total_tokens:>14.1f}")
+    print(f"reduction: {rows[0][1] / rows[1][1]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Measure MaxScore pruning against exhaustive lexical scoring.
+
+For every corpus size the same Zipf-distributed queries are run with and
+without ``prune``; results are checked for equality and the mean latency of
+each mode is reported per query length.
+
+Usage::
+
+    python tools/benchmarks/lexical_pruning.py --sizes 10000 50000 --top-k 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.retrieval.lexical import LexicalBM25  # noqa: E402
+
+
+def zipf_texts(
+    rng: random.Random, words: List[str], count: int, length: int
+) -> List[str]:
+    weights = [1.0 / (rank + 1) for rank in range(len(words))]
+    return [" ".join(rng.choices(words, weights, k=length)) for _ in range(count)]
+
+
+def mean_latency_ms(index: LexicalBM25, queries: List[str], top_k: int, prune: bool):
+    start = time.perf_counter()
+    results = [index.query(query, top_k=top_k, prune=prune)[0] for query in queries]
+    return (time.perf_counter() - start) * 1000 / len(queries), results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--query-lengths", type=int, nargs="+", default=[2, 4, 8, 16])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--doc-length", type=int, default=80)
+    parser.add_argument("--vocab", type=int, default=30000)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    words = [f"term{i}" for i in range(args.vocab)]
+    print(f"{'docs':>8}{'terms':>7}{'exhaustive ms':>15}{'pruned ms':>11}{'speedup':>9}")
+    for size in args.sizes:
+        index = LexicalBM25(background_merge=False)
+        index.index_documents(zipf_texts(rng, words, size, args.doc_length))
+        index.merge_segments(merge_all=True)
+        for length in args.query_lengths:
+            queries = zipf_texts(rng, words, args.queries, length)
+            mean_latency_ms(index, queries[:5], args.top_k, True)  # warm caches
+            full_ms, expected = mean_latency_ms(index, queries, args.top_k, False)
+            pruned_ms, actual = mean_latency_ms(index, queries, args.top_k, True)
+            if actual != expected:
+                raise SystemExit("pruned results differ from exhaustive scoring")
+            print(
+                f"{size:>8}{length:>7}{full_ms:>15.2f}{pruned_ms:>11.2f}"
+                f"{full_ms / pruned_ms:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
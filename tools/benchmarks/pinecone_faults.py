@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Measure Pinecone client pipelining and retries against the local emulator.
+
+``PineconeClient`` is pointed at an in-process ``PineconeEmulator`` with
+log-normal request latency, so nothing leaves the machine. The first table
+is upsert throughput for increasing ``max_in_flight``; the second is query
+latency percentiles and the share of failed queries as the injected error
+rate grows, under the client's default (fail-fast) query retry policy.
+
+Usage::
+
+    python tools/benchmarks/pinecone_faults.py --latency-ms 20 --error-rates 0 0.05 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.integrations import pinecone_client  # noqa: E402
+from src.integrations.pinecone_client import EMBEDDING_DIMENSION  # noqa: E402
+from src.integrations.pinecone_emulator import (  # noqa: E402
+    FaultProfile,
+    PineconeEmulator,
+)
+from src.utils.resilience import CircuitBreaker  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vectors", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--in-flight", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--sigma", type=float, default=0.5)
+    parser.add_argument("--error-rates", type=float, nargs="+", default=[0.0, 0.05, 0.2])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    # retries and failures are counted below; don't print each one
+    logging.getLogger("src.integrations").setLevel(logging.CRITICAL)
+
+    rng = np.random.default_rng(args.seed)
+    data = rng.normal(size=(args.vectors, EMBEDDING_DIMENSION)).astype(np.float32)
+    vectors = [(str(i), row, {}) for i, row in enumerate(data)]
+    latency = FaultProfile(args.latency_ms, args.sigma, seed=args.seed)
+
+    emulator = PineconeEmulator()
+    pinecone_client.pinecone = emulator
+    client = pinecone_client.PineconeClient(api_key="bench")
+    client.create_index("bench")
+    emulator.faults = latency
+
+    print(f"upsert {args.vectors} vectors, batch {args.batch_size}")
+    print(f"{'in flight':>10}{'vectors/s':>12}")
+    for in_flight in args.in_flight:
+        report = client.upsert_embeddings(
+            "bench",
+            vectors,
+            batch_size=args.batch_size,
+            requests_per_minute=0,
+            max_in_flight=in_flight,
+        )
+        print(f"{in_flight:>10}{report['vectors_per_second']:>12.0f}")
+
+    print(f"\n{args.queries} queries, median latency {args.latency_ms:.0f} ms")
+    print(f"{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'failed':>8}")
+    for rate in args.error_rates:
+        emulator.faults = FaultProfile(
+            args.latency_ms, args.sigma, error_rate=rate, seed=args.seed
+        )
+        # measure retries, not the breaker, which would start refusing calls
+        client.breakers["query"] = CircuitBreaker(failure_threshold=args.queries + 1)
+        timings, failed = [], 0
+        for row in data[: args.queries]:
+            started = time.perf_counter()
+            try:
+                client.query("bench", row, top_k=10)
+            except Exception:
+                failed += 1
+            timings.append((time.perf_counter() - started) * 1000)
+        p50, p95, p99 = np.percentile(timings, [50, 95, 99])
+        print(
+            f"{rate:>8.0%}{p50:>9.1f}{p95:>9.1f}{p99:>9.1f}{failed / args.queries:>8.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
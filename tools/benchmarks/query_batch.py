@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Compare query throughput of the batched and per-query retrieval paths.
+
+The same Zipf-distributed queries are scored by ``LexicalBM25.query`` in a
+loop and by ``LexicalBM25.query_batch``, and random query vectors are
+searched in a flat ``LocalVectorStore`` one at a time and in one
+``query_batch`` call. Results are checked for equality and queries per
+second are reported for each batch size.
+
+Usage::
+
+    python tools/benchmarks/query_batch.py --docs 50000 --batch-sizes 1 16 64 256
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.integrations.local_vector_store import LocalVectorStore  # noqa: E402
+from src.retrieval.lexical import LexicalBM25  # noqa: E402
+
+DIMENSION = 384
+
+
+def zipf_texts(
+    rng: random.Random, words: List[str], count: int, length: int
+) -> List[str]:
+    weights = [1.0 / (rank + 1) for rank in range(len(words))]
+    return [" ".join(rng.choices(words, weights, k=length)) for _ in range(count)]
+
+
+def queries_per_second(run: Callable[[], list], count: int) -> tuple[float, list]:
+    start = time.perf_counter()
+    results = run()
+    return count / (time.perf_counter() - start), results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=50000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 16, 64, 256])
+    parser.add_argument("--query-length", type=int, default=4)
+    parser.add_argument("--doc-length", type=int, default=80)
+    parser.add_argument("--vocab", type=int, default=30000)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    words = [f"term{i}" for i in range(args.vocab)]
+    lexical = LexicalBM25(background_merge=False)
+    lexical.index_documents(zipf_texts(rng, words, args.docs, args.doc_length))
+    lexical.merge_segments(merge_all=True)
+
+    vectors = np.random.default_rng(args.seed).normal(size=(args.docs, DIMENSION))
+    store = LocalVectorStore()
+    store.upsert_embeddings(
+        "bench", [(str(i), row, {}) for i, row in enumerate(vectors.astype(np.float32))]
+    )
+
+    print(f"{args.docs} documents, top {args.top_k}")
+    print(
+        f"{'batch':>7}{'lexical q/s':>13}{'batched':>10}{'dense q/s':>11}{'batched':>10}"
+    )
+    for size in args.batch_sizes:
+        texts = zipf_texts(rng, words, size, args.query_length)
+        embeddings = list(
+            np.random.default_rng(size).normal(size=(size, DIMENSION)).astype(np.float32)
+        )
+        lexical.query_batch(texts[:2], top_k=args.top_k)  # warm caches
+        loop_lex, expected = queries_per_second(
+            lambda texts=texts: [lexical.query(text, top_k=args.top_k) for text in texts],
+            size,
+        )
+        batch_lex, actual = queries_per_second(
+            lambda texts=texts: lexical.query_batch(texts, top_k=args.top_k), size
+        )
+        if actual != expected:
+            raise SystemExit("batched lexical results differ from per-query results")
+        loop_dense, expected = queries_per_second(
+            lambda embeddings=embeddings: [
+                store.query("bench", embedding, top_k=args.top_k).matches
+                for embedding in embeddings
+            ],
+            size,
+        )
+        batch_dense, actual = queries_per_second(
+            lambda embeddings=embeddings: [
+                response.matches
+                for response in store.query_batch("bench", embeddings, top_k=args.top_k)
+            ],
+            size,
+        )
+        if [[m["id"] for m in r] for r in actual] != [
+            [m["id"] for m in r] for r in expected
+        ]:
+            raise SystemExit("batched dense results differ from per-query results")
+        print(
+            f"{size:>7}{loop_lex:>13.0f}{batch_lex:>10.0f}"
+            f"{loop_dense:>11.0f}{batch_dense:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()